@@ -15,13 +15,14 @@ jwt = JWTManager()
 cors = CORS()
 
 
-def create_app(config_name='default'):
-    """Factory pour créer l'application Flask"""
+def create_app(config_name='default', **surcharges):
+    """Factory pour créer l'application Flask (surcharges : clés de configuration)"""
     
     app = Flask(__name__)
     
     # Chargement de la configuration
     app.config.from_object(config[config_name])
+    app.config.update(surcharges)
     config[config_name].init_app(app)
     
     # Initialisation des extensions
@@ -63,6 +64,18 @@ def create_app(config_name='default'):
     app.register_blueprint(notification, url_prefix='/api/notifications')
     app.register_blueprint(services_routes, url_prefix='/api/services')
     
+    # Exécution des traitements en arrière-plan
+    from app.services.job_runner import job_runner
+    job_runner.init_app(app)
+    
+    # Cache des plannings générés
+    from app.services.cache_plannings import cache_plannings
+    cache_plannings.init_app(app)
+    
+    # File d'analyse des emplois du temps PDF
+    from app.services.file_analyse_pdf import file_analyse_pdf
+    file_analyse_pdf.init_app(app)
+    
     # Route de santé
     @app.route('/api/health')
     def health():
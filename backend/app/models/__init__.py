@@ -11,6 +11,9 @@ from app.models.session import Session
 from app.models.notification import Notification
 from app.models.emploi_du_temps import EmploiDuTemps
 from app.models.cours import Cours
+from app.models.job import Job
+from app.models.statistique_etude import StatistiqueEtude
+from app.models.cache_extraction import CacheExtraction
 
 __all__ = [
     'User',
@@ -20,5 +23,8 @@ __all__ = [
     'Session',
     'Notification',
     'EmploiDuTemps',
-    'Cours'
+    'Cours',
+    'Job',
+    'StatistiqueEtude',
+    'CacheExtraction'
 ]
\ No newline at end of file
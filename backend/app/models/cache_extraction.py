@@ -0,0 +1,165 @@
+from app import db
+from datetime import datetime, time, timedelta
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+import json
+
+
+class CacheExtraction(db.Model):
+    """
+    Résultat d'extraction d'un PDF, partagé entre tous les imports du même fichier
+    
+    La clé est l'empreinte SHA-256 du contenu et la version de l'analyseur :
+    un même emploi du temps importé par toute une promotion n'est lu qu'une
+    fois par pdfplumber.
+    """
+    
+    __tablename__ = 'caches_extraction'
+    __table_args__ = (
+        db.UniqueConstraint('empreinte', 'version_analyseur', name='uq_caches_extraction_empreinte_version'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    empreinte = db.Column(db.String(64), nullable=False)
+    version_analyseur = db.Column(db.String(20), nullable=False)
+    
+    # Résultat de l'extraction
+    texte_brut = db.Column(db.Text)
+    cours_json = db.Column(db.Text)
+    algorithme = db.Column(db.String(50))
+    taille = db.Column(db.Integer, default=0, nullable=False)  # Octets (texte + cours)
+    
+    # Utilisation
+    nombre_succes = db.Column(db.Integer, default=0, nullable=False)
+    
+    # Timestamps
+    date_creation = db.Column(db.DateTime, default=datetime.utcnow)
+    date_dernier_acces = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    
+    def __init__(self, empreinte, version_analyseur, **kwargs):
+        self.empreinte = empreinte
+        self.version_analyseur = version_analyseur
+        
+        for key, value in kwargs.items():
+            if hasattr(self, key):
+                setattr(self, key, value)
+    
+    def get_cours(self):
+        """Retourne les cours extraits (heures converties en objets time)"""
+        cours = json.loads(self.cours_json) if self.cours_json else []
+        for cours_info in cours:
+            for cle in ('heure_debut', 'heure_fin'):
+                if cours_info.get(cle):
+                    cours_info[cle] = time.fromisoformat(cours_info[cle])
+        return cours
+    
+    def set_cours(self, cours):
+        """Définit les cours extraits"""
+        self.cours_json = json.dumps(
+            cours,
+            default=lambda valeur: valeur.isoformat() if isinstance(valeur, time) else str(valeur)
+        )
+    
+    def get_extraction(self):
+        """Retourne le résultat au format de PDFAnalyzer.extraire (sans durées de pages)"""
+        return {
+            'texte_brut': self.texte_brut,
+            'cours': self.get_cours(),
+            'algorithme': self.algorithme,
+            'pages': []
+        }
+    
+    @classmethod
+    def obtenir(cls, empreinte, version_analyseur):
+        """
+        Cherche une extraction et compte l'accès (sans commit)
+        
+        Args:
+            empreinte: Empreinte SHA-256 du PDF
+            version_analyseur: Version de l'analyseur ayant produit le résultat
+        
+        Returns:
+            Entrée du cache ou None
+        """
+        filtre = cls.query.filter_by(empreinte=empreinte, version_analyseur=version_analyseur)
+        
+        if not filtre.update({
+            cls.nombre_succes: cls.nombre_succes + 1,
+            cls.date_dernier_acces: datetime.utcnow()
+        }, synchronize_session=False):
+            return None
+        
+        return filtre.first()
+    
+    @classmethod
+    def enregistrer(cls, empreinte, version_analyseur, extraction):
+        """
+        Met en cache le résultat d'une extraction (sans commit)
+        
+        Args:
+            empreinte: Empreinte SHA-256 du PDF
+            version_analyseur: Version de l'analyseur
+            extraction: Résultat de PDFAnalyzer.extraire
+        """
+        entree = cls(
+            empreinte=empreinte,
+            version_analyseur=version_analyseur,
+            texte_brut=extraction['texte_brut'],
+            algorithme=extraction.get('algorithme')
+        )
+        entree.set_cours(extraction['cours'])
+        entree.taille = len(entree.texte_brut.encode('utf-8')) + len(entree.cours_json.encode('utf-8'))
+        
+        try:
+            with db.session.begin_nested():
+                db.session.add(entree)
+        except IntegrityError:
+            # Même fichier analysé en parallèle : l'entrée existe déjà
+            pass
+    
+    @classmethod
+    def purger(cls, age_max_jours, taille_max):
+        """
+        Supprime les entrées inutilisées depuis trop longtemps, puis les moins
+        récemment utilisées tant que le cache dépasse sa taille (sans commit)
+        
+        Args:
+            age_max_jours: Âge maximal depuis le dernier accès
+            taille_max: Taille totale maximale en octets
+        
+        Returns:
+            Nombre d'entrées supprimées
+        """
+        limite = datetime.utcnow() - timedelta(days=age_max_jours)
+        supprimees = cls.query.filter(cls.date_dernier_acces < limite).delete(synchronize_session=False)
+        
+        total = db.session.query(func.coalesce(func.sum(cls.taille), 0)).scalar()
+        if total <= taille_max:
+            return supprimees
+        
+        a_supprimer = []
+        for id_entree, taille in db.session.query(cls.id, cls.taille).order_by(cls.date_dernier_acces):
+            if total <= taille_max:
+                break
+            a_supprimer.append(id_entree)
+            total -= taille
+        
+        cls.query.filter(cls.id.in_(a_supprimer)).delete(synchronize_session=False)
+        
+        return supprimees + len(a_supprimer)
+    
+    def to_dict(self):
+        """Convertit l'entrée en dictionnaire (sans le texte)"""
+        return {
+            'id': self.id,
+            'empreinte': self.empreinte,
+            'version_analyseur': self.version_analyseur,
+            'algorithme': self.algorithme,
+            'taille': self.taille,
+            'nombre_succes': self.nombre_succes,
+            'date_creation': self.date_creation.isoformat() if self.date_creation else None,
+            'date_dernier_acces': self.date_dernier_acces.isoformat() if self.date_dernier_acces else None
+        }
+    
+    def __repr__(self):
+        return f'<CacheExtraction {self.empreinte[:12]} v{self.version_analyseur}>'
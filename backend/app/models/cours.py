@@ -16,8 +16,8 @@ class Cours(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     
     # Relations
-    emploi_du_temps_id = db.Column(db.Integer, db.ForeignKey('emploi_du_temps.id'), nullable=False)
-    matiere_id = db.Column(db.Integer, db.ForeignKey('matiere.id'))
+    emploi_du_temps_id = db.Column(db.Integer, db.ForeignKey('emplois_du_temps.id'), nullable=False)
+    matiere_id = db.Column(db.Integer, db.ForeignKey('matieres.id'))
     
     # Informations du cours
     nom = db.Column(db.String(200), nullable=False)
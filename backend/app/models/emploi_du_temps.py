@@ -18,6 +18,7 @@ class EmploiDuTemps(db.Model):
     # Informations du fichier
     nom_fichier = db.Column(db.String(255), nullable=False)
     fichier_pdf = db.Column(db.String(255))
+    empreinte_pdf = db.Column(db.String(64))  # SHA-256 du contenu
     
     # Période couverte
     date_debut = db.Column(db.Date)
@@ -29,6 +30,10 @@ class EmploiDuTemps(db.Model):
     algorithme_utilise = db.Column(db.String(50))
     confiance_extraction = db.Column(db.Float)
     
+    # File d'analyse : en_attente, en_cours, termine, echoue (None = jamais soumis)
+    statut_analyse = db.Column(db.String(20))
+    erreur_analyse = db.Column(db.Text)
+    
     # Statistiques
     nombre_cours_extraits = db.Column(db.Integer, default=0)
     nombre_creneaux_libres = db.Column(db.Integer, default=0)
@@ -40,6 +45,8 @@ class EmploiDuTemps(db.Model):
     
     # Timestamps
     date_import = db.Column(db.DateTime, default=datetime.utcnow)
+    date_mise_en_file = db.Column(db.DateTime)
+    date_debut_analyse = db.Column(db.DateTime)
     date_analyse = db.Column(db.DateTime)
     
     # Relations
@@ -67,25 +74,39 @@ class EmploiDuTemps(db.Model):
         self.heures_cours_semaine = round(total_heures, 2)
         db.session.commit()
     
+    @staticmethod
+    def _duree(debut, fin):
+        """Durée en secondes entre deux horodatages (None si l'un manque)"""
+        if not debut or not fin:
+            return None
+        return round((fin - debut).total_seconds(), 3)
+    
     def to_dict(self, include_cours=False):
         """Convertit l'emploi du temps en dictionnaire"""
         edt_dict = {
             'id': self.id,
             'user_id': self.user_id,
             'nom_fichier': self.nom_fichier,
+            'empreinte_pdf': self.empreinte_pdf,
             'date_debut': self.date_debut.isoformat() if self.date_debut else None,
             'date_fin': self.date_fin.isoformat() if self.date_fin else None,
             'semestre': self.semestre,
             'analyse_completee': self.analyse_completee,
             'algorithme_utilise': self.algorithme_utilise,
             'confiance_extraction': self.confiance_extraction,
+            'statut_analyse': self.statut_analyse,
+            'erreur_analyse': self.erreur_analyse,
             'nombre_cours_extraits': self.nombre_cours_extraits,
             'nombre_creneaux_libres': self.nombre_creneaux_libres,
             'heures_cours_semaine': self.heures_cours_semaine,
             'actif': self.actif,
             'archive': self.archive,
             'date_import': self.date_import.isoformat() if self.date_import else None,
-            'date_analyse': self.date_analyse.isoformat() if self.date_analyse else None
+            'date_mise_en_file': self.date_mise_en_file.isoformat() if self.date_mise_en_file else None,
+            'date_debut_analyse': self.date_debut_analyse.isoformat() if self.date_debut_analyse else None,
+            'date_analyse': self.date_analyse.isoformat() if self.date_analyse else None,
+            'duree_attente_secondes': self._duree(self.date_mise_en_file, self.date_debut_analyse),
+            'duree_analyse_secondes': self._duree(self.date_debut_analyse, self.date_analyse)
         }
         
         if include_cours:
@@ -0,0 +1,89 @@
+from app import db
+from datetime import datetime
+import json
+
+
+class Job(db.Model):
+    """
+    Modèle représentant un traitement exécuté en arrière-plan (génération, optimisation)
+    
+    Les analyses PDF ont leur propre file (file_analyse_pdf) et leur statut
+    est porté par EmploiDuTemps.statut_analyse.
+    """
+    
+    __tablename__ = 'jobs'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    
+    # Type de traitement
+    type_job = db.Column(db.String(50), nullable=False)  # 'generation_planning', 'optimisation_planning'
+    
+    # Statut
+    statut = db.Column(db.String(20), default='en_attente')  # 'en_attente', 'en_cours', 'termine', 'echoue'
+    progression = db.Column(db.Integer, default=0)  # 0-100
+    
+    # Données en JSON
+    parametres_json = db.Column(db.Text)
+    resultat_json = db.Column(db.Text)
+    erreur = db.Column(db.Text)
+    
+    # Timestamps
+    date_creation = db.Column(db.DateTime, default=datetime.utcnow)
+    date_debut = db.Column(db.DateTime)
+    date_fin = db.Column(db.DateTime)
+    
+    def __init__(self, user_id, type_job, **kwargs):
+        self.user_id = user_id
+        self.type_job = type_job
+        
+        for key, value in kwargs.items():
+            if hasattr(self, key):
+                setattr(self, key, value)
+    
+    def get_parametres(self):
+        """Retourne les paramètres du traitement"""
+        return json.loads(self.parametres_json) if self.parametres_json else {}
+    
+    def set_parametres(self, parametres):
+        """Définit les paramètres du traitement"""
+        self.parametres_json = json.dumps(parametres, default=str)
+    
+    def get_resultat(self):
+        """Retourne le résultat du traitement"""
+        return json.loads(self.resultat_json) if self.resultat_json else None
+    
+    def set_resultat(self, resultat):
+        """Définit le résultat du traitement"""
+        self.resultat_json = json.dumps(resultat, default=str)
+    
+    def est_termine(self):
+        """Vérifie si le traitement est fini (succès ou échec)"""
+        return self.statut in ['termine', 'echoue']
+    
+    def calculer_duree(self):
+        """Calcule la durée d'exécution en secondes"""
+        if not self.date_debut:
+            return None
+        fin = self.date_fin or datetime.utcnow()
+        return round((fin - self.date_debut).total_seconds(), 3)
+    
+    def to_dict(self):
+        """Convertit le job en dictionnaire"""
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'type_job': self.type_job,
+            'statut': self.statut,
+            'progression': self.progression,
+            'parametres': self.get_parametres(),
+            'resultat': self.get_resultat(),
+            'erreur': self.erreur,
+            'duree_secondes': self.calculer_duree(),
+            'date_creation': self.date_creation.isoformat() if self.date_creation else None,
+            'date_debut': self.date_debut.isoformat() if self.date_debut else None,
+            'date_fin': self.date_fin.isoformat() if self.date_fin else None
+        }
+    
+    def __repr__(self):
+        return f'<Job {self.id} {self.type_job} ({self.statut})>'
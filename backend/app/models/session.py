@@ -1,4 +1,5 @@
 from app import db
+from app.models.statistique_etude import StatistiqueEtude
 from datetime import datetime, timedelta
 
 
@@ -73,6 +74,7 @@ class Session(db.Model):
     
     def terminer_session(self):
         """Termine la session"""
+        deja_terminee = self.completee
         self.en_cours = False
         self.completee = True
         self.heure_fin_reelle = datetime.utcnow()
@@ -90,16 +92,40 @@ class Session(db.Model):
         if self.matiere and self.duree_reelle:
             self.matiere.ajouter_temps_etudie(self.duree_reelle)
         
+        # Mettre à jour les habitudes d'étude de l'utilisateur
+        if not deja_terminee:
+            self._mettre_a_jour_statistiques(terminees=1, minutes=self.duree_reelle or self.duree or 0)
+        
         db.session.commit()
     
     def annuler_session(self, raison=None):
         """Annule la session"""
+        deja_annulee = self.annulee
         self.annulee = True
         self.en_cours = False
         if raison:
             self.notes_session = f"Annulée: {raison}"
+        
+        if not deja_annulee:
+            self._mettre_a_jour_statistiques(annulees=1)
+        
         db.session.commit()
     
+    def _mettre_a_jour_statistiques(self, terminees=0, annulees=0, minutes=0):
+        """Reporte la session dans l'agrégat jour/heure de l'utilisateur (sans commit)"""
+        if not self.planning:
+            return
+        
+        debut = self.heure_debut_reelle or self.heure_debut
+        StatistiqueEtude.incrementer(
+            user_id=self.planning.user_id,
+            date=self.date,
+            heure=debut.hour,
+            terminees=terminees,
+            annulees=annulees,
+            minutes=minutes
+        )
+    
     def evaluer_session(self, productivite, concentration, difficulte, notes=None):
         """Évalue la session après complétion"""
         self.productivite = productivite
@@ -0,0 +1,216 @@
+from app import db
+from datetime import datetime
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+
+
+class StatistiqueEtude(db.Model):
+    """
+    Agrégat des sessions terminées ou annulées d'un utilisateur, par jour et par heure
+    
+    Mis à jour à chaque fin ou annulation de session : l'analyse des habitudes
+    d'étude lit au plus 24 lignes par jour au lieu de l'historique des sessions.
+    """
+    
+    __tablename__ = 'statistiques_etude'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'date', 'heure', name='uq_statistiques_etude_user_date_heure'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    
+    # Jour et heure de début des sessions comptées
+    date = db.Column(db.Date, nullable=False)
+    heure = db.Column(db.Integer, nullable=False)  # 0-23
+    
+    # Compteurs
+    sessions_terminees = db.Column(db.Integer, default=0, nullable=False)
+    sessions_annulees = db.Column(db.Integer, default=0, nullable=False)
+    minutes_etudiees = db.Column(db.Integer, default=0, nullable=False)
+    
+    # Timestamps
+    date_modification = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    JOURS = ['lundi', 'mardi', 'mercredi', 'jeudi', 'vendredi', 'samedi', 'dimanche']
+    
+    def __init__(self, user_id, date, heure, **kwargs):
+        self.user_id = user_id
+        self.date = date
+        self.heure = heure
+        
+        for key, value in kwargs.items():
+            if hasattr(self, key):
+                setattr(self, key, value)
+    
+    @classmethod
+    def incrementer(cls, user_id, date, heure, terminees=0, annulees=0, minutes=0):
+        """
+        Ajoute des sessions au compteur d'une heure (sans commit)
+        
+        L'incrément est fait en SQL, sans lecture préalable, pour rester
+        correct si deux sessions de la même heure se terminent en même temps.
+        """
+        filtre = cls.query.filter_by(user_id=user_id, date=date, heure=heure)
+        increments = {
+            cls.sessions_terminees: cls.sessions_terminees + terminees,
+            cls.sessions_annulees: cls.sessions_annulees + annulees,
+            cls.minutes_etudiees: cls.minutes_etudiees + minutes,
+            cls.date_modification: datetime.utcnow()
+        }
+        
+        if filtre.update(increments, synchronize_session=False):
+            return
+        
+        try:
+            with db.session.begin_nested():
+                db.session.add(cls(
+                    user_id=user_id,
+                    date=date,
+                    heure=heure,
+                    sessions_terminees=terminees,
+                    sessions_annulees=annulees,
+                    minutes_etudiees=minutes
+                ))
+        except IntegrityError:
+            # Ligne créée entre-temps par une autre transaction
+            filtre.update(increments, synchronize_session=False)
+    
+    @classmethod
+    def reconstruire(cls, user_id=None):
+        """
+        Recalcule les agrégats à partir des sessions terminées ou annulées (sans commit)
+        
+        Initialise les agrégats d'un historique antérieur à leur mise à jour
+        automatique, ou les corrige. Mêmes règles que Session._mettre_a_jour_statistiques.
+        
+        Args:
+            user_id: Utilisateur à recalculer (None = tous)
+        
+        Returns:
+            Nombre de lignes d'agrégat créées
+        """
+        from app.models.planning import Planning
+        from app.models.session import Session
+        
+        requete = db.session.query(
+            Planning.user_id,
+            Session.date,
+            Session.heure_debut,
+            Session.heure_debut_reelle,
+            Session.completee,
+            Session.annulee,
+            Session.duree,
+            Session.duree_reelle
+        ).join(Planning, Session.planning_id == Planning.id).filter(
+            db.or_(Session.completee == True, Session.annulee == True)
+        )
+        anciens = cls.query
+        
+        if user_id is not None:
+            requete = requete.filter(Planning.user_id == user_id)
+            anciens = anciens.filter_by(user_id=user_id)
+        
+        # (user_id, date, heure) -> [terminées, annulées, minutes]
+        agregats = {}
+        for utilisateur, jour, debut_prevu, debut_reel, completee, annulee, duree, duree_reelle in requete.yield_per(1000):
+            compteurs = agregats.setdefault((utilisateur, jour, (debut_reel or debut_prevu).hour), [0, 0, 0])
+            if completee:
+                compteurs[0] += 1
+                compteurs[2] += duree_reelle or duree or 0
+            if annulee:
+                compteurs[1] += 1
+        
+        anciens.delete(synchronize_session=False)
+        
+        if agregats:
+            maintenant = datetime.utcnow()
+            db.session.execute(insert(cls), [
+                {
+                    'user_id': utilisateur,
+                    'date': jour,
+                    'heure': heure,
+                    'sessions_terminees': terminees,
+                    'sessions_annulees': annulees,
+                    'minutes_etudiees': minutes,
+                    'date_modification': maintenant
+                }
+                for (utilisateur, jour, heure), (terminees, annulees, minutes) in agregats.items()
+            ])
+        
+        return len(agregats)
+    
+    @classmethod
+    def analyser_periode(cls, user_id, date_debut, date_fin):
+        """
+        Analyse les habitudes d'étude d'une période à partir des agrégats
+        
+        Args:
+            user_id: ID de l'utilisateur
+            date_debut: Premier jour inclus
+            date_fin: Dernier jour inclus
+        
+        Returns:
+            Dictionnaire d'analyse (mêmes clés que PlanningAI.analyze_study_pattern)
+        """
+        lignes = db.session.query(
+            cls.date,
+            cls.heure,
+            cls.sessions_terminees,
+            cls.sessions_annulees,
+            cls.minutes_etudiees
+        ).filter(
+            cls.user_id == user_id,
+            cls.date >= date_debut,
+            cls.date <= date_fin
+        ).all()
+        
+        sessions_par_jour = {}
+        sessions_par_heure = {}
+        jours_actifs = set()
+        terminees = 0
+        annulees = 0
+        minutes = 0
+        
+        for date, heure, nb_terminees, nb_annulees, nb_minutes in lignes:
+            nombre = nb_terminees + nb_annulees
+            jour = cls.JOURS[date.weekday()]
+            sessions_par_jour[jour] = sessions_par_jour.get(jour, 0) + nombre
+            sessions_par_heure[heure] = sessions_par_heure.get(heure, 0) + nombre
+            terminees += nb_terminees
+            annulees += nb_annulees
+            minutes += nb_minutes
+            jours_actifs.add(date)
+        
+        total_sessions = terminees + annulees
+        heures_totales = minutes / 60
+        jour_prefere = max(sessions_par_jour.items(), key=lambda x: x[1])[0] if sessions_par_jour else None
+        heure_preferee = max(sessions_par_heure.items(), key=lambda x: x[1])[0] if sessions_par_heure else None
+        
+        return {
+            'total_sessions': total_sessions,
+            'sessions_terminees': terminees,
+            'sessions_annulees': annulees,
+            'heures_totales': round(heures_totales, 1),
+            'moyenne_par_jour': round(heures_totales / max(len(jours_actifs), 1), 1),
+            'jour_prefere': jour_prefere,
+            'heure_preferee': f"{heure_preferee}:00" if heure_preferee is not None else None,
+            'taux_completion': round(terminees / total_sessions * 100, 1) if total_sessions else 0,
+            'sessions_par_jour': sessions_par_jour,
+            'sessions_par_heure': sessions_par_heure
+        }
+    
+    def to_dict(self):
+        """Convertit l'agrégat en dictionnaire"""
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'date': self.date.isoformat() if self.date else None,
+            'heure': self.heure,
+            'sessions_terminees': self.sessions_terminees,
+            'sessions_annulees': self.sessions_annulees,
+            'minutes_etudiees': self.minutes_etudiees
+        }
+    
+    def __repr__(self):
+        return f'<StatistiqueEtude user={self.user_id} {self.date} {self.heure}h>'
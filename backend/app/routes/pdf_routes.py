@@ -7,7 +7,9 @@ from app.models.cours import Cours
 
 from app.utils.decorators import jwt_required_custom, handle_validation_error
 from app.utils.validators import validate_file, ValidationError
-from app.utils.helpers import success_response, error_response, save_uploaded_file, delete_file
+from app.utils.helpers import success_response, error_response, save_uploaded_file, delete_file, calculer_empreinte_fichier
+from app.services.file_analyse_pdf import file_analyse_pdf, FileAnalysePleine
+from app.services.pdf_analyzer import MODE_AUTO, MODES_EXTRACTION
 
 bp = Blueprint('pdf', __name__)
 
@@ -35,6 +37,10 @@ def upload_pdf(current_user):
         # Valider le fichier
         validate_file(file, 'Fichier PDF', allowed_extensions=ALLOWED_EXTENSIONS, max_size_mb=16)
         
+        mode = request.form.get('mode_extraction', MODE_AUTO)
+        if mode not in MODES_EXTRACTION:
+            return error_response('Mode invalide', f"mode_extraction doit être parmi : {', '.join(MODES_EXTRACTION)}", 400)
+        
         # Sauvegarder le fichier
         try:
             filepath = save_uploaded_file(file, UPLOAD_FOLDER, ALLOWED_EXTENSIONS)
@@ -45,7 +51,8 @@ def upload_pdf(current_user):
         emploi_du_temps = EmploiDuTemps(
             user_id=current_user.id,
             nom_fichier=secure_filename(file.filename),
-            fichier_pdf=filepath
+            fichier_pdf=filepath,
+            empreinte_pdf=calculer_empreinte_fichier(filepath)
         )
         
         # Récupérer les métadonnées si fournies
@@ -56,6 +63,15 @@ def upload_pdf(current_user):
         db.session.add(emploi_du_temps)
         db.session.commit()
         
+        # L'analyse est faite hors de la requête : la réponse ne dépend pas de la taille du PDF
+        try:
+            file_analyse_pdf.soumettre(emploi_du_temps, mode)
+        except FileAnalysePleine as e:
+            db.session.delete(emploi_du_temps)
+            db.session.commit()
+            delete_file(filepath)
+            return error_response('Service surchargé', str(e), 503)
+        
         return success_response(
             data=emploi_du_temps.to_dict(),
             message='Fichier PDF uploadé avec succès. Analyse en cours...',
@@ -167,7 +183,11 @@ def get_cours(id, current_user):
 def analyser_emploi_du_temps(id, current_user):
     """
     Lance l'analyse d'un emploi du temps PDF
-    Cette route déclenchera le service d'analyse PDF
+    L'analyse est placée dans la file ; son avancement se suit via
+    statut_analyse sur GET /emplois-du-temps/<id>
+    
+    Body (facultatif):
+        mode: 'texte', 'grille' ou 'auto' (défaut)
     """
     try:
         emploi = EmploiDuTemps.query.filter_by(id=id, user_id=current_user.id).first()
@@ -178,22 +198,19 @@ def analyser_emploi_du_temps(id, current_user):
         if not emploi.fichier_pdf or not os.path.exists(emploi.fichier_pdf):
             return error_response('Fichier manquant', 'Le fichier PDF n\'existe plus', 404)
         
-        # TODO: Appeler le service d'analyse PDF ici
-        # from app.services.pdf_analyzer import analyser_pdf
-        # resultat = analyser_pdf(emploi.fichier_pdf, emploi.id)
+        mode = (request.get_json(silent=True) or {}).get('mode', MODE_AUTO)
+        if mode not in MODES_EXTRACTION:
+            return error_response('Mode invalide', f"mode doit être parmi : {', '.join(MODES_EXTRACTION)}", 400)
         
-        # Pour l'instant, marquer comme analysé
-        emploi.analyse_completee = True
-        emploi.algorithme_utilise = 'PyMuPDF+Regex'
-        emploi.confiance_extraction = 85.0
-        from datetime import datetime
-        emploi.date_analyse = datetime.utcnow()
-        
-        db.session.commit()
+        try:
+            soumise = file_analyse_pdf.soumettre(emploi, mode)
+        except FileAnalysePleine as e:
+            return error_response('Service surchargé', str(e), 503)
         
         return success_response(
-            data=emploi.to_dict(include_cours=True),
-            message='Analyse du PDF lancée avec succès'
+            data=emploi.to_dict(include_cours=emploi.statut_analyse == 'termine'),
+            message='Analyse du PDF lancée avec succès' if soumise else 'Analyse du PDF déjà en cours',
+            status_code=200 if emploi.statut_analyse in ('termine', 'echoue') else 202
         )
         
     except Exception as e:
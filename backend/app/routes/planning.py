@@ -344,6 +344,103 @@ def get_sessions_semaine(id, current_user):
         return error_response('Erreur serveur', str(e), 500)
 
 
+def _session_du_planning(id, session_id, current_user):
+    """
+    Récupère une session d'un planning de l'utilisateur
+    
+    Returns:
+        Session, ou None si le planning ou la session est introuvable
+    """
+    return Session.query.join(Planning).filter(
+        Session.id == session_id,
+        Session.planning_id == id,
+        Planning.user_id == current_user.id
+    ).first()
+
+
+@bp.route('/<int:id>/sessions/<int:session_id>/demarrer', methods=['POST'])
+@jwt_required_custom
+def demarrer_session(id, session_id, current_user):
+    """Démarre une session (heure de début réelle)"""
+    try:
+        session = _session_du_planning(id, session_id, current_user)
+        
+        if not session:
+            return error_response('Session introuvable', f'Aucune session avec l\'ID {session_id}', 404)
+        
+        if session.completee or session.annulee:
+            return error_response('Session close', 'La session est déjà terminée ou annulée', 400)
+        
+        session.demarrer_session()
+        
+        return success_response(
+            data=session.to_dict(include_matiere=True),
+            message='Session démarrée'
+        )
+        
+    except Exception as e:
+        db.session.rollback()
+        return error_response('Erreur serveur', str(e), 500)
+
+
+@bp.route('/<int:id>/sessions/<int:session_id>/terminer', methods=['POST'])
+@jwt_required_custom
+def terminer_session(id, session_id, current_user):
+    """Termine une session (progression du planning et habitudes d'étude mises à jour)"""
+    try:
+        session = _session_du_planning(id, session_id, current_user)
+        
+        if not session:
+            return error_response('Session introuvable', f'Aucune session avec l\'ID {session_id}', 404)
+        
+        if session.annulee:
+            return error_response('Session annulée', 'Une session annulée ne peut pas être terminée', 400)
+        
+        session.terminer_session()
+        
+        return success_response(
+            data=session.to_dict(include_matiere=True),
+            message='Session terminée'
+        )
+        
+    except Exception as e:
+        db.session.rollback()
+        return error_response('Erreur serveur', str(e), 500)
+
+
+@bp.route('/<int:id>/sessions/<int:session_id>/annuler', methods=['POST'])
+@jwt_required_custom
+def annuler_session(id, session_id, current_user):
+    """
+    Annule une session (habitudes d'étude mises à jour)
+    
+    Body JSON (optionnel):
+    {
+        "raison": "Malade"
+    }
+    """
+    try:
+        session = _session_du_planning(id, session_id, current_user)
+        
+        if not session:
+            return error_response('Session introuvable', f'Aucune session avec l\'ID {session_id}', 404)
+        
+        if session.completee:
+            return error_response('Session terminée', 'Une session terminée ne peut pas être annulée', 400)
+        
+        data = request.get_json(silent=True) or {}
+        session.annuler_session(data.get('raison'))
+        
+        return success_response(
+            data=session.to_dict(include_matiere=True),
+            message='Session annulée'
+        )
+        
+    except Exception as e:
+        db.session.rollback()
+        return error_response('Erreur serveur', str(e), 500)
+
+
 @bp.route('/<int:id>/statistiques', methods=['GET'])
 @jwt_required_custom
 
@@ -2,22 +2,136 @@
 Routes pour les services IA (Planning Generator, PDF Analyzer, Notifications)
 """
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from app import db
 from app.models.user import User
 from app.models.planning import Planning
 from app.models.emploi_du_temps import EmploiDuTemps
 from app.utils.decorators import jwt_required_custom, admin_required
-from app.utils.validators import validate_date
+from app.utils.validators import validate_date, ValidationError
 from app.utils.helpers import success_response, error_response
-from app.services.pdf_analyzer import PDFAnalyzer
-from app.services.planning_generator import PlanningGenerator
+from app.services.pdf_analyzer import PDFAnalyzer, MODE_AUTO, MODES_EXTRACTION
+from app.services.file_analyse_pdf import file_analyse_pdf, FileAnalysePleine
+from app.services.planning_generator import PlanningGenerator, MODE_JOUR, MODES_GENERATION
 from app.services.notification_service import NotificationService
-from datetime import datetime, timedelta
+from app.services.job_runner import job_runner
+from app.services.scenarios import evaluer_scenarios
+from app.services.moteurs_planning import MOTEURS, planifier
+from app.services.planning_ai import PlanningAI, CatalogueSujets
+from app.models.job import Job
+from app.models.statistique_etude import StatistiqueEtude
+from datetime import datetime, date, timedelta
 
 bp = Blueprint('services', __name__)
 
 
+# ============================================================================
+# TRAITEMENTS (SYNCHRONES OU EN ARRIÈRE-PLAN)
+# ============================================================================
+
+@job_runner.tache('generation_planning')
+def _generer_planning(user_id, parametres, progression):
+    """
+    Génère un planning à partir de paramètres déjà validés
+    
+    Args:
+        user_id: ID de l'utilisateur
+        parametres: Paramètres de génération (dates ISO)
+        progression: Fonction de publication de l'avancement
+    
+    Returns:
+        Planning généré et statistiques de génération, ou aperçu en colonnes
+        si parametres['apercu'] est vrai (aucune écriture)
+    """
+    user = User.query.get(user_id)
+    repartir_taches = parametres.get('repartir_taches', False)
+    progression(20)
+    
+    if parametres.get('apercu'):
+        return PlanningGenerator(user, repartir_taches=repartir_taches).previsualiser_planning(
+            date_debut=date.fromisoformat(parametres['date_debut']),
+            date_fin=date.fromisoformat(parametres['date_fin']),
+            heures_etude_par_jour=parametres['heures_etude_par_jour'],
+            jours_etude_par_semaine=parametres['jours_etude_par_semaine'],
+            jours_repos=parametres['jours_repos'],
+            mode=parametres['mode']
+        )
+    
+    if parametres.get('moteur'):
+        planning, statistiques = planifier(
+            user,
+            parametres['moteur'],
+            date_debut=date.fromisoformat(parametres['date_debut']),
+            date_fin=date.fromisoformat(parametres['date_fin']),
+            heures_etude_par_jour=parametres['heures_etude_par_jour'],
+            jours_etude_par_semaine=parametres['jours_etude_par_semaine'],
+            jours_repos=parametres['jours_repos'],
+            repartir_taches=repartir_taches
+        )
+        
+        resultat = planning.to_dict()
+        resultat['generation'] = statistiques
+        
+        return resultat
+    
+    generator = PlanningGenerator(user, repartir_taches=repartir_taches)
+    
+    if parametres.get('flux'):
+        # Périodes longues : insertion par lots, avancement publié après chaque lot
+        planning = generator.generer_planning_en_flux(
+            date_debut=date.fromisoformat(parametres['date_debut']),
+            date_fin=date.fromisoformat(parametres['date_fin']),
+            heures_etude_par_jour=parametres['heures_etude_par_jour'],
+            jours_etude_par_semaine=parametres['jours_etude_par_semaine'],
+            jours_repos=parametres['jours_repos'],
+            mode=parametres['mode'],
+            progression=lambda pourcentage: progression(20 + pourcentage * 3 // 4)
+        )
+    else:
+        planning = generator.generer_planning_automatique(
+            date_debut=date.fromisoformat(parametres['date_debut']),
+            date_fin=date.fromisoformat(parametres['date_fin']),
+            heures_etude_par_jour=parametres['heures_etude_par_jour'],
+            jours_etude_par_semaine=parametres['jours_etude_par_semaine'],
+            jours_repos=parametres['jours_repos'],
+            mode=parametres['mode']
+        )
+    
+    resultat = planning.to_dict()
+    resultat['generation'] = generator.statistiques
+    
+    return resultat
+
+
+@job_runner.tache('optimisation_planning')
+def _optimiser_planning(user_id, parametres, progression):
+    """
+    Optimise un planning dont l'appartenance a déjà été vérifiée
+    
+    Args:
+        user_id: ID de l'utilisateur
+        parametres: planning_id, budget_secondes, graine, iterations_max
+        progression: Fonction de publication de l'avancement
+    
+    Returns:
+        Résultat de l'optimisation
+    """
+    planning = Planning.query.get(parametres['planning_id'])
+    
+    return PlanningGenerator.optimiser_planning_existant(
+        planning,
+        budget_secondes=parametres['budget_secondes'],
+        graine=parametres.get('graine'),
+        iterations_max=parametres.get('iterations_max')
+    )
+
+
+def _sans_progression(pourcentage):
+    """Progression ignorée lors d'une exécution synchrone"""
+    pass
+
+
+
 # ============================================================================
 # ROUTES GÉNÉRATION DE PLANNING
 # ============================================================================
@@ -34,7 +148,13 @@ def generer_planning(current_user):
         "date_fin": "2024-03-15",
         "heures_etude_par_jour": 4.0,
         "jours_etude_par_semaine": 6,
-        "jours_repos": ["dimanche"]
+        "jours_repos": ["dimanche"],
+        "repartir_taches": false,
+        "mode": "jour",             // "semaine_type" (longues périodes) ou "allocation_lp" ; exclu avec moteur
+        "asynchrone": false,        // true : retourne un job à suivre via /jobs/<id>
+        "apercu": false,            // true : calcul sans écriture, sessions en colonnes
+        "flux": false,              // true : génération semaine par semaine, insertion par lots (plusieurs années)
+        "moteur": null              // nom d'un moteur du registre (GET /moteurs), prioritaire sur flux
     }
     """
     try:
@@ -61,22 +181,108 @@ def generer_planning(current_user):
         heures_etude_par_jour = data.get('heures_etude_par_jour', 4.0)
         jours_etude_par_semaine = data.get('jours_etude_par_semaine', 6)
         jours_repos = data.get('jours_repos', ['dimanche'])
+        repartir_taches = bool(data.get('repartir_taches', False))
+        mode = data.get('mode', MODE_JOUR)
+        
+        if mode not in MODES_GENERATION:
+            return error_response(
+                'Mode invalide',
+                f"Le mode doit être parmi : {', '.join(MODES_GENERATION)}",
+                400
+            )
+        
+        moteur = data.get('moteur')
+        
+        if moteur is not None and 'mode' in data:
+            # Les modes sont aussi des moteurs du registre : un seul des deux choisit le calcul
+            return error_response(
+                'Paramètres incompatibles',
+                "Indiquez soit mode, soit moteur (les modes sont disponibles comme moteurs : GET /moteurs)",
+                400
+            )
+        
+        if moteur is not None and moteur not in MOTEURS:
+            return error_response(
+                'Moteur invalide',
+                f"Le moteur doit être parmi : {', '.join(sorted(MOTEURS))}",
+                400
+            )
+        
+        parametres = {
+            'date_debut': date_debut.isoformat(),
+            'date_fin': date_fin.isoformat(),
+            'heures_etude_par_jour': heures_etude_par_jour,
+            'jours_etude_par_semaine': jours_etude_par_semaine,
+            'jours_repos': jours_repos,
+            'repartir_taches': repartir_taches,
+            'mode': mode,
+            'apercu': bool(data.get('apercu', False)),
+            'flux': bool(data.get('flux', False)),
+            'moteur': moteur
+        }
+        
+        if data.get('asynchrone'):
+            job = job_runner.soumettre('generation_planning', current_user.id, parametres)
+            
+            return success_response(
+                data=job.to_dict(),
+                message='Génération du planning lancée',
+                status_code=202
+            )
         
         # Générer le planning
-        generator = PlanningGenerator(current_user)
-        planning = generator.generer_planning_automatique(
-            date_debut=date_debut,
-            date_fin=date_fin,
-            heures_etude_par_jour=heures_etude_par_jour,
-            jours_etude_par_semaine=jours_etude_par_semaine,
-            jours_repos=jours_repos
+        resultat = _generer_planning(current_user.id, parametres, _sans_progression)
+        
+        return success_response(
+            data=resultat,
+            message='Aperçu du planning calculé' if parametres['apercu'] else 'Planning généré avec succès'
         )
         
+    except Exception as e:
+        db.session.rollback()
+        return error_response('Erreur serveur', str(e), 500)
+
+
+@bp.route('/moteurs', methods=['GET'])
+@jwt_required_custom
+def lister_moteurs(current_user):
+    """
+    Liste les moteurs de planification utilisables dans generer-planning
+    """
+    return success_response(data=[moteur.to_dict() for moteur in MOTEURS.values()])
+
+
+@bp.route('/enregistrer-apercu', methods=['POST'])
+@jwt_required_custom
+def enregistrer_apercu(current_user):
+    """
+    Enregistre un aperçu obtenu avec generer-planning ("apercu": true)
+    
+    Body JSON: l'aperçu tel que renvoyé (au minimum "parametres" et "sessions")
+    {
+        "parametres": {"date_debut": "2024-01-15", "date_fin": "2024-03-15", ...},
+        "sessions": {"jours": [...], "debuts_minutes": [...], "durees": [...],
+                     "matiere_ids": [...], "tache_ids": [...]}
+    }
+    """
+    try:
+        data = request.get_json()
+        
+        if not data:
+            return error_response('Champs manquants', 'L\'aperçu à enregistrer est requis', 400)
+        
+        generator = PlanningGenerator(current_user)
+        planning = generator.enregistrer_apercu(data)
+        
         return success_response(
             data=planning.to_dict(),
-            message='Planning généré avec succès'
+            message='Planning enregistré avec succès',
+            status_code=201
         )
         
+    except ValueError as e:
+        db.session.rollback()
+        return error_response('Aperçu invalide', str(e), 400)
     except Exception as e:
         db.session.rollback()
         return error_response('Erreur serveur', str(e), 500)
@@ -87,6 +293,14 @@ def generer_planning(current_user):
 def optimiser_planning(planning_id, current_user):
     """
     Optimise un planning existant
+    
+    Body JSON (optionnel):
+    {
+        "budget_secondes": 2.0,     // Ignoré avec une graine
+        "graine": 42,               // Résultat reproductible : arrêt au nombre d'itérations
+        "iterations_max": 200000,   // 2 000 000 au plus
+        "asynchrone": false
+    }
     """
     try:
         planning = Planning.query.get(planning_id)
@@ -95,17 +309,259 @@ def optimiser_planning(planning_id, current_user):
             return error_response('Planning introuvable', f'Aucun planning avec l\'ID {planning_id}', 404)
         
         # Vérifier ownership
-        if planning.utilisateur_id != current_user.id:
+        if planning.user_id != current_user.id:
             return error_response('Accès refusé', 'Ce planning ne vous appartient pas', 403)
         
+        data = request.get_json(silent=True) or {}
+        parametres = {
+            'planning_id': planning.id,
+            'budget_secondes': max(0.0, min(float(data.get('budget_secondes', 2.0)), 30.0)),
+            'graine': data.get('graine'),
+            'iterations_max': max(min(int(data['iterations_max']), 2000000), 1) if data.get('iterations_max') else None
+        }
+        
+        if data.get('asynchrone'):
+            job = job_runner.soumettre('optimisation_planning', current_user.id, parametres)
+            
+            return success_response(
+                data=job.to_dict(),
+                message='Optimisation du planning lancée',
+                status_code=202
+            )
+        
         # Optimiser
-        resultat = PlanningGenerator.optimiser_planning_existant(planning)
+        resultat = _optimiser_planning(current_user.id, parametres, _sans_progression)
         
         return success_response(
             data=resultat,
             message='Planning optimisé'
         )
         
+    except Exception as e:
+        db.session.rollback()
+        return error_response('Erreur serveur', str(e), 500)
+
+
+@bp.route('/replanifier/<int:planning_id>', methods=['POST'])
+@jwt_required_custom
+def replanifier(planning_id, current_user):
+    """
+    Replanifie la partie future d'un planning après une modification
+    des matières ou des tâches, sans recréer le planning
+    
+    Body JSON (optionnel):
+    {
+        "date_debut": "2024-02-01",    // défaut : aujourd'hui
+        "date_fin": "2024-02-15"       // défaut : fin du planning
+    }
+    """
+    try:
+        planning = Planning.query.get(planning_id)
+        
+        if not planning:
+            return error_response('Planning introuvable', f'Aucun planning avec l\'ID {planning_id}', 404)
+        
+        # Vérifier ownership
+        if planning.user_id != current_user.id:
+            return error_response('Accès refusé', 'Ce planning ne vous appartient pas', 403)
+        
+        data = request.get_json(silent=True) or {}
+        date_debut = validate_date(data['date_debut'], 'Date début') if data.get('date_debut') else None
+        date_fin = validate_date(data['date_fin'], 'Date fin') if data.get('date_fin') else None
+        
+        resultat = PlanningGenerator.replanifier_planning(
+            planning,
+            date_debut=date_debut,
+            date_fin=date_fin
+        )
+        
+        return success_response(
+            data=resultat,
+            message='Planning replanifié'
+        )
+        
+    except ValidationError as e:
+        return error_response('Erreur de validation', str(e), 400)
+    except Exception as e:
+        db.session.rollback()
+        return error_response('Erreur serveur', str(e), 500)
+
+
+@bp.route('/scenarios', methods=['POST'])
+@jwt_required_custom
+def comparer_scenarios(current_user):
+    """
+    Évalue en parallèle plusieurs variantes de paramètres de génération
+    et retourne les plannings non dominés (score, heures totales, couverture des examens)
+    
+    Body JSON:
+    {
+        "date_debut": "2024-01-15",
+        "date_fin": "2024-03-15",
+        "base": {"jours_etude_par_semaine": 6},            // optionnel
+        "variantes": {
+            "heures_etude_par_jour": [3, 4, 5],
+            "jours_repos": [["dimanche"], ["samedi", "dimanche"]],
+            "duree_session": [45, 60, 90],
+            "mode": ["jour", "allocation_lp"]
+        }
+    }
+    """
+    try:
+        data = request.get_json()
+        
+        if not data or 'date_debut' not in data or 'date_fin' not in data:
+            return error_response(
+                'Champs manquants',
+                'date_debut et date_fin sont requis',
+                400
+            )
+        
+        date_debut = validate_date(data['date_debut'], 'Date début')
+        date_fin = validate_date(data['date_fin'], 'Date fin')
+        
+        if date_fin <= date_debut:
+            return error_response(
+                'Dates invalides',
+                'La date de fin doit être après la date de début',
+                400
+            )
+        
+        grille = data.get('variantes') or {}
+        modes_inconnus = set(grille.get('mode', [])) - set(MODES_GENERATION)
+        if modes_inconnus:
+            return error_response(
+                'Mode invalide',
+                f"Le mode doit être parmi : {', '.join(MODES_GENERATION)}",
+                400
+            )
+        
+        base = dict(data.get('base') or {}, date_debut=date_debut.isoformat(), date_fin=date_fin.isoformat())
+        
+        resultat = evaluer_scenarios(
+            current_user,
+            base,
+            grille,
+            max_variantes=current_app.config['SCENARIOS_MAX_VARIANTES'],
+            processus=current_app.config['SCENARIOS_PROCESSUS']
+        )
+        
+        return success_response(
+            data=resultat,
+            message=f"{len(resultat['pareto'])} scénario(s) non dominé(s) sur {resultat['variantes_evaluees']}"
+        )
+        
+    except (ValidationError, ValueError) as e:
+        return error_response('Erreur de validation', str(e), 400)
+    except Exception as e:
+        return error_response('Erreur serveur', str(e), 500)
+
+
+# ============================================================================
+# ROUTES SUIVI DES JOBS
+# ============================================================================
+
+@bp.route('/jobs/<int:job_id>', methods=['GET'])
+@jwt_required_custom
+def get_job(job_id, current_user):
+    """
+    Retourne le statut, la progression et le résultat d'un job
+    """
+    try:
+        job = Job.query.get(job_id)
+        
+        if not job:
+            return error_response('Job introuvable', f'Aucun job avec l\'ID {job_id}', 404)
+        
+        # Vérifier ownership
+        if job.user_id != current_user.id:
+            return error_response('Accès refusé', 'Ce job ne vous appartient pas', 403)
+        
+        return success_response(data=job.to_dict())
+        
+    except Exception as e:
+        return error_response('Erreur serveur', str(e), 500)
+
+
+# ============================================================================
+# ROUTES SUGGESTIONS DE SUJETS
+# ============================================================================
+
+@bp.route('/suggestions-sujets', methods=['GET'])
+@jwt_required_custom
+def suggestions_sujets(current_user):
+    """
+    Suggère des sujets d'étude pour toutes les matières non archivées
+    
+    Query params:
+        niveau: 'facile', 'moyen' ou 'difficile' (défaut : déduit de la
+            difficulté de chaque matière)
+    """
+    try:
+        niveau = request.args.get('niveau')
+        
+        if niveau is not None and niveau not in CatalogueSujets.NIVEAUX:
+            return error_response(
+                'Niveau invalide',
+                f"Le niveau doit être parmi : {', '.join(CatalogueSujets.NIVEAUX)}",
+                400
+            )
+        
+        matieres = current_user.matieres.filter_by(archivee=False).all()
+        suggestions = PlanningAI().suggest_study_topics_batch(
+            [
+                {'id': matiere.id, 'nom': matiere.nom, 'niveau_difficulte': matiere.niveau_difficulte}
+                for matiere in matieres
+            ],
+            niveau_difficulte=niveau
+        )
+        
+        return success_response(data=suggestions)
+        
+    except Exception as e:
+        return error_response('Erreur serveur', str(e), 500)
+
+
+# ============================================================================
+# ROUTES HABITUDES D'ÉTUDE
+# ============================================================================
+
+@bp.route('/habitudes-etude', methods=['GET'])
+@jwt_required_custom
+def habitudes_etude(current_user):
+    """
+    Analyse les habitudes d'étude à partir des agrégats journaliers
+    
+    Query params:
+        jours: nombre de jours analysés jusqu'à aujourd'hui (défaut: 30)
+        date_debut, date_fin: période explicite (YYYY-MM-DD), prioritaire sur jours
+    """
+    try:
+        if request.args.get('date_debut') and request.args.get('date_fin'):
+            date_debut = validate_date(request.args['date_debut'], 'Date début')
+            date_fin = validate_date(request.args['date_fin'], 'Date fin')
+        else:
+            jours = request.args.get('jours', 30, type=int)
+            date_fin = datetime.utcnow().date()
+            date_debut = date_fin - timedelta(days=max(jours, 1) - 1)
+        
+        if date_fin < date_debut:
+            return error_response(
+                'Dates invalides',
+                'La date de fin doit être après la date de début',
+                400
+            )
+        
+        analyse = StatistiqueEtude.analyser_periode(current_user.id, date_debut, date_fin)
+        analyse['periode'] = {
+            'date_debut': date_debut.isoformat(),
+            'date_fin': date_fin.isoformat()
+        }
+        
+        return success_response(data=analyse)
+        
+    except ValidationError as e:
+        return error_response('Paramètres invalides', str(e), 400)
     except Exception as e:
         return error_response('Erreur serveur', str(e), 500)
 
@@ -118,7 +574,7 @@ def optimiser_planning(planning_id, current_user):
 @jwt_required_custom
 def analyser_pdf(emploi_id, current_user):
     """
-    Lance l'analyse d'un emploi du temps PDF
+    Lance l'analyse d'un emploi du temps PDF (placée dans la file d'analyse)
     """
     try:
         emploi = EmploiDuTemps.query.get(emploi_id)
@@ -127,25 +583,32 @@ def analyser_pdf(emploi_id, current_user):
             return error_response('Emploi du temps introuvable', f'Aucun emploi avec l\'ID {emploi_id}', 404)
         
         # Vérifier ownership
-        if emploi.utilisateur_id != current_user.id:
+        if emploi.user_id != current_user.id:
             return error_response('Accès refusé', 'Cet emploi du temps ne vous appartient pas', 403)
         
-        # Analyser
-        analyzer = PDFAnalyzer(emploi)
-        resultat = analyzer.analyser()
+        mode = (request.get_json(silent=True) or {}).get('mode', MODE_AUTO)
+        if mode not in MODES_EXTRACTION:
+            return error_response('Mode invalide', f"mode doit être parmi : {', '.join(MODES_EXTRACTION)}", 400)
         
-        if resultat['success']:
-            return success_response(
-                data={
-                    'emploi_du_temps': emploi.to_dict(include_cours=True),
-                    'analyse': resultat
-                },
-                message=resultat['message']
-            )
-        else:
-            return error_response('Erreur analyse', resultat['message'], 500)
+        try:
+            file_analyse_pdf.soumettre(emploi, mode)
+        except FileAnalysePleine as e:
+            return error_response('Service surchargé', str(e), 503)
+        
+        if emploi.statut_analyse == 'echoue':
+            return error_response('Erreur analyse', emploi.erreur_analyse, 500)
+        
+        return success_response(
+            data={
+                'emploi_du_temps': emploi.to_dict(include_cours=emploi.statut_analyse == 'termine'),
+                'file': file_analyse_pdf.statistiques()
+            },
+            message='Analyse terminée' if emploi.statut_analyse == 'termine' else 'Analyse placée dans la file',
+            status_code=200 if emploi.statut_analyse == 'termine' else 202
+        )
         
     except Exception as e:
+        db.session.rollback()
         return error_response('Erreur serveur', str(e), 500)
 
 
@@ -161,7 +624,7 @@ def creneaux_libres(emploi_id, current_user):
         if not emploi:
             return error_response('Emploi du temps introuvable', f'Aucun emploi avec l\'ID {emploi_id}', 404)
         
-        if emploi.utilisateur_id != current_user.id:
+        if emploi.user_id != current_user.id:
             return error_response('Accès refusé', 'Cet emploi du temps ne vous appartient pas', 403)
         
         creneaux = PDFAnalyzer.detecter_creneaux_libres(emploi)
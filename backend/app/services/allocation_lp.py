@@ -0,0 +1,298 @@
+"""
+Allocation optimale des créneaux par programmation linéaire
+Affectation matières -> créneaux formulée comme un flot à coût minimal
+(source -> matière -> (matière, jour) -> créneau -> jour -> puits) et
+résolue en une fois avec le solveur HiGHS de scipy
+"""
+
+import time as chrono
+from datetime import date
+from typing import List, Dict, Optional
+
+import numpy as np
+from scipy.optimize import Bounds, LinearConstraint, linprog, milp
+from scipy.sparse import coo_matrix
+
+from app.services.planning_optimizer import OptimiseurPlanning
+
+
+class AllocateurLP:
+    """
+    Affecte les matières aux créneaux libres en maximisant l'utilité totale
+    
+    Variables : x[créneau, matière] dans [0, 1] et, par matière, un
+    dépassement e >= 0 de la cible. Contraintes :
+      - au plus une session par créneau ;
+      - au plus `max_sessions_par_jour` sessions par jour ;
+      - au plus `max_sessions_matiere_jour` sessions d'une matière par jour ;
+      - sessions d'une matière <= cible + dépassement (dépassement pénalisé).
+    Les lignes forment deux familles laminaires (créneau dans jour,
+    matière-jour dans matière) : la matrice est totalement unimodulaire et,
+    les cibles étant arrondies à l'entier, une solution de base du simplexe
+    est entière. Le résultat est vérifié ; une solution fractionnaire est
+    résolue à nouveau en nombres entiers (milp).
+    """
+    
+    # Préférence pour les créneaux tôt dans la journée (départage uniquement)
+    POIDS_HEURE = 1e-3
+    
+    # Au-delà de ce nombre de couples (créneau, matière), la résolution dépasse
+    # quelques secondes : l'appelant doit se replier sur une heuristique. Une
+    # année de 8 créneaux par jour pour 40 matières (~117 000 couples) se
+    # résout en 2 s environ
+    PAIRES_MAX = 150000
+    
+    # Écart toléré entre une valeur de la solution et l'entier le plus proche
+    TOLERANCE_ENTIER = 1e-6
+    
+    def __init__(self, creneaux: List[Dict], poids_matieres: Dict[int, float],
+                 dates_examen: Dict[int, Optional[date]] = None,
+                 max_sessions_par_jour: int = None,
+                 max_sessions_matiere_jour: int = 2,
+                 cibles: Dict[int, float] = None,
+                 penalite_depassement: float = 0.25):
+        """
+        Initialise l'allocateur
+        
+        Args:
+            creneaux: Créneaux libres ({'debut': datetime, 'duree': minutes})
+            poids_matieres: Poids de priorité par matière (coefficient, priorité, examen)
+            dates_examen: Date d'examen par matière (None si aucune) ; aucune
+                session n'est placée après l'examen
+            max_sessions_par_jour: Nombre maximal de sessions par jour (None = illimité)
+            max_sessions_matiere_jour: Nombre maximal de sessions d'une matière par jour
+            cibles: Nombre de sessions visé par matière, arrondi à l'entier
+                inférieur (None = capacité répartie proportionnellement aux poids)
+            penalite_depassement: Coût d'une session au-delà de la cible
+        """
+        self.creneaux = creneaux
+        self.poids_matieres = poids_matieres
+        self.dates_examen = dates_examen or {}
+        self.max_sessions_matiere_jour = max_sessions_matiere_jour
+        self.penalite_depassement = penalite_depassement
+        
+        self.matiere_ids = list(poids_matieres.keys())
+        
+        # Index de jour (0..n) de chaque créneau
+        jours = sorted({c['debut'].date() for c in creneaux})
+        self.jours = jours
+        index_jour = {jour: index for index, jour in enumerate(jours)}
+        self.jour_creneau = np.array([index_jour[c['debut'].date()] for c in creneaux], dtype=np.intp)
+        
+        if max_sessions_par_jour is None:
+            max_sessions_par_jour = len(creneaux)
+        self.max_sessions_par_jour = max_sessions_par_jour
+        
+        if cibles is None:
+            cibles = self._cibles_proportionnelles()
+        self.cibles = {matiere_id: int(cible) for matiere_id, cible in cibles.items()}
+    
+    def _cibles_proportionnelles(self) -> Dict[int, float]:
+        """
+        Répartit la capacité totale entre les matières au prorata des poids
+        
+        Méthode du plus fort reste : chaque matière reçoit la partie entière
+        de sa part, les sessions restantes vont aux plus grandes parties
+        décimales. Les cibles sont entières et leur somme vaut la capacité.
+        
+        Returns:
+            Nombre de sessions visé par matière
+        """
+        creneaux_par_jour = np.bincount(self.jour_creneau, minlength=len(self.jours))
+        capacite = int(np.minimum(creneaux_par_jour, self.max_sessions_par_jour).sum())
+        total_poids = sum(self.poids_matieres.values()) or 1.0
+        
+        parts = {
+            matiere_id: capacite * poids / total_poids
+            for matiere_id, poids in self.poids_matieres.items()
+        }
+        cibles = {matiere_id: int(part) for matiere_id, part in parts.items()}
+        
+        restantes = capacite - sum(cibles.values())
+        par_reste = sorted(parts, key=lambda matiere_id: parts[matiere_id] - cibles[matiere_id], reverse=True)
+        for matiere_id in par_reste[:restantes]:
+            cibles[matiere_id] += 1
+        
+        return cibles
+    
+    def _utilite(self, matiere_id: int, jour: date) -> Optional[float]:
+        """
+        Valeur d'une session d'une matière placée un jour donné
+        
+        Même barème que la recherche locale : bonus croissant à l'approche
+        de l'examen, aucune session possible après.
+        
+        Args:
+            matiere_id: Matière de la session
+            jour: Date du créneau
+        
+        Returns:
+            Utilité de la session, None si la matière n'est plus révisable
+        """
+        poids = self.poids_matieres.get(matiere_id, 1.0)
+        date_examen = self.dates_examen.get(matiere_id)
+        
+        if not date_examen:
+            return poids
+        
+        jours_avant = (date_examen - jour).days
+        fenetre = OptimiseurPlanning.FENETRE_EXAMEN_JOURS
+        
+        if jours_avant < 0:
+            return None
+        
+        if jours_avant <= fenetre:
+            return poids * (2 - jours_avant / fenetre)
+        
+        return poids
+    
+    def resoudre(self) -> Dict:
+        """
+        Construit et résout le programme linéaire
+        
+        Returns:
+            Dict avec les affectations (index créneau, matière) triées par
+            créneau, le statut du solveur, l'objectif et la durée. Le statut
+            'trop_grand' (aucune affectation) signale un problème de plus de
+            PAIRES_MAX couples
+        """
+        debut = chrono.perf_counter()
+        
+        nombre_creneaux = len(self.creneaux)
+        nombre_matieres = len(self.matiere_ids)
+        nombre_jours = len(self.jours)
+        
+        if not nombre_creneaux or not nombre_matieres:
+            return self._resultat([], 'vide', 0.0, debut)
+        
+        # Utilité de chaque couple (créneau, matière) ; None = couple interdit
+        utilites_jour = [
+            [self._utilite(matiere_id, jour) for matiere_id in self.matiere_ids]
+            for jour in self.jours
+        ]
+        
+        paires_creneau = []
+        paires_matiere = []
+        couts = []
+        
+        for index_creneau, creneau in enumerate(self.creneaux):
+            minute = creneau['debut'].hour * 60 + creneau['debut'].minute
+            utilites = utilites_jour[self.jour_creneau[index_creneau]]
+            
+            for index_matiere, utilite in enumerate(utilites):
+                if utilite is None:
+                    continue
+                paires_creneau.append(index_creneau)
+                paires_matiere.append(index_matiere)
+                couts.append(-(utilite - self.POIDS_HEURE * minute / 1440))
+        
+        if not couts:
+            return self._resultat([], 'vide', 0.0, debut)
+        
+        if len(couts) > self.PAIRES_MAX:
+            return self._resultat([], 'trop_grand', 0.0, debut)
+        
+        paires_creneau = np.array(paires_creneau, dtype=np.intp)
+        paires_matiere = np.array(paires_matiere, dtype=np.intp)
+        nombre_paires = len(paires_creneau)
+        paires_jour = self.jour_creneau[paires_creneau]
+        
+        # Lignes de contraintes, par blocs
+        ligne_jour = nombre_creneaux
+        ligne_matiere_jour = ligne_jour + nombre_jours
+        ligne_cible = ligne_matiere_jour + nombre_matieres * nombre_jours
+        nombre_lignes = ligne_cible + nombre_matieres
+        
+        indices_paires = np.arange(nombre_paires)
+        indices_depassement = nombre_paires + np.arange(nombre_matieres)
+        
+        lignes = np.concatenate([
+            paires_creneau,
+            ligne_jour + paires_jour,
+            ligne_matiere_jour + paires_matiere * nombre_jours + paires_jour,
+            ligne_cible + paires_matiere,
+            ligne_cible + np.arange(nombre_matieres)
+        ])
+        colonnes = np.concatenate([
+            indices_paires, indices_paires, indices_paires, indices_paires,
+            indices_depassement
+        ])
+        valeurs = np.concatenate([
+            np.ones(4 * nombre_paires),
+            -np.ones(nombre_matieres)
+        ])
+        
+        matrice = coo_matrix(
+            (valeurs, (lignes, colonnes)),
+            shape=(nombre_lignes, nombre_paires + nombre_matieres)
+        ).tocsr()
+        
+        bornes_lignes = np.concatenate([
+            np.ones(nombre_creneaux),
+            np.full(nombre_jours, self.max_sessions_par_jour, dtype=float),
+            np.full(nombre_matieres * nombre_jours, self.max_sessions_matiere_jour, dtype=float),
+            np.array([self.cibles.get(matiere_id, 0.0) for matiere_id in self.matiere_ids])
+        ])
+        
+        vecteur_couts = np.concatenate([
+            np.array(couts),
+            np.full(nombre_matieres, self.penalite_depassement)
+        ])
+        bornes_variables = [(0, 1)] * nombre_paires + [(0, None)] * nombre_matieres
+        
+        solution = linprog(
+            vecteur_couts,
+            A_ub=matrice,
+            b_ub=bornes_lignes,
+            bounds=bornes_variables,
+            method='highs-ds'
+        )
+        
+        if solution.status != 0:
+            return self._resultat([], solution.message, 0.0, debut)
+        
+        valeurs_paires = solution.x[:nombre_paires]
+        if not self._est_entiere(valeurs_paires):
+            # Sommet fractionnaire (tolérances du solveur) : résolution en nombres entiers
+            solution = milp(
+                vecteur_couts,
+                constraints=LinearConstraint(matrice, ub=bornes_lignes),
+                bounds=Bounds(
+                    np.zeros(nombre_paires + nombre_matieres),
+                    np.concatenate([np.ones(nombre_paires), np.full(nombre_matieres, np.inf)])
+                ),
+                integrality=np.concatenate([np.ones(nombre_paires), np.zeros(nombre_matieres)])
+            )
+            if solution.status != 0:
+                return self._resultat([], solution.message, 0.0, debut)
+            valeurs_paires = solution.x[:nombre_paires]
+        
+        if not self._est_entiere(valeurs_paires):
+            raise ValueError("Le solveur a renvoyé une affectation fractionnaire")
+        
+        choisies = np.nonzero(np.rint(valeurs_paires))[0]
+        affectations = sorted(
+            (int(paires_creneau[p]), self.matiere_ids[paires_matiere[p]])
+            for p in choisies
+        )
+        
+        return self._resultat(affectations, 'optimal', -solution.fun, debut)
+    
+    def _est_entiere(self, valeurs: np.ndarray) -> bool:
+        """Vrai si toutes les valeurs sont entières (à la tolérance près)"""
+        return bool(np.all(np.abs(valeurs - np.rint(valeurs)) <= self.TOLERANCE_ENTIER))
+    
+    def _resultat(self, affectations: List[tuple], statut: str,
+                  objectif: float, debut: float) -> Dict:
+        """
+        Met en forme le résultat de la résolution
+        
+        Returns:
+            Dict avec affectations et statistiques
+        """
+        return {
+            'affectations': affectations,
+            'statut': statut,
+            'objectif': round(objectif, 3),
+            'duree_secondes': round(chrono.perf_counter() - debut, 3)
+        }
@@ -0,0 +1,144 @@
+"""
+Cache des plannings générés, adressé par le contenu
+La génération est une fonction pure de ses entrées (matières, tâches, emploi du
+temps, préférences, période, mode) : le résultat est mémorisé sous l'empreinte
+SHA-256 de ces entrées. Les dates de modification des lignes font partie de
+l'empreinte, une modification rend donc l'ancienne entrée inaccessible ; elle
+est ensuite évincée par l'ordre LRU
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+def empreinte(composants: Dict) -> str:
+    """
+    Calcule l'empreinte stable d'un ensemble d'entrées
+    
+    Les dictionnaires sont sérialisés avec des clés triées ; les dates et
+    heures sont converties en texte ISO.
+    
+    Args:
+        composants: Entrées de la génération (types JSON, dates, heures)
+    
+    Returns:
+        Empreinte hexadécimale SHA-256
+    """
+    canonique = json.dumps(composants, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonique.encode('utf-8')).hexdigest()
+
+
+class CachePlannings:
+    """
+    Cache LRU borné en nombre d'entrées et en nombre total de sessions
+    
+    Partagé par les threads de requêtes et de jobs d'un processus ; les
+    valeurs mémorisées ne doivent pas être modifiées par les appelants.
+    """
+    
+    def __init__(self, max_entrees: int = 128, max_sessions: int = 100000):
+        self.max_entrees = max_entrees
+        self.max_sessions = max_sessions
+        self.entrees = OrderedDict()
+        self.sessions_total = 0
+        self.succes = 0
+        self.echecs = 0
+        self.evictions = 0
+        self.verrou = threading.Lock()
+    
+    def init_app(self, app):
+        """
+        Applique les limites de la configuration et vide le cache
+        
+        Args:
+            app: Application Flask (CACHE_PLANNINGS_MAX_ENTREES, CACHE_PLANNINGS_MAX_SESSIONS)
+        """
+        self.max_entrees = app.config.get('CACHE_PLANNINGS_MAX_ENTREES', self.max_entrees)
+        self.max_sessions = app.config.get('CACHE_PLANNINGS_MAX_SESSIONS', self.max_sessions)
+        self.vider()
+        app.extensions['cache_plannings'] = self
+    
+    @property
+    def actif(self) -> bool:
+        """Le cache est désactivé par une limite à 0"""
+        return self.max_entrees > 0 and self.max_sessions > 0
+    
+    def obtenir(self, cle: str) -> Optional[Any]:
+        """
+        Retourne la valeur mémorisée et la marque comme récemment utilisée
+        
+        Args:
+            cle: Empreinte des entrées
+        
+        Returns:
+            Valeur mémorisée ou None
+        """
+        with self.verrou:
+            entree = self.entrees.get(cle)
+            
+            if entree is None:
+                self.echecs += 1
+                return None
+            
+            self.entrees.move_to_end(cle)
+            self.succes += 1
+            return entree[0]
+    
+    def enregistrer(self, cle: str, valeur: Any, taille: int):
+        """
+        Mémorise une valeur puis évince les entrées les moins récemment utilisées
+        
+        Args:
+            cle: Empreinte des entrées
+            valeur: Résultat de la génération
+            taille: Nombre de sessions du résultat
+        """
+        if not self.actif or taille > self.max_sessions:
+            return
+        
+        with self.verrou:
+            ancienne = self.entrees.pop(cle, None)
+            if ancienne is not None:
+                self.sessions_total -= ancienne[1]
+            
+            self.entrees[cle] = (valeur, taille)
+            self.sessions_total += taille
+            
+            while len(self.entrees) > self.max_entrees or self.sessions_total > self.max_sessions:
+                _, (_, taille_evincee) = self.entrees.popitem(last=False)
+                self.sessions_total -= taille_evincee
+                self.evictions += 1
+    
+    def vider(self):
+        """Supprime toutes les entrées et remet les compteurs à zéro"""
+        with self.verrou:
+            self.entrees.clear()
+            self.sessions_total = 0
+            self.succes = 0
+            self.echecs = 0
+            self.evictions = 0
+    
+    def statistiques(self) -> Dict:
+        """
+        Retourne l'état du cache
+        
+        Returns:
+            Entrées, sessions mémorisées, succès, échecs, évictions et taux de succès
+        """
+        with self.verrou:
+            demandes = self.succes + self.echecs
+            return {
+                'entrees': len(self.entrees),
+                'sessions': self.sessions_total,
+                'succes': self.succes,
+                'echecs': self.echecs,
+                'evictions': self.evictions,
+                'taux_succes': round(self.succes / demandes, 3) if demandes else 0.0
+            }
+
+
+# Instance partagée, initialisée dans create_app
+cache_plannings = CachePlannings()
@@ -0,0 +1,219 @@
+"""
+Moteur de disponibilités à la minute
+Chaque jour est représenté par un tableau booléen NumPy de 1440 minutes :
+les cours, les sessions existantes et les heures hors productivité y sont
+combinés par OU logique, puis les plages libres sont extraites en une passe
+vectorisée sur l'ensemble des jours
+"""
+
+from datetime import datetime, time
+from typing import List, Tuple, Iterable
+
+import numpy as np
+
+
+MINUTES_PAR_JOUR = 1440
+
+JOURS_SEMAINE = ['lundi', 'mardi', 'mercredi', 'jeudi', 'vendredi', 'samedi', 'dimanche']
+
+
+def vers_minutes(valeur) -> int:
+    """
+    Convertit une heure en nombre de minutes depuis minuit
+    
+    Args:
+        valeur: Heure (time, datetime, chaîne 'HH:MM' ou minutes)
+    
+    Returns:
+        Nombre de minutes (0-1440)
+    """
+    if isinstance(valeur, (int, np.integer)):
+        return int(valeur)
+    
+    if isinstance(valeur, (time, datetime)):
+        return valeur.hour * 60 + valeur.minute
+    
+    heures, minutes = str(valeur).strip().replace('h', ':').split(':')[:2]
+    return int(heures) * 60 + int(minutes or 0)
+
+
+def vers_time(minutes: int) -> time:
+    """
+    Convertit un nombre de minutes depuis minuit en objet time
+    
+    Args:
+        minutes: Minutes depuis minuit (1440 = fin de journée)
+    
+    Returns:
+        Objet time (23:59 pour la fin de journée)
+    """
+    minutes = min(int(minutes), MINUTES_PAR_JOUR - 1)
+    return time(minutes // 60, minutes % 60)
+
+
+class GrilleDisponibilites:
+    """
+    Grille d'occupation minute par minute sur plusieurs jours
+    
+    La ligne i correspond au jour i : un jour de la semaine (0 = lundi)
+    pour une grille hebdomadaire, ou une date pour une grille de période.
+    """
+    
+    def __init__(self, nombre_jours: int = 7):
+        """
+        Initialise une grille entièrement libre
+        
+        Args:
+            nombre_jours: Nombre de lignes (jours) de la grille
+        """
+        self.occupe = np.zeros((nombre_jours, MINUTES_PAR_JOUR), dtype=bool)
+    
+    @classmethod
+    def depuis_tableau(cls, occupe: np.ndarray) -> 'GrilleDisponibilites':
+        """
+        Construit une grille à partir d'un tableau d'occupation existant
+        
+        Args:
+            occupe: Tableau booléen (jours x 1440)
+        
+        Returns:
+            Nouvelle grille (le tableau est copié)
+        """
+        grille = cls(0)
+        grille.occupe = np.array(occupe, dtype=bool, copy=True)
+        return grille
+    
+    @property
+    def nombre_jours(self) -> int:
+        return self.occupe.shape[0]
+    
+    def copier(self) -> 'GrilleDisponibilites':
+        """Retourne une copie indépendante de la grille"""
+        return GrilleDisponibilites.depuis_tableau(self.occupe)
+    
+    def occuper(self, jour: int, debut, fin):
+        """
+        Marque un intervalle comme occupé
+        
+        Args:
+            jour: Index du jour dans la grille
+            debut: Heure de début
+            fin: Heure de fin (exclue)
+        """
+        self.occupe[jour, vers_minutes(debut):vers_minutes(fin)] = True
+    
+    def occuper_intervalles(self, intervalles: Iterable[Tuple[int, object, object]]):
+        """
+        Marque un ensemble d'intervalles comme occupés en une opération vectorisée
+        
+        Les bornes sont cumulées (+1 au début, -1 à la fin) puis intégrées
+        ligne par ligne : une minute est occupée si le cumul est positif.
+        
+        Args:
+            intervalles: Triplets (jour, debut, fin)
+        """
+        intervalles = list(intervalles)
+        if not intervalles:
+            return
+        
+        jours = np.array([jour for jour, _, _ in intervalles], dtype=np.intp)
+        debuts = np.array([vers_minutes(debut) for _, debut, _ in intervalles], dtype=np.intp)
+        fins = np.array([vers_minutes(fin) for _, _, fin in intervalles], dtype=np.intp)
+        
+        valides = fins > debuts
+        bornes = np.zeros((self.nombre_jours, MINUTES_PAR_JOUR + 1), dtype=np.int32)
+        np.add.at(bornes, (jours[valides], debuts[valides]), 1)
+        np.add.at(bornes, (jours[valides], fins[valides]), -1)
+        
+        self.occupe |= np.cumsum(bornes, axis=1)[:, :MINUTES_PAR_JOUR] > 0
+    
+    def limiter_plage(self, debut, fin):
+        """
+        Marque comme occupé tout ce qui est hors de la plage [debut, fin[
+        
+        Args:
+            debut: Heure de début de la plage utilisable
+            fin: Heure de fin de la plage utilisable
+        """
+        self.occupe[:, :vers_minutes(debut)] = True
+        self.occupe[:, vers_minutes(fin):] = True
+    
+    def bloquer_jours(self, jours: Iterable[int]):
+        """
+        Marque des jours entiers comme occupés (jours de repos)
+        
+        Args:
+            jours: Index des jours à bloquer
+        """
+        self.occupe[list(jours)] = True
+    
+    def plages_libres(self, duree_min: int = 1) -> List[List[Tuple[int, int]]]:
+        """
+        Extrait les plages libres d'au moins `duree_min` minutes, pour tous les jours
+        
+        Args:
+            duree_min: Durée minimale d'une plage en minutes
+        
+        Returns:
+            Pour chaque jour, la liste des plages (debut, fin) en minutes
+        """
+        nombre_jours = self.nombre_jours
+        libre = np.zeros((nombre_jours, MINUTES_PAR_JOUR + 2), dtype=np.int8)
+        libre[:, 1:-1] = ~self.occupe
+        
+        # +1 au début d'une plage libre, -1 juste après sa fin
+        transitions = np.diff(libre, axis=1)
+        jours_debut, debuts = np.nonzero(transitions == 1)
+        _, fins = np.nonzero(transitions == -1)
+        
+        garde = (fins - debuts) >= max(duree_min, 1)
+        
+        plages = [[] for _ in range(nombre_jours)]
+        for jour, debut, fin in zip(jours_debut[garde].tolist(), debuts[garde].tolist(), fins[garde].tolist()):
+            plages[jour].append((debut, fin))
+        
+        return plages
+    
+    def creneaux(self, duree: int, pause: int = 0) -> List[List[int]]:
+        """
+        Découpe les plages libres en créneaux consécutifs de `duree` minutes
+        
+        Args:
+            duree: Durée d'un créneau en minutes
+            pause: Pause entre deux créneaux consécutifs en minutes
+        
+        Returns:
+            Pour chaque jour, la liste des minutes de début des créneaux
+        """
+        pas = duree + pause
+        
+        return [
+            [minute for debut, fin in plages_jour for minute in range(debut, fin - duree + 1, pas)]
+            for plages_jour in self.plages_libres(duree)
+        ]
+    
+    @classmethod
+    def semaine_depuis_cours(cls, cours: Iterable, heure_debut=None,
+                             heure_fin=None) -> 'GrilleDisponibilites':
+        """
+        Construit la grille hebdomadaire d'un emploi du temps
+        
+        Args:
+            cours: Cours (attributs jour_semaine, heure_debut, heure_fin)
+            heure_debut: Début de la plage utilisable (None = minuit)
+            heure_fin: Fin de la plage utilisable (None = fin de journée)
+        
+        Returns:
+            Grille de 7 jours (0 = lundi)
+        """
+        grille = cls(len(JOURS_SEMAINE))
+        grille.occuper_intervalles(
+            (JOURS_SEMAINE.index(c.jour_semaine.strip().lower()), c.heure_debut, c.heure_fin)
+            for c in cours
+            if c.jour_semaine and c.jour_semaine.strip().lower() in JOURS_SEMAINE
+        )
+        
+        if heure_debut is not None or heure_fin is not None:
+            grille.limiter_plage(heure_debut or 0, heure_fin or MINUTES_PAR_JOUR)
+        
+        return grille
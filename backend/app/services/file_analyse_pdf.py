@@ -0,0 +1,379 @@
+"""
+File d'analyse des emplois du temps PDF
+L'extraction du texte et la détection des cours (coûteuses en CPU) sont
+exécutées dans un pool de processus borné ; l'enregistrement des cours et le
+suivi du statut (en_attente, en_cours, termine, echoue) restent dans le
+processus de l'API, sur la table emplois_du_temps. Un PDF déjà analysé (même
+empreinte SHA-256) reprend l'extraction mise en cache sans être relu
+"""
+
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from typing import Dict, List
+
+from sqlalchemy import update
+from sqlalchemy.exc import SQLAlchemyError
+
+from app import db
+from app.models.cache_extraction import CacheExtraction
+from app.models.emploi_du_temps import EmploiDuTemps
+from app.services.pdf_analyzer import (
+    PDFAnalyzer, MODE_AUTO, PAGES_PAR_LOT, VERSION_ANALYSEUR, compter_pages, extraire_cours_pdf
+)
+from app.utils.helpers import calculer_empreinte_fichier
+
+
+class FileAnalysePleine(Exception):
+    """Levée quand la file d'analyse a atteint sa capacité maximale"""
+    pass
+
+
+class FileAnalysePDF:
+    """
+    File d'analyse des PDF, initialisée comme une extension Flask
+    
+    Chaque analyse occupe une place de la file depuis sa soumission jusqu'à
+    la fin de son enregistrement ; quand toutes les places sont prises, la
+    soumission est refusée au lieu d'allonger indéfiniment l'attente.
+    """
+    
+    def __init__(self, app=None):
+        self.app = None
+        self.processus = 0
+        self.capacite = 0
+        self.places = None
+        self.coordinateur = None
+        self.executeur = None
+        self.emplois_actifs = set()
+        self.verrou = threading.Lock()
+        
+        # Cache des extractions
+        self.cache_max_octets = 0
+        self.cache_age_max_jours = 0
+        self.cache_succes = 0
+        self.cache_echecs = 0
+        self.cache_evictions = 0
+        
+        if app is not None:
+            self.init_app(app)
+    
+    def init_app(self, app):
+        """
+        Configure la file pour l'application
+        
+        Le pool de processus n'est créé qu'à la première analyse. Les analyses
+        laissées en attente ou en cours par un processus arrêté sont marquées
+        en échec (voir marquer_orphelines).
+        
+        Args:
+            app: Application Flask (PDF_ANALYSE_PROCESSUS, PDF_ANALYSE_FILE_MAX,
+                CACHE_EXTRACTION_MAX_OCTETS, CACHE_EXTRACTION_AGE_MAX_JOURS,
+                MARQUER_ORPHELINS_AU_DEMARRAGE)
+        """
+        self.app = app
+        self.processus = app.config.get('PDF_ANALYSE_PROCESSUS', 2)
+        self.capacite = app.config.get('PDF_ANALYSE_FILE_MAX', 20)
+        self.cache_max_octets = app.config.get('CACHE_EXTRACTION_MAX_OCTETS', 50 * 1024 * 1024)
+        self.cache_age_max_jours = app.config.get('CACHE_EXTRACTION_AGE_MAX_JOURS', 30)
+        self.places = threading.BoundedSemaphore(self.capacite)
+        
+        if self.processus:
+            self.coordinateur = ThreadPoolExecutor(
+                max_workers=self.processus,
+                thread_name_prefix='analyse_pdf'
+            )
+        
+        app.extensions['file_analyse_pdf'] = self
+        
+        if app.config.get('MARQUER_ORPHELINS_AU_DEMARRAGE', True):
+            with app.app_context():
+                self.marquer_orphelines()
+    
+    def marquer_orphelines(self) -> int:
+        """
+        Marque en échec les analyses restées en attente ou en cours
+        
+        La file est en mémoire : après un redémarrage, ces analyses ne seront
+        jamais exécutées et leur statut serait interrogé indéfiniment.
+        
+        Returns:
+            Nombre d'emplois du temps marqués
+        """
+        try:
+            nombre = db.session.execute(
+                update(EmploiDuTemps)
+                .where(EmploiDuTemps.statut_analyse.in_(['en_attente', 'en_cours']))
+                .values(
+                    statut_analyse='echoue',
+                    erreur_analyse='Analyse interrompue par un redémarrage du serveur, relancez-la',
+                    date_analyse=datetime.utcnow()
+                )
+            ).rowcount
+            db.session.commit()
+        except SQLAlchemyError:
+            # Table absente (base pas encore initialisée) ou base indisponible
+            db.session.rollback()
+            return 0
+        
+        if nombre:
+            self.app.logger.warning(f'{nombre} analyse(s) PDF interrompue(s) par un redémarrage marquée(s) en échec')
+        
+        return nombre
+    
+    @property
+    def synchrone(self) -> bool:
+        """Vrai si les analyses sont exécutées dans la requête (0 processus)"""
+        return not self.processus
+    
+    def soumettre(self, emploi: EmploiDuTemps, mode: str = MODE_AUTO) -> bool:
+        """
+        Place l'analyse d'un emploi du temps dans la file
+        
+        Args:
+            emploi: Emploi du temps dont le PDF est à analyser
+            mode: Mode d'extraction (MODES_EXTRACTION)
+        
+        Returns:
+            False si une analyse de cet emploi du temps est déjà dans la file
+        
+        Raises:
+            FileAnalysePleine: Si la file a atteint sa capacité
+        """
+        with self.verrou:
+            if emploi.id in self.emplois_actifs:
+                return False
+            
+            if not self.places.acquire(blocking=False):
+                raise FileAnalysePleine(
+                    f"{self.capacite} analyses sont déjà en attente, réessayez plus tard"
+                )
+            
+            self.emplois_actifs.add(emploi.id)
+        
+        try:
+            emploi.statut_analyse = 'en_attente'
+            emploi.erreur_analyse = None
+            emploi.date_mise_en_file = datetime.utcnow()
+            emploi.date_debut_analyse = None
+            db.session.commit()
+            
+            if self.synchrone:
+                self._executer(emploi.id, emploi.fichier_pdf, mode)
+                db.session.refresh(emploi)
+            else:
+                self.coordinateur.submit(self._executer, emploi.id, emploi.fichier_pdf, mode)
+        
+        except Exception:
+            self._liberer(emploi.id)
+            raise
+        
+        return True
+    
+    def statistiques(self) -> Dict:
+        """
+        Retourne l'occupation de la file
+        
+        Returns:
+            Dictionnaire (capacite, analyses_actives, processus, cache)
+        """
+        with self.verrou:
+            actives = len(self.emplois_actifs)
+            demandes = self.cache_succes + self.cache_echecs
+            cache = {
+                'succes': self.cache_succes,
+                'echecs': self.cache_echecs,
+                'evictions': self.cache_evictions,
+                'taux_succes': round(self.cache_succes / demandes, 3) if demandes else 0.0
+            }
+        
+        return {
+            'capacite': self.capacite,
+            'analyses_actives': actives,
+            'processus': self.processus,
+            'cache': cache
+        }
+    
+    def _executer(self, emploi_id: int, pdf_path: str, mode: str = MODE_AUTO):
+        """
+        Analyse un emploi du temps dans son propre contexte applicatif
+        
+        Args:
+            emploi_id: ID de l'emploi du temps
+            pdf_path: Chemin du PDF à analyser
+            mode: Mode d'extraction
+        """
+        try:
+            with self.app.app_context():
+                emploi = EmploiDuTemps.query.get(emploi_id)
+                if emploi is None:
+                    # Supprimé pendant l'attente
+                    return
+                
+                emploi.statut_analyse = 'en_cours'
+                emploi.date_debut_analyse = datetime.utcnow()
+                db.session.commit()
+                
+                try:
+                    if not emploi.empreinte_pdf:
+                        emploi.empreinte_pdf = calculer_empreinte_fichier(pdf_path)
+                    
+                    # Le résultat dépend de la version de l'analyseur et du mode
+                    version = f'{VERSION_ANALYSEUR}-{mode}'
+                    extraction = self._extraction_en_cache(emploi.empreinte_pdf, version)
+                    if extraction is None:
+                        extraction = self._extraire(pdf_path, mode)
+                        self._mettre_en_cache(emploi.empreinte_pdf, version, extraction)
+                    
+                    resultat = PDFAnalyzer(emploi).analyser(extraction)
+                except Exception as e:
+                    db.session.rollback()
+                    resultat = {'success': False, 'error': str(e)}
+                
+                emploi = EmploiDuTemps.query.get(emploi_id)
+                if emploi is None:
+                    return
+                
+                if resultat['success']:
+                    emploi.statut_analyse = 'termine'
+                    self._journaliser_pages(emploi_id, resultat['pages'])
+                else:
+                    self.app.logger.warning(f"Échec de l'analyse de l'emploi du temps {emploi_id} : {resultat['error']}")
+                    emploi.statut_analyse = 'echoue'
+                    emploi.erreur_analyse = resultat['error']
+                
+                emploi.date_analyse = datetime.utcnow()
+                db.session.commit()
+        
+        finally:
+            self._liberer(emploi_id)
+    
+    def _extraire(self, pdf_path: str, mode: str = MODE_AUTO) -> Dict:
+        """
+        Extrait les cours du PDF dans le pool de processus
+        
+        Un PDF court est traité entièrement par un processus ; les pages d'un
+        long document sont réparties par lots sur tout le pool.
+        
+        Args:
+            pdf_path: Chemin du PDF
+            mode: Mode d'extraction
+        
+        Returns:
+            Résultat de extraire_cours_pdf
+        """
+        if self.synchrone:
+            return extraire_cours_pdf(pdf_path, mode)
+        
+        try:
+            executeur = self._obtenir_executeur()
+            
+            if compter_pages(pdf_path) >= 2 * PAGES_PAR_LOT:
+                return PDFAnalyzer(None, pdf_path, mode).extraire(executeur)
+            
+            return executeur.submit(extraire_cours_pdf, pdf_path, mode).result()
+        except BrokenProcessPool:
+            # Un processus a été tué : le pool sera recréé à la prochaine analyse
+            self._reinitialiser_executeur()
+            raise
+    
+    def _extraction_en_cache(self, empreinte: str, version: str):
+        """
+        Retourne l'extraction mise en cache pour ce contenu
+        
+        Args:
+            empreinte: Empreinte SHA-256 du PDF
+            version: Version de l'analyseur et mode d'extraction
+        
+        Returns:
+            Résultat au format de PDFAnalyzer.extraire, ou None
+        """
+        if not self.cache_max_octets:
+            return None
+        
+        entree = CacheExtraction.obtenir(empreinte, version)
+        db.session.commit()
+        
+        with self.verrou:
+            if entree is None:
+                self.cache_echecs += 1
+            else:
+                self.cache_succes += 1
+        
+        return entree.get_extraction() if entree else None
+    
+    def _mettre_en_cache(self, empreinte: str, version: str, extraction: Dict):
+        """
+        Enregistre une extraction puis applique les limites d'âge et de taille
+        
+        Args:
+            empreinte: Empreinte SHA-256 du PDF
+            version: Version de l'analyseur et mode d'extraction
+            extraction: Résultat de PDFAnalyzer.extraire
+        """
+        if not self.cache_max_octets:
+            return
+        
+        CacheExtraction.enregistrer(empreinte, version, extraction)
+        evictions = CacheExtraction.purger(self.cache_age_max_jours, self.cache_max_octets)
+        db.session.commit()
+        
+        with self.verrou:
+            self.cache_evictions += evictions
+    
+    def _journaliser_pages(self, emploi_id: int, pages: List[Dict]):
+        """
+        Journalise la durée d'extraction et la page la plus lente
+        
+        Args:
+            emploi_id: ID de l'emploi du temps
+            pages: Durées par page (voir PDFAnalyzer.extraire)
+        """
+        if not pages:
+            return
+        
+        plus_lente = max(pages, key=lambda page: page['duree_ms'])
+        self.app.logger.info(
+            f"Emploi du temps {emploi_id} : {len(pages)} pages extraites en "
+            f"{sum(page['duree_ms'] for page in pages):.0f} ms "
+            f"(page la plus lente : {plus_lente['page']}, {plus_lente['duree_ms']:.0f} ms)"
+        )
+    
+    def _obtenir_executeur(self) -> ProcessPoolExecutor:
+        """
+        Retourne le pool de processus, créé à la première utilisation
+        
+        Les processus sont démarrés avec 'spawn' : un fork du serveur (threads
+        de requêtes et de jobs) pourrait hériter de verrous dans un état incohérent.
+        
+        Returns:
+            Pool de processus
+        """
+        with self.verrou:
+            if self.executeur is None:
+                self.executeur = ProcessPoolExecutor(
+                    max_workers=self.processus,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            
+            return self.executeur
+    
+    def _reinitialiser_executeur(self):
+        """Abandonne le pool courant (inutilisable après la mort d'un processus)"""
+        with self.verrou:
+            if self.executeur is not None:
+                self.executeur.shutdown(wait=False, cancel_futures=True)
+                self.executeur = None
+    
+    def _liberer(self, emploi_id: int):
+        """Rend la place occupée par l'analyse d'un emploi du temps"""
+        with self.verrou:
+            if emploi_id in self.emplois_actifs:
+                self.emplois_actifs.discard(emploi_id)
+                self.places.release()
+
+
+# Instance partagée, initialisée dans create_app
+file_analyse_pdf = FileAnalysePDF()
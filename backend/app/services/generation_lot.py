@@ -0,0 +1,283 @@
+"""
+Génération de plannings par lots pour tous les étudiants
+Les utilisateurs actifs sont découpés en lots d'identifiants répartis sur un
+pool de processus ; chaque processus charge les données d'un lot en quelques
+requêtes, génère les plannings en mémoire et valide le lot en une transaction
+"""
+
+import json
+import os
+import time as chrono
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date, datetime, time
+from typing import List, Dict, Callable, Optional
+
+from app import create_app, db
+from app.models.user import User
+from app.models.matiere import Matiere
+from app.models.tache import Tache
+from app.models.planning import Planning
+from app.models.emploi_du_temps import EmploiDuTemps
+from app.models.cours import Cours
+from app.services.planning_generator import PlanningGenerator
+
+
+# Application Flask propre à chaque processus du pool
+_application = None
+
+
+def _initialiser_processus(config_name: str):
+    """
+    Crée l'application et son contexte dans un processus du pool
+    
+    Args:
+        config_name: Nom de la configuration Flask
+    """
+    global _application
+    
+    # Les jobs en cours du serveur d'API ne sont pas orphelins
+    _application = create_app(config_name, MARQUER_ORPHELINS_AU_DEMARRAGE=False)
+    _application.app_context().push()
+    
+    # Ne pas réutiliser les connexions héritées du processus parent
+    db.engine.dispose()
+
+
+def _precharger_lot(user_ids: List[int]) -> Dict[int, Dict]:
+    """
+    Charge en une requête par table les données de génération d'un lot
+    
+    Args:
+        user_ids: Identifiants des utilisateurs du lot
+    
+    Returns:
+        Dictionnaire user_id -> données pour PlanningGenerator
+    """
+    donnees = {
+        user_id: {'matieres': [], 'taches': [], 'emploi_du_temps': None, 'cours': []}
+        for user_id in user_ids
+    }
+    
+    for matiere in Matiere.query.filter(Matiere.user_id.in_(user_ids)).all():
+        donnees[matiere.user_id]['matieres'].append(matiere)
+    
+    for tache in Tache.query.filter(
+        Tache.user_id.in_(user_ids),
+        Tache.etat.in_(['a_faire', 'en_cours'])
+    ).all():
+        donnees[tache.user_id]['taches'].append(tache)
+    
+    # Premier emploi du temps de chaque utilisateur, comme PlanningGenerator
+    emplois = {}
+    for emploi in EmploiDuTemps.query.filter(
+        EmploiDuTemps.user_id.in_(user_ids)
+    ).order_by(EmploiDuTemps.id.asc()).all():
+        if donnees[emploi.user_id]['emploi_du_temps'] is None:
+            donnees[emploi.user_id]['emploi_du_temps'] = emploi
+            emplois[emploi.id] = emploi.user_id
+    
+    if emplois:
+        for cours in Cours.query.filter(Cours.emploi_du_temps_id.in_(list(emplois))).all():
+            donnees[emplois[cours.emploi_du_temps_id]]['cours'].append(cours)
+    
+    return donnees
+
+
+def generer_lot(user_ids: List[int], date_debut: date, date_fin: date,
+                options: Dict = None) -> Dict:
+    """
+    Génère les plannings d'un lot d'utilisateurs (exécuté dans un processus du pool)
+    
+    Un utilisateur qui possède déjà un planning sur la même période est
+    ignoré, ce qui rend la reprise d'un traitement interrompu sans doublon.
+    
+    Args:
+        user_ids: Identifiants des utilisateurs du lot
+        date_debut: Date de début des plannings
+        date_fin: Date de fin des plannings
+        options: Paramètres transmis à generer_planning_automatique
+    
+    Returns:
+        Bilan du lot (générés, ignorés, échecs, sessions)
+    """
+    options = options or {}
+    debut = chrono.perf_counter()
+    
+    deja_planifies = {
+        user_id for (user_id,) in db.session.query(Planning.user_id).filter(
+            Planning.user_id.in_(user_ids),
+            Planning.date_debut == datetime.combine(date_debut, time.min),
+            Planning.date_fin == datetime.combine(date_fin, time.min)
+        ).all()
+    }
+    
+    utilisateurs = User.query.filter(User.id.in_(user_ids)).order_by(User.id.asc()).all()
+    donnees = _precharger_lot([user.id for user in utilisateurs])
+    
+    generes = 0
+    sessions = 0
+    echecs = {}
+    
+    for user in utilisateurs:
+        if user.id in deja_planifies:
+            continue
+        
+        # Point de sauvegarde : l'échec d'un utilisateur n'annule pas le lot
+        point_sauvegarde = db.session.begin_nested()
+        try:
+            generator = PlanningGenerator(user, donnees=donnees[user.id])
+            planning = generator.generer_planning_automatique(
+                date_debut=date_debut,
+                date_fin=date_fin,
+                commit=False,
+                **options
+            )
+            point_sauvegarde.commit()
+            generes += 1
+            sessions += planning.sessions_total
+        except Exception as e:
+            point_sauvegarde.rollback()
+            echecs[user.id] = str(e)
+    
+    db.session.commit()
+    db.session.expunge_all()
+    
+    return {
+        'premier_id': user_ids[0],
+        'dernier_id': user_ids[-1],
+        'utilisateurs': len(user_ids),
+        'generes': generes,
+        'ignores': len(deja_planifies),
+        'sessions': sessions,
+        'echecs': echecs,
+        'duree_secondes': round(chrono.perf_counter() - debut, 3)
+    }
+
+
+def lire_progression(fichier_progression: str) -> int:
+    """
+    Lit le dernier identifiant entièrement traité d'une exécution précédente
+    
+    Args:
+        fichier_progression: Chemin du fichier de progression
+    
+    Returns:
+        Identifiant à partir duquel reprendre (0 si aucun)
+    """
+    if not fichier_progression or not os.path.exists(fichier_progression):
+        return 0
+    
+    with open(fichier_progression, encoding='utf-8') as fichier:
+        return int(json.load(fichier).get('dernier_id', 0))
+
+
+def _ecrire_progression(fichier_progression: str, dernier_id: int, bilan: Dict):
+    """Enregistre le point de reprise de façon atomique"""
+    if not fichier_progression:
+        return
+    
+    temporaire = f'{fichier_progression}.tmp'
+    with open(temporaire, 'w', encoding='utf-8') as fichier:
+        json.dump(dict(bilan, dernier_id=dernier_id), fichier)
+    os.replace(temporaire, fichier_progression)
+
+
+def generer_plannings_tous(config_name: str, date_debut: date, date_fin: date,
+                           taille_lot: int = 200, processus: int = None,
+                           depuis_id: int = 0, fichier_progression: str = None,
+                           rapport: Optional[Callable[[Dict], None]] = None,
+                           **options) -> Dict:
+    """
+    Génère les plannings de tous les utilisateurs actifs sur un pool de processus
+    
+    Le point de reprise écrit dans `fichier_progression` est le plus grand
+    identifiant tel que tous les lots précédents sont terminés ; les lots
+    terminés au-delà sont ignorés à la reprise grâce au contrôle de doublon.
+    Un lot en erreur (processus tué, base indisponible) est noté dans
+    'lots_echoues' sans interrompre les autres, et le point de reprise ne
+    le dépasse pas : il est retenté à la reprise.
+    
+    Args:
+        config_name: Configuration Flask utilisée par les processus
+        date_debut: Date de début des plannings
+        date_fin: Date de fin des plannings
+        taille_lot: Nombre d'utilisateurs par lot
+        processus: Nombre de processus (None = nombre de cœurs)
+        depuis_id: Ne traiter que les utilisateurs d'identifiant supérieur
+        fichier_progression: Fichier JSON du point de reprise (None = aucun)
+        rapport: Fonction appelée avec le bilan cumulé après chaque lot
+        **options: Paramètres transmis à generer_planning_automatique
+    
+    Returns:
+        Bilan global (échecs par utilisateur dans 'echecs', lots entiers en
+        erreur dans 'lots_echoues')
+    """
+    user_ids = [
+        user_id for (user_id,) in db.session.query(User.id).filter(
+            User.actif == True,
+            User.id > depuis_id
+        ).order_by(User.id.asc()).all()
+    ]
+    lots = [user_ids[i:i + taille_lot] for i in range(0, len(user_ids), taille_lot)]
+    
+    # Libérer les connexions avant de créer les processus
+    db.session.remove()
+    db.engine.dispose()
+    
+    bilan = {
+        'utilisateurs_total': len(user_ids),
+        'utilisateurs_traites': 0,
+        'generes': 0,
+        'ignores': 0,
+        'sessions': 0,
+        'echecs': {},
+        'lots_echoues': [],
+        'utilisateurs_par_minute': 0.0
+    }
+    termines = [False] * len(lots)
+    prochain_lot = 0
+    debut = chrono.perf_counter()
+    
+    with ProcessPoolExecutor(max_workers=processus, initializer=_initialiser_processus,
+                             initargs=(config_name,)) as executeur:
+        futurs = {
+            executeur.submit(generer_lot, lot, date_debut, date_fin, options): index
+            for index, lot in enumerate(lots)
+        }
+        
+        for futur in as_completed(futurs):
+            lot = lots[futurs[futur]]
+            
+            try:
+                resultat = futur.result()
+            except Exception as e:
+                bilan['lots_echoues'].append({
+                    'premier_id': lot[0],
+                    'dernier_id': lot[-1],
+                    'utilisateurs': len(lot),
+                    'erreur': str(e) or type(e).__name__
+                })
+            else:
+                termines[futurs[futur]] = True
+                
+                bilan['utilisateurs_traites'] += resultat['utilisateurs']
+                bilan['generes'] += resultat['generes']
+                bilan['ignores'] += resultat['ignores']
+                bilan['sessions'] += resultat['sessions']
+                bilan['echecs'].update(resultat['echecs'])
+            
+            duree = chrono.perf_counter() - debut
+            bilan['utilisateurs_par_minute'] = round(bilan['utilisateurs_traites'] * 60 / duree, 1) if duree else 0.0
+            
+            # Avancer le point de reprise sur les lots terminés consécutifs
+            while prochain_lot < len(lots) and termines[prochain_lot]:
+                prochain_lot += 1
+            if prochain_lot:
+                _ecrire_progression(fichier_progression, lots[prochain_lot - 1][-1], bilan)
+            
+            if rapport:
+                rapport(bilan)
+    
+    bilan['duree_secondes'] = round(chrono.perf_counter() - debut, 3)
+    
+    return bilan
@@ -0,0 +1,191 @@
+"""
+Exécution de traitements en arrière-plan
+Pool de threads local au processus, sans broker externe : l'état de chaque
+traitement (statut, progression, résultat) est persisté dans la table jobs,
+ce qui permet de le consulter depuis n'importe quel processus de l'API
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict
+
+from sqlalchemy import update
+from sqlalchemy.exc import SQLAlchemyError
+
+from app import db
+from app.models.job import Job
+
+
+class JobRunner:
+    """
+    Exécuteur de jobs, initialisé comme une extension Flask
+    
+    Un gestionnaire est une fonction (user_id, parametres, progression) -> dict
+    enregistrée pour un type de job ; `progression(pourcentage)` permet de
+    publier l'avancement pendant l'exécution.
+    """
+    
+    def __init__(self, app=None):
+        self.app = None
+        self.executeur = None
+        self.synchrone = False
+        self.gestionnaires = {}
+        
+        if app is not None:
+            self.init_app(app)
+    
+    def init_app(self, app):
+        """
+        Crée le pool de threads pour l'application
+        
+        Les jobs laissés en attente ou en cours par un processus arrêté sont
+        marqués en échec (voir marquer_orphelins).
+        
+        Args:
+            app: Application Flask (JOBS_MAX_WORKERS, JOBS_SYNCHRONES,
+                MARQUER_ORPHELINS_AU_DEMARRAGE)
+        """
+        self.app = app
+        self.synchrone = app.config.get('JOBS_SYNCHRONES', False)
+        self.executeur = ThreadPoolExecutor(
+            max_workers=app.config.get('JOBS_MAX_WORKERS', 2),
+            thread_name_prefix='job'
+        )
+        app.extensions['job_runner'] = self
+        
+        if app.config.get('MARQUER_ORPHELINS_AU_DEMARRAGE', True):
+            with app.app_context():
+                self.marquer_orphelins()
+    
+    def marquer_orphelins(self) -> int:
+        """
+        Marque en échec les jobs restés en attente ou en cours
+        
+        Le pool de threads est local au processus : après un redémarrage,
+        aucun thread ne reprendra ces jobs et leurs clients les
+        interrogeraient indéfiniment.
+        
+        Returns:
+            Nombre de jobs marqués
+        """
+        try:
+            nombre = db.session.execute(
+                update(Job)
+                .where(Job.statut.in_(['en_attente', 'en_cours']))
+                .values(
+                    statut='echoue',
+                    erreur='Interrompu par un redémarrage du serveur, relancez le traitement',
+                    date_fin=datetime.utcnow()
+                )
+            ).rowcount
+            db.session.commit()
+        except SQLAlchemyError:
+            # Table absente (base pas encore initialisée) ou base indisponible
+            db.session.rollback()
+            return 0
+        
+        if nombre:
+            self.app.logger.warning(f'{nombre} job(s) interrompu(s) par un redémarrage marqué(s) en échec')
+        
+        return nombre
+    
+    def tache(self, type_job: str):
+        """
+        Décorateur enregistrant le gestionnaire d'un type de job
+        
+        Args:
+            type_job: Type de job traité par la fonction décorée
+        """
+        def decorateur(fonction: Callable[[int, Dict, Callable[[int], None]], Dict]):
+            self.gestionnaires[type_job] = fonction
+            return fonction
+        return decorateur
+    
+    def soumettre(self, type_job: str, user_id: int, parametres: Dict = None) -> Job:
+        """
+        Enregistre un job et le place dans la file d'exécution
+        
+        Args:
+            type_job: Type de job (doit avoir un gestionnaire)
+            user_id: Utilisateur propriétaire du job
+            parametres: Paramètres sérialisables en JSON
+        
+        Returns:
+            Job créé (statut 'en_attente')
+        """
+        if type_job not in self.gestionnaires:
+            raise ValueError(f"Type de job inconnu : {type_job}")
+        
+        job = Job(user_id=user_id, type_job=type_job)
+        job.set_parametres(parametres or {})
+        db.session.add(job)
+        db.session.commit()
+        
+        if self.synchrone:
+            self._executer(job.id)
+            db.session.refresh(job)
+        else:
+            self.executeur.submit(self._executer, job.id)
+        
+        return job
+    
+    def _executer(self, job_id: int):
+        """
+        Exécute un job dans son propre contexte applicatif
+        
+        Args:
+            job_id: ID du job à exécuter
+        """
+        with self.app.app_context():
+            job = Job.query.get(job_id)
+            job.statut = 'en_cours'
+            job.date_debut = datetime.utcnow()
+            db.session.commit()
+            
+            gestionnaire = self.gestionnaires[job.type_job]
+            
+            try:
+                resultat = gestionnaire(
+                    job.user_id,
+                    job.get_parametres(),
+                    lambda pourcentage: self._publier_progression(job_id, pourcentage)
+                )
+                
+                job = Job.query.get(job_id)
+                job.statut = 'termine'
+                job.progression = 100
+                job.set_resultat(resultat)
+            
+            except Exception as e:
+                db.session.rollback()
+                self.app.logger.exception(f'Échec du job {job_id}')
+                
+                job = Job.query.get(job_id)
+                job.statut = 'echoue'
+                job.erreur = str(e)
+            
+            job.date_fin = datetime.utcnow()
+            db.session.commit()
+    
+    def _publier_progression(self, job_id: int, pourcentage: int):
+        """
+        Enregistre la progression dans une transaction séparée
+        
+        N'interfère pas avec la transaction du gestionnaire ; l'opération est
+        ignorée si la base est momentanément verrouillée (SQLite).
+        
+        Args:
+            job_id: ID du job
+            pourcentage: Avancement (0-100)
+        """
+        try:
+            with db.engine.begin() as connexion:
+                connexion.execute(
+                    update(Job).where(Job.id == job_id).values(progression=max(0, min(int(pourcentage), 99)))
+                )
+        except SQLAlchemyError:
+            self.app.logger.debug(f'Progression du job {job_id} non enregistrée')
+
+
+# Instance partagée, initialisée dans create_app
+job_runner = JobRunner()
@@ -0,0 +1,425 @@
+"""
+Moteurs de planification interchangeables
+Chaque moteur résout le même problème décrit en données simples (préférences,
+matières, tâches, cours, période) et renvoie des SessionGeneree ; un registre
+permet de choisir le moteur par requête et de les comparer sur les mêmes données
+"""
+
+from datetime import date, datetime, time
+from types import SimpleNamespace
+from typing import List, Dict, Optional, NamedTuple, Tuple
+
+from app.models.user import User
+from app.models.planning import Planning
+from app.services.planning_ai import PlanningAI
+from app.services.planning_generator import (
+    PlanningGenerator, SessionGeneree, ALGORITHMES_PAR_MODE,
+    MODE_JOUR, MODE_SEMAINE_TYPE, MODE_ALLOCATION_LP
+)
+from app.services.creneaux_libres import JOURS_SEMAINE, vers_minutes, vers_time
+
+
+class PreferencesEtude(NamedTuple):
+    """Préférences de l'étudiant (mêmes noms que les colonnes de User)"""
+    id: Optional[int]
+    heure_productive_debut: time
+    heure_productive_fin: time
+    duree_session_preferee: int
+    duree_pause: int
+
+
+class MatiereProbleme(NamedTuple):
+    """Matière à planifier"""
+    id: int
+    nom: str
+    priorite: int
+    niveau_difficulte: int
+    pourcentage_complete: float
+    coefficient: float
+    date_examen: Optional[datetime]
+
+
+class TacheProbleme(NamedTuple):
+    """Tâche ouverte rattachée à une matière"""
+    id: int
+    matiere_id: Optional[int]
+    priorite: int
+    date_limite: Optional[datetime]
+
+
+class CoursProbleme(NamedTuple):
+    """Cours de l'emploi du temps (dates facultatives)"""
+    id: int
+    jour_semaine: str
+    heure_debut: str
+    heure_fin: str
+    date_debut: Optional[date] = None
+    date_fin: Optional[date] = None
+
+
+class ProblemePlanification(NamedTuple):
+    """Description complète d'un problème de planification, sans objet ORM"""
+    preferences: PreferencesEtude
+    matieres: List[MatiereProbleme]
+    taches: List[TacheProbleme]
+    cours: List[CoursProbleme]
+    emploi_du_temps_id: Optional[int]
+    date_debut: date
+    date_fin: date
+    heures_etude_par_jour: float = 4.0
+    jours_repos: tuple = ('dimanche',)
+
+
+def probleme_depuis_generateur(generator: PlanningGenerator, date_debut: date, date_fin: date,
+                               heures_etude_par_jour: float = 4.0,
+                               jours_repos: List[str] = None) -> ProblemePlanification:
+    """
+    Décrit en données simples le problème d'un générateur déjà chargé
+    
+    Args:
+        generator: Générateur (données de l'utilisateur chargées)
+        date_debut: Date de début
+        date_fin: Date de fin
+        heures_etude_par_jour: Nombre d'heures d'étude par jour
+        jours_repos: Jours de repos
+    
+    Returns:
+        Problème de planification
+    """
+    user = generator.user
+    
+    return ProblemePlanification(
+        preferences=PreferencesEtude(
+            id=user.id,
+            heure_productive_debut=user.heure_productive_debut or time(8, 0),
+            heure_productive_fin=user.heure_productive_fin or time(22, 0),
+            duree_session_preferee=user.duree_session_preferee or 60,
+            duree_pause=user.duree_pause or 0
+        ),
+        matieres=[
+            MatiereProbleme(
+                id=matiere.id,
+                nom=matiere.nom,
+                priorite=matiere.priorite,
+                niveau_difficulte=matiere.niveau_difficulte,
+                pourcentage_complete=matiere.pourcentage_complete,
+                coefficient=matiere.coefficient,
+                date_examen=matiere.date_examen
+            )
+            for matiere in generator.matieres
+        ],
+        taches=[
+            TacheProbleme(
+                id=tache.id,
+                matiere_id=tache.matiere_id,
+                priorite=tache.priorite,
+                date_limite=tache.date_limite
+            )
+            for tache in generator.taches
+        ],
+        cours=[
+            CoursProbleme(
+                id=cours.id,
+                jour_semaine=cours.jour_semaine,
+                heure_debut=cours.heure_debut,
+                heure_fin=cours.heure_fin,
+                date_debut=cours.date_debut,
+                date_fin=cours.date_fin
+            )
+            for cours_du_jour in generator.cours_par_jour.values()
+            for cours in cours_du_jour
+        ],
+        emploi_du_temps_id=generator.emploi_du_temps.id if generator.emploi_du_temps else None,
+        date_debut=date_debut,
+        date_fin=date_fin,
+        heures_etude_par_jour=heures_etude_par_jour,
+        jours_repos=tuple(jours_repos if jours_repos is not None else ['dimanche'])
+    )
+
+
+def generateur_depuis_probleme(probleme: ProblemePlanification) -> PlanningGenerator:
+    """
+    Crée un générateur travaillant uniquement sur les données du problème
+    
+    Returns:
+        Générateur sans accès à la base
+    """
+    return PlanningGenerator(probleme.preferences, donnees={
+        'matieres': probleme.matieres,
+        'taches': probleme.taches,
+        'emploi_du_temps': SimpleNamespace(id=probleme.emploi_du_temps_id) if probleme.emploi_du_temps_id else None,
+        'cours': probleme.cours
+    })
+
+
+class MoteurPlanification:
+    """
+    Interface commune des moteurs de planification
+    
+    Un moteur est sans état : resoudre() peut être appelé en parallèle sur
+    plusieurs problèmes.
+    """
+    
+    nom = None
+    description = ''
+    
+    def resoudre(self, probleme: ProblemePlanification) -> List[SessionGeneree]:
+        """
+        Calcule les sessions du problème
+        
+        Args:
+            probleme: Problème de planification
+        
+        Returns:
+            Sessions générées, dans l'ordre chronologique
+        """
+        raise NotImplementedError
+    
+    def to_dict(self):
+        """Description du moteur"""
+        return {'nom': self.nom, 'description': self.description}
+
+
+# Registre des moteurs utilisables pour enregistrer un planning : nom -> instance
+MOTEURS: Dict[str, MoteurPlanification] = {}
+
+# Tous les moteurs, y compris ceux réservés à la comparaison (bancs d'essai)
+MOTEURS_COMPARAISON: Dict[str, MoteurPlanification] = {}
+
+
+def enregistrer_moteur(classe):
+    """
+    Décorateur ajoutant un moteur au registre sous son nom
+    
+    Args:
+        classe: Sous-classe de MoteurPlanification
+    """
+    MOTEURS[classe.nom] = MOTEURS_COMPARAISON[classe.nom] = classe()
+    return classe
+
+
+def enregistrer_moteur_comparaison(classe):
+    """
+    Décorateur ajoutant un moteur aux seuls bancs d'essai : ses plannings ne
+    respectent pas toutes les contraintes et ne peuvent pas être enregistrés
+    
+    Args:
+        classe: Sous-classe de MoteurPlanification
+    """
+    MOTEURS_COMPARAISON[classe.nom] = classe()
+    return classe
+
+
+def obtenir_moteur(nom: str) -> MoteurPlanification:
+    """
+    Retourne le moteur enregistré sous ce nom
+    
+    Raises:
+        ValueError: Si aucun moteur ne porte ce nom
+    """
+    if nom not in MOTEURS:
+        raise ValueError(f"Moteur de planification inconnu : {nom} (disponibles : {', '.join(sorted(MOTEURS))})")
+    
+    return MOTEURS[nom]
+
+
+class _MoteurGenerateur(MoteurPlanification):
+    """Moteur adossé à un mode de PlanningGenerator"""
+    
+    mode = None
+    
+    def resoudre(self, probleme: ProblemePlanification) -> List[SessionGeneree]:
+        return generateur_depuis_probleme(probleme).calculer_sessions(
+            date_debut=probleme.date_debut,
+            date_fin=probleme.date_fin,
+            heures_etude_par_jour=probleme.heures_etude_par_jour,
+            jours_repos=list(probleme.jours_repos),
+            mode=self.mode
+        )
+
+
+@enregistrer_moteur
+class MoteurPriorite(_MoteurGenerateur):
+    nom = ALGORITHMES_PAR_MODE[MODE_JOUR]
+    description = "Calcul jour par jour, alternance des matières par score de priorité"
+    mode = MODE_JOUR
+
+
+@enregistrer_moteur
+class MoteurSemaineType(_MoteurGenerateur):
+    nom = ALGORITHMES_PAR_MODE[MODE_SEMAINE_TYPE]
+    description = "Semaine type calculée une fois par signature puis répliquée"
+    mode = MODE_SEMAINE_TYPE
+
+
+@enregistrer_moteur
+class MoteurAllocationLP(_MoteurGenerateur):
+    nom = ALGORITHMES_PAR_MODE[MODE_ALLOCATION_LP]
+    description = "Affectation optimale des créneaux par programmation linéaire"
+    mode = MODE_ALLOCATION_LP
+
+
+@enregistrer_moteur_comparaison
+class MoteurPlanningAI(MoteurPlanification):
+    """
+    Allocation proportionnelle de PlanningAI
+    
+    PlanningAI ne connaît ni l'emploi du temps, ni les dates d'examen, ni le
+    plafond d'heures par jour : il remplit la plage des heures productives.
+    Ses sessions peuvent chevaucher des cours ou suivre l'examen, il sert
+    donc de point de comparaison et n'est pas proposé par generer-planning.
+    """
+    
+    nom = 'planning_ai'
+    description = "Allocation proportionnelle au score sur les heures productives (sans emploi du temps)"
+    
+    def resoudre(self, probleme: ProblemePlanification) -> List[SessionGeneree]:
+        preferences = probleme.preferences
+        ai = PlanningAI()
+        ai.break_duration = preferences.duree_pause
+        
+        sessions = ai.generate_planning(
+            matieres=[
+                {
+                    'id': matiere.id,
+                    'nom': matiere.nom,
+                    'coefficient': matiere.coefficient or 1.0,
+                    'priorite': matiere.priorite,
+                    'progression': matiere.pourcentage_complete or 0
+                }
+                for matiere in probleme.matieres
+            ],
+            preferences={
+                'duree_session': preferences.duree_session_preferee,
+                'heure_debut': preferences.heure_productive_debut.strftime('%H:%M'),
+                'heure_fin': preferences.heure_productive_fin.strftime('%H:%M'),
+                'jours_semaine': [
+                    index for index, jour in enumerate(JOURS_SEMAINE)
+                    if jour not in probleme.jours_repos
+                ]
+            },
+            date_debut=datetime.combine(probleme.date_debut, time.min),
+            date_fin=datetime.combine(probleme.date_fin, time.min)
+        )
+        
+        resultat = []
+        for session in sessions:
+            jour = date.fromisoformat(session['date'])
+            heure_debut = datetime.combine(jour, vers_time(vers_minutes(session['heure_debut'])))
+            heure_fin = datetime.combine(jour, vers_time(vers_minutes(session['heure_fin'])))
+            
+            resultat.append(SessionGeneree(
+                matiere_id=session['matiere_id'],
+                tache_associee_id=None,
+                date=jour,
+                heure_debut=heure_debut,
+                heure_fin=heure_fin,
+                duree=session['duree'],
+                titre=f"Étude {session['matiere_nom']}",
+                description=f"Session d'étude pour {session['matiere_nom']}",
+                type_session='etude'
+            ))
+        
+        return resultat
+
+
+def evaluer_solution(probleme: ProblemePlanification, sessions: List[SessionGeneree]) -> Dict:
+    """
+    Mesure la qualité d'une solution avec les mêmes critères pour tous les moteurs
+    
+    Returns:
+        Score de qualité, heures planifiées, sessions en conflit avec un cours
+        et sessions planifiées après l'examen de leur matière
+    """
+    cours_par_jour = {}
+    for cours in probleme.cours:
+        cours_par_jour.setdefault((cours.jour_semaine or '').strip().lower(), []).append(
+            (vers_minutes(cours.heure_debut), vers_minutes(cours.heure_fin), cours.date_debut, cours.date_fin)
+        )
+    
+    examens = {
+        matiere.id: matiere.date_examen.date()
+        for matiere in probleme.matieres
+        if matiere.date_examen
+    }
+    
+    conflits = 0
+    apres_examen = 0
+    for session in sessions:
+        debut = vers_minutes(session.heure_debut)
+        fin = debut + session.duree
+        
+        for debut_cours, fin_cours, date_debut, date_fin in cours_par_jour.get(JOURS_SEMAINE[session.date.weekday()], []):
+            if (date_debut and session.date < date_debut) or (date_fin and session.date > date_fin):
+                continue
+            if debut < fin_cours and debut_cours < fin:
+                conflits += 1
+                break
+        
+        if session.matiere_id in examens and session.date > examens[session.matiere_id]:
+            apres_examen += 1
+    
+    return {
+        'sessions': len(sessions),
+        'heures': round(sum(session.duree for session in sessions) / 60, 1),
+        'score_qualite': generateur_depuis_probleme(probleme).calculer_score(sessions),
+        'conflits_cours': conflits,
+        'sessions_apres_examen': apres_examen
+    }
+
+
+def planifier(user: User, nom_moteur: str, date_debut: date, date_fin: date,
+              heures_etude_par_jour: float = 4.0, jours_etude_par_semaine: int = 6,
+              jours_repos: List[str] = None, repartir_taches: bool = False,
+              commit: bool = True) -> Tuple[Planning, Dict]:
+    """
+    Génère et enregistre le planning d'un utilisateur avec le moteur choisi
+    
+    Args:
+        user: Utilisateur concerné
+        nom_moteur: Nom du moteur dans le registre
+        date_debut: Date de début du planning
+        date_fin: Date de fin du planning
+        heures_etude_par_jour: Nombre d'heures d'étude par jour
+        jours_etude_par_semaine: Nombre de jours d'étude par semaine
+        jours_repos: Jours de repos
+        repartir_taches: Répartir les sessions entre les tâches d'une matière
+        commit: Valider la transaction
+    
+    Returns:
+        Tuple (planning créé (algorithme_utilise = nom du moteur exécuté,
+        'priority_based_scheduling' si 'lp_allocation' s'est replié),
+        statistiques de génération du moteur exécuté)
+    """
+    moteur = obtenir_moteur(nom_moteur)
+    generator = PlanningGenerator(user, repartir_taches=repartir_taches)
+    
+    if isinstance(moteur, _MoteurGenerateur):
+        # Même générateur : conserve la répartition des tâches demandée
+        sessions = generator.calculer_sessions(date_debut, date_fin, heures_etude_par_jour,
+                                               jours_repos, moteur.mode)
+        statistiques = dict(generator.statistiques)
+        
+        # 'allocation_lp' peut s'être replié sur le calcul jour par jour
+        nom_execute = ALGORITHMES_PAR_MODE[generator.mode_execute(moteur.mode)]
+    else:
+        probleme = probleme_depuis_generateur(generator, date_debut, date_fin,
+                                              heures_etude_par_jour, jours_repos)
+        sessions = moteur.resoudre(probleme)
+        statistiques = {}
+        nom_execute = moteur.nom
+    
+    statistiques.update(moteur=nom_execute, sessions_generees=len(sessions))
+    
+    planning = generator.enregistrer_sessions(
+        date_debut=date_debut,
+        date_fin=date_fin,
+        sessions=sessions,
+        algorithme=nom_execute,
+        heures_etude_par_jour=heures_etude_par_jour,
+        jours_etude_par_semaine=jours_etude_par_semaine,
+        jours_repos=jours_repos,
+        commit=commit
+    )
+    
+    return planning, statistiques
@@ -1,19 +1,162 @@
 """
 Service d'analyse de PDF pour extraire les emplois du temps
-Utilise PyMuPDF (pdfplumber) pour l'extraction de texte et des regex pour la détection de cours
+Utilise PyMuPDF (pdfplumber) pour l'extraction de texte et des regex pour la détection de cours,
+ou la position des mots pour les emplois du temps en grille
 """
 
+import bisect
+import itertools
 import re
+import time as chrono
+from concurrent.futures import Executor
 from datetime import datetime, time
-from typing import List, Dict, Optional, Tuple
+from types import SimpleNamespace
+from typing import List, Dict, NamedTuple, Optional, Tuple
 import pdfplumber  
+from sqlalchemy import delete, insert
 
 
 from app import db
 from app.models.emploi_du_temps import EmploiDuTemps
 from app.models.cours import Cours
+from app.services.creneaux_libres import GrilleDisponibilites, JOURS_SEMAINE, vers_minutes, vers_time
 
 
+# Version de l'extraction et de la détection des cours : à incrémenter à chaque
+# changement de résultat, les extractions en cache d'une autre version sont ignorées
+VERSION_ANALYSEUR = '4'
+
+# Modes d'extraction des cours
+MODE_TEXTE = 'texte'    # Lignes de texte : le jour est le dernier mentionné
+MODE_GRILLE = 'grille'  # Position des mots : jours en colonnes, heures en lignes
+MODE_AUTO = 'auto'      # Page par page : grille si la page en contient une, sinon texte
+MODES_EXTRACTION = [MODE_TEXTE, MODE_GRILLE, MODE_AUTO]
+
+# Valeurs enregistrées dans EmploiDuTemps.algorithme_utilise
+ALGORITHME_PAR_MODE = {
+    MODE_TEXTE: 'regex_pdfplumber',
+    MODE_GRILLE: 'grille_pdfplumber',
+    MODE_AUTO: 'grille_regex_pdfplumber'  # Document mêlant pages en grille et pages de texte
+}
+
+# Jours distincts, dans l'ordre de la semaine, sur la ligne d'en-tête d'une grille
+JOURS_ENTETE_MIN = 3
+
+# Écart vertical (points) en dessous duquel deux mots sont sur la même ligne
+TOLERANCE_LIGNE = 3
+
+# Arrondi des horaires lus sur la grille (minutes)
+ARRONDI_GRILLE_MINUTES = 15
+
+# Pages extraites par tâche du pool ; un PDF de moins de deux lots est lu séquentiellement
+PAGES_PAR_LOT = 8
+
+
+class LigneCours(NamedTuple):
+    """Éléments reconnus sur une ligne d'emploi du temps"""
+    jour: Optional[str]
+    plages: List[Tuple[time, Optional[time]]]  # Heure de fin None si absente de la ligne
+    salle: Optional[str]
+    type_cours: str
+    matiere: str
+
+
+class TokeniseurLigne:
+    """
+    Découpe une ligne en jour, plages horaires, salle, type de cours et matière
+    
+    Tous les motifs sont réunis dans une seule expression compilée : la ligne
+    est parcourue une fois, et la matière est le texte restant entre les
+    éléments reconnus.
+    """
+    
+    # Caractères de liaison retirés autour de la matière
+    SEPARATEURS = ' -–—/|,;:()'
+    
+    def __init__(self, jour_pattern: str, heure_pattern: str, salle_pattern: str,
+                 mots_cles_types: Dict[str, List[str]]):
+        """
+        Compile l'expression de la ligne
+        
+        Args:
+            jour_pattern: Motif des jours
+            heure_pattern: Motif des heures (HH:MM ou HHhMM)
+            salle_pattern: Motif des salles
+            mots_cles_types: Mots-clés par type de cours, par ordre de priorité
+        """
+        self.types = {}
+        self.rangs = {}
+        for rang, (type_cours, mots_cles) in enumerate(mots_cles_types.items()):
+            self.rangs[type_cours] = rang
+            for mot_cle in mots_cles:
+                self.types.setdefault(mot_cle.lower(), type_cours)
+        
+        # Les mots-clés longs d'abord : « travaux dirigés » avant « dirigés »
+        mots_cles = '|'.join(re.escape(mot_cle) for mot_cle in sorted(self.types, key=len, reverse=True))
+        
+        self.motif = re.compile(
+            f'(?P<heure>{heure_pattern})'
+            f'|(?P<jour>{jour_pattern})'
+            f'|(?P<salle>{salle_pattern})'
+            rf'|(?P<type_cours>\b(?:{mots_cles})\b)',
+            re.IGNORECASE
+        )
+    
+    def analyser(self, ligne: str, complet: bool = False) -> LigneCours:
+        """
+        Analyse une ligne en un seul parcours
+        
+        Deux heures successives forment une plage ; une heure isolée en fin de
+        ligne donne une plage sans heure de fin.
+        
+        Args:
+            ligne: Ligne de texte
+            complet: Extraire la matière même sans horaire (case de grille)
+        
+        Returns:
+            Éléments reconnus
+        """
+        jour = None
+        salle = None
+        type_cours = None
+        heures = []
+        morceaux = []
+        position = 0
+        
+        for element in self.motif.finditer(ligne):
+            morceaux.append(ligne[position:element.start()])
+            position = element.end()
+            texte = element.group()
+            nature = element.lastgroup
+            
+            if nature == 'heure':
+                heures.append(time(int(texte[:-3]), int(texte[-2:])))
+            elif nature == 'jour':
+                jour = texte.lower()
+            elif nature == 'salle':
+                salle = salle or texte
+            else:
+                trouve = self.types[texte.lower()]
+                if type_cours is None or self.rangs[trouve] < self.rangs[type_cours]:
+                    type_cours = trouve
+        
+        if not heures and not complet:
+            return LigneCours(jour, [], salle, type_cours or 'cours', '')
+        
+        morceaux.append(ligne[position:])
+        matiere = ' '.join(' '.join(morceaux).split()).strip(self.SEPARATEURS)
+        
+        if type_cours is None:
+            # Un cours en laboratoire est un TP
+            type_cours = 'tp' if salle and salle.lower().startswith('lab') else 'cours'
+        
+        plages = [
+            (heures[i], heures[i + 1] if i + 1 < len(heures) else None)
+            for i in range(0, len(heures), 2)
+        ]
+        
+        return LigneCours(jour, plages, salle, type_cours, matiere[:100] if matiere else 'Matière non identifiée')
+
 
 class PDFAnalyzer:
     """
@@ -35,43 +178,63 @@ class PDFAnalyzer:
     
     JOURS_SEMAINE = ['lundi', 'mardi', 'mercredi', 'jeudi', 'vendredi', 'samedi', 'dimanche']
     
-    def __init__(self, emploi_du_temps: EmploiDuTemps):
+    # Analyseur de lignes compilé une fois pour toutes les analyses
+    TOKENISEUR = TokeniseurLigne(JOUR_PATTERN, HEURE_PATTERN, SALLE_PATTERN, TYPE_COURS_KEYWORDS)
+    
+    def __init__(self, emploi_du_temps: Optional[EmploiDuTemps], pdf_path: Optional[str] = None,
+                 mode: str = MODE_AUTO):
         """
         Initialise l'analyseur avec un emploi du temps
         
         Args:
-            emploi_du_temps: Instance EmploiDuTemps à analyser
+            emploi_du_temps: Instance EmploiDuTemps à analyser (None pour une
+                extraction seule, sans enregistrement)
+            pdf_path: Chemin du PDF (par défaut celui de l'emploi du temps)
+            mode: Mode d'extraction (MODES_EXTRACTION)
         """
+        if mode not in MODES_EXTRACTION:
+            raise ValueError(f"Mode d'extraction inconnu : {mode}")
+        
         self.emploi_du_temps = emploi_du_temps
-        self.pdf_path = emploi_du_temps.fichier_pdf
+        self.pdf_path = pdf_path or emploi_du_temps.fichier_pdf
+        self.mode = mode
         self.texte_brut = ""
         self.cours_extraits = []
+        self.cours_pages = []
+        self.textes_pages = []
+        self.durees_pages = []
+        self.algorithme = ALGORITHME_PAR_MODE[MODE_TEXTE]
     
-    def analyser(self) -> Dict:
+    def analyser(self, extraction: Optional[Dict] = None) -> Dict:
         """
         Lance l'analyse complète du PDF
         
+        Args:
+            extraction: Résultat de extraire_cours_pdf déjà calculé dans un
+                autre processus (None = extraction dans le processus courant)
+        
         Returns:
             Dict avec les résultats de l'analyse
         """
         try:
-            # Étape 1 : Extraire le texte du PDF
-            self.texte_brut = self._extraire_texte_pdf()
-            
-            # Étape 2 : Détecter les cours dans le texte
-            self.cours_extraits = self._detecter_cours()
+            if extraction is None:
+                self.extraire()
+            else:
+                self.texte_brut = extraction['texte_brut']
+                self.cours_extraits = extraction['cours']
+                self.durees_pages = extraction.get('pages', [])
+                self.algorithme = extraction.get('algorithme', self.algorithme)
             
             # Étape 3 : Sauvegarder les cours en base de données
             cours_sauvegardes = self._sauvegarder_cours()
             
             # Étape 4 : Marquer l'analyse comme complétée
             self.emploi_du_temps.analyse_completee = True
-            self.emploi_du_temps.algorithme_utilise = 'regex_pymupdf'
-            self.emploi_du_temps.nombre_cours_extraits = len(cours_sauvegardes)
+            self.emploi_du_temps.algorithme_utilise = self.algorithme
             
             # Calculer la confiance moyenne
-            if cours_sauvegardes:
-                confiance_moyenne = sum(c.confiance for c in cours_sauvegardes) / len(cours_sauvegardes)
+            if self.cours_extraits:
+                confiance_moyenne = sum(c['confiance'] for c in self.cours_extraits) / len(self.cours_extraits)
                 self.emploi_du_temps.confiance_extraction = int(confiance_moyenne)
             else:
                 self.emploi_du_temps.confiance_extraction = 0
@@ -82,6 +245,8 @@ class PDFAnalyzer:
                 'success': True,
                 'cours_extraits': len(cours_sauvegardes),
                 'confiance_moyenne': self.emploi_du_temps.confiance_extraction,
+                'algorithme': self.algorithme,
+                'pages': self.durees_pages,
                 'message': f'{len(cours_sauvegardes)} cours extraits avec succès'
             }
             
@@ -93,122 +258,158 @@ class PDFAnalyzer:
                 'message': 'Erreur lors de l\'analyse du PDF'
             }
     
-    def _extraire_texte_pdf(self) -> str:
+    def extraire(self, executeur: Optional[Executor] = None) -> Dict:
         """
-        Extrait le texte brut du PDF
+        Extrait le texte du PDF et y détecte les cours, sans accès à la base
+        
+        Args:
+            executeur: Pool de processus pour extraire les pages par lots
+                (None = extraction séquentielle)
         
         Returns:
-            Texte complet du PDF
+            Dict avec le texte brut, la liste des cours détectés, l'algorithme
+            retenu et la durée d'extraction de chaque page
         """
-        texte_complet = ""
+        # Étape 1 : Extraire le texte du PDF (et lire les grilles)
+        self.texte_brut = self._extraire_texte_pdf(executeur)
         
+        # Étape 2 : Détecter les cours, dans les grilles ou dans le texte
+        if self.mode == MODE_TEXTE:
+            self.algorithme = ALGORITHME_PAR_MODE[MODE_TEXTE]
+            self.cours_extraits = self._detecter_cours()
+        elif self.mode == MODE_GRILLE:
+            self.algorithme = ALGORITHME_PAR_MODE[MODE_GRILLE]
+            self.cours_extraits = [c for cours in self.cours_pages if cours is not None for c in cours]
+        else:
+            self._detecter_cours_par_page()
+        
+        return {
+            'texte_brut': self.texte_brut,
+            'cours': self.cours_extraits,
+            'algorithme': self.algorithme,
+            'pages': self.durees_pages
+        }
+    
+    def _extraire_texte_pdf(self, executeur: Optional[Executor] = None) -> str:
+        """
+        Extrait le texte brut du PDF
+        
+        Avec un pool, les pages sont réparties en lots de PAGES_PAR_LOT puis
+        réassemblées dans l'ordre du document. Hors mode texte, les cours des
+        pages en grille sont lus au passage (self.cours_pages).
+        
+        Args:
+            executeur: Pool de processus (None = extraction séquentielle)
+        
+        Returns:
+            Texte complet du PDF (le texte de chaque page est gardé dans
+            self.textes_pages)
+        """
         try:
-            doc = pdfplumber.open(self.pdf_path)
-            
-            for page_num in range(len(doc)):
-                page = doc[page_num]
-                texte_complet += page.get_text()
+            with pdfplumber.open(self.pdf_path) as pdf:
+                nombre_pages = len(pdf.pages)
+                
+                if executeur is None or nombre_pages < 2 * PAGES_PAR_LOT:
+                    pages = _extraire_pages(pdf, 0, nombre_pages, self.mode)
+                else:
+                    debuts = range(0, nombre_pages, PAGES_PAR_LOT)
+                    lots = executeur.map(
+                        extraire_pages,
+                        itertools.repeat(self.pdf_path),
+                        debuts,
+                        [debut + PAGES_PAR_LOT for debut in debuts],
+                        itertools.repeat(self.mode)
+                    )
+                    pages = [page for lot in lots for page in lot]
             
-            doc.close()
+            self.durees_pages = [
+                {'page': index + 1, 'caracteres': len(texte), 'duree_ms': duree_ms}
+                for index, texte, duree_ms, _ in pages
+            ]
+            self.cours_pages = [cours for _, _, _, cours in pages]
+            self.textes_pages = [texte for _, texte, _, _ in pages]
             
-            return texte_complet
+            return '\n'.join(self.textes_pages)
             
         except Exception as e:
             raise Exception(f"Erreur lors de l'extraction du texte PDF : {str(e)}")
     
-    def _detecter_cours(self) -> List[Dict]:
+    def _detecter_cours_par_page(self):
+        """
+        Mode automatique : lit chaque page en grille si elle en contient une,
+        sinon comme du texte
+        
+        Les pages de texte consécutives sont analysées ensemble, un jour
+        pouvant commencer sur une page et continuer sur la suivante.
+        """
+        self.cours_extraits = []
+        modes = set()
+        
+        pages = zip(self.textes_pages, self.cours_pages)
+        for en_grille, groupe in itertools.groupby(pages, key=lambda page: page[1] is not None):
+            groupe = list(groupe)
+            if en_grille:
+                modes.add(MODE_GRILLE)
+                self.cours_extraits.extend(c for _, cours in groupe for c in cours)
+            else:
+                modes.add(MODE_TEXTE)
+                self.cours_extraits.extend(self._detecter_cours('\n'.join(texte for texte, _ in groupe)))
+        
+        if modes == {MODE_GRILLE}:
+            self.algorithme = ALGORITHME_PAR_MODE[MODE_GRILLE]
+        elif MODE_GRILLE in modes:
+            self.algorithme = ALGORITHME_PAR_MODE[MODE_AUTO]
+        else:
+            self.algorithme = ALGORITHME_PAR_MODE[MODE_TEXTE]
+    
+    def _detecter_cours(self, texte: Optional[str] = None) -> List[Dict]:
         """
         Détecte les cours dans le texte extrait
         
+        Chaque ligne est lue une seule fois par TOKENISEUR ; le jour reste
+        celui de la dernière ligne qui en mentionne un.
+        
+        Args:
+            texte: Texte à analyser (par défaut tout le texte du PDF)
+        
         Returns:
             Liste de dictionnaires contenant les informations des cours détectés
         """
         cours = []
-        lignes = self.texte_brut.split('\n')
         
         # Variables pour stocker le contexte
         jour_courant = None
         
-        for i, ligne in enumerate(lignes):
-            ligne_lower = ligne.lower().strip()
+        for ligne in (self.texte_brut if texte is None else texte).split('\n'):
+            jetons = self.TOKENISEUR.analyser(ligne)
             
-            if not ligne_lower:
-                continue
+            if jetons.jour:
+                jour_courant = jetons.jour
             
-            # Détecter le jour
-            jour_match = re.search(self.JOUR_PATTERN, ligne_lower)
-            if jour_match:
-                jour_courant = jour_match.group(1)
+            if not jetons.plages or not jour_courant:
+                continue
             
-            # Détecter les heures
-            heures_matches = list(re.finditer(self.HEURE_PATTERN, ligne_lower))
+            texte_brut = ligne.strip()
             
-            if heures_matches and jour_courant:
-                # On a trouvé des heures et on connaît le jour
-                for match in heures_matches:
-                    try:
-                        heure_debut = self._parse_heure(match.group(1), match.group(2))
-                        
-                        # Chercher l'heure de fin (souvent sur la même ligne ou la suivante)
-                        heure_fin = None
-                        
-                        # Chercher dans le reste de la ligne
-                        reste_ligne = ligne_lower[match.end():]
-                        heure_fin_match = re.search(self.HEURE_PATTERN, reste_ligne)
-                        
-                        if heure_fin_match:
-                            heure_fin = self._parse_heure(heure_fin_match.group(1), heure_fin_match.group(2))
-                        else:
-                            # Par défaut, ajouter 2 heures (durée typique d'un cours)
-                            heure_fin = self._ajouter_heures(heure_debut, 2)
-                        
-                        # Détecter la matière (généralement le texte principal de la ligne)
-                        matiere = self._extraire_matiere(ligne)
-                        
-                        # Détecter le type de cours
-                        type_cours = self._detecter_type_cours(ligne)
-                        
-                        # Détecter la salle
-                        salle = self._extraire_salle(ligne)
-                        
-                        # Calculer la confiance
-                        confiance = self._calculer_confiance(matiere, heure_debut, heure_fin, salle)
-                        
-                        cours_info = {
-                            'jour': jour_courant,
-                            'heure_debut': heure_debut,
-                            'heure_fin': heure_fin,
-                            'matiere': matiere,
-                            'type_cours': type_cours,
-                            'salle': salle,
-                            'texte_brut': ligne.strip(),
-                            'confiance': confiance,
-                            'recurrent': True  # Par défaut, les cours sont récurrents
-                        }
-                        
-                        cours.append(cours_info)
-                        
-                    except Exception as e:
-                        # Si on ne peut pas parser cette ligne, on continue
-                        continue
+            for heure_debut, heure_fin in jetons.plages:
+                if heure_fin is None:
+                    # Par défaut, ajouter 2 heures (durée typique d'un cours)
+                    heure_fin = self._ajouter_heures(heure_debut, 2)
+                
+                cours.append({
+                    'jour': jour_courant,
+                    'heure_debut': heure_debut,
+                    'heure_fin': heure_fin,
+                    'matiere': jetons.matiere,
+                    'type_cours': jetons.type_cours,
+                    'salle': jetons.salle,
+                    'texte_brut': texte_brut,
+                    'confiance': self._calculer_confiance(jetons.matiere, heure_debut, heure_fin, jetons.salle),
+                    'recurrent': True  # Par défaut, les cours sont récurrents
+                })
         
         return cours
     
-    def _parse_heure(self, heure_str: str, minute_str: str) -> time:
-        """
-        Parse une heure à partir de strings
-        
-        Args:
-            heure_str: Heures (ex: "14")
-            minute_str: Minutes (ex: "30")
-        
-        Returns:
-            Objet time
-        """
-        heure = int(heure_str)
-        minute = int(minute_str)
-        return time(heure, minute)
-    
     def _ajouter_heures(self, heure_debut: time, heures: int) -> time:
         """
         Ajoute des heures à une heure donnée
@@ -223,66 +424,8 @@ class PDFAnalyzer:
         nouvelle_heure = (heure_debut.hour + heures) % 24
         return time(nouvelle_heure, heure_debut.minute)
     
-    def _extraire_matiere(self, ligne: str) -> str:
-        """
-        Extrait le nom de la matière d'une ligne
-        
-        Args:
-            ligne: Ligne de texte
-        
-        Returns:
-            Nom de la matière
-        """
-        # Supprimer les heures et les salles
-        ligne_clean = re.sub(self.HEURE_PATTERN, '', ligne)
-        ligne_clean = re.sub(self.SALLE_PATTERN, '', ligne_clean, flags=re.IGNORECASE)
-        
-        # Supprimer les mots-clés de type de cours
-        for type_keywords in self.TYPE_COURS_KEYWORDS.values():
-            for keyword in type_keywords:
-                ligne_clean = re.sub(r'\b' + keyword + r'\b', '', ligne_clean, flags=re.IGNORECASE)
-        
-        # Nettoyer et retourner
-        matiere = ligne_clean.strip()
-        matiere = re.sub(r'\s+', ' ', matiere)  # Supprimer les espaces multiples
-        
-        return matiere[:100] if matiere else 'Matière non identifiée'
-    
-    def _detecter_type_cours(self, ligne: str) -> str:
-        """
-        Détecte le type de cours (cours/TD/TP/examen)
-        
-        Args:
-            ligne: Ligne de texte
-        
-        Returns:
-            Type de cours
-        """
-        ligne_lower = ligne.lower()
-        
-        for type_cours, keywords in self.TYPE_COURS_KEYWORDS.items():
-            for keyword in keywords:
-                if keyword.lower() in ligne_lower:
-                    return type_cours
-        
-        return 'cours'  # Par défaut
-    
-    def _extraire_salle(self, ligne: str) -> Optional[str]:
-        """
-        Extrait le nom de la salle
-        
-        Args:
-            ligne: Ligne de texte
-        
-        Returns:
-            Nom de la salle ou None
-        """
-        match = re.search(self.SALLE_PATTERN, ligne, re.IGNORECASE)
-        if match:
-            return match.group(0)
-        return None
-    
-    def _calculer_confiance(self, matiere: str, heure_debut: time, 
+    @staticmethod
+    def _calculer_confiance(matiere: str, heure_debut: time, 
                            heure_fin: time, salle: Optional[str]) -> int:
         """
         Calcule un score de confiance pour l'extraction
@@ -316,38 +459,65 @@ class PDFAnalyzer:
         
         return min(confiance, 100)
     
-    def _sauvegarder_cours(self) -> List[Cours]:
+    def _sauvegarder_cours(self) -> List[Dict]:
         """
-        Sauvegarde les cours extraits en base de données
+        Remplace les cours de l'emploi du temps par les cours extraits (sans commit)
+        
+        Les anciens cours sont supprimés et les nouveaux insérés en une seule
+        instruction, dans la transaction de l'analyse : une erreur laisse
+        l'extraction précédente intacte. Les statistiques de l'emploi du temps
+        (cours, créneaux libres, heures par semaine) sont mises à jour dans la
+        même transaction.
         
         Returns:
-            Liste des cours sauvegardés
+            Lignes insérées (colonnes de Cours)
         """
-        cours_sauvegardes = []
+        lignes = []
+        vus = set()
         
         for cours_info in self.cours_extraits:
-            cours = Cours(
-                emploi_du_temps_id=self.emploi_du_temps.id,
-                jour=cours_info['jour'],
-                heure_debut=cours_info['heure_debut'],
-                heure_fin=cours_info['heure_fin'],
-                matiere=cours_info['matiere'],
-                type_cours=cours_info['type_cours'],
-                salle=cours_info['salle'],
-                recurrent=cours_info['recurrent'],
-                confiance=cours_info['confiance'],
-                texte_brut_extrait=cours_info['texte_brut']
-            )
+            ligne = {
+                'emploi_du_temps_id': self.emploi_du_temps.id,
+                'nom': cours_info['matiere'][:200],
+                'type_cours': cours_info['type_cours'],
+                'jour_semaine': cours_info['jour'],
+                'heure_debut': cours_info['heure_debut'].strftime('%H:%M'),
+                'heure_fin': cours_info['heure_fin'].strftime('%H:%M'),
+                'salle': cours_info['salle'][:100] if cours_info['salle'] else None,
+                'recurrent': cours_info['recurrent']
+            }
             
-            db.session.add(cours)
-            cours_sauvegardes.append(cours)
-        
-        return cours_sauvegardes
+            # Un cours répété (page dupliquée, semaines identiques) n'est gardé qu'une fois
+            cle = (ligne['jour_semaine'], ligne['heure_debut'], ligne['heure_fin'], ligne['nom'])
+            if cle in vus:
+                continue
+            vus.add(cle)
+            lignes.append(ligne)
+        
+        db.session.execute(delete(Cours).where(Cours.emploi_du_temps_id == self.emploi_du_temps.id))
+        if lignes:
+            db.session.execute(insert(Cours), lignes)
+        
+        minutes = sum(
+            max(vers_minutes(ligne['heure_fin']) - vers_minutes(ligne['heure_debut']), 0)
+            for ligne in lignes
+        )
+        
+        self.emploi_du_temps.nombre_cours_extraits = len(lignes)
+        self.emploi_du_temps.heures_cours_semaine = round(minutes / 60, 2)
+        self.emploi_du_temps.nombre_creneaux_libres = len(self.detecter_creneaux_libres(
+            self.emploi_du_temps,
+            cours=[SimpleNamespace(**ligne) for ligne in lignes]
+        ))
+        
+        return lignes
     
     @staticmethod
     def detecter_creneaux_libres(emploi_du_temps: EmploiDuTemps, 
                                  heure_min: time = time(8, 0),
-                                 heure_max: time = time(20, 0)) -> List[Dict]:
+                                 heure_max: time = time(20, 0),
+                                 duree_min: int = 30,
+                                 cours: Optional[List] = None) -> List[Dict]:
         """
         Détecte les créneaux libres dans l'emploi du temps
         
@@ -355,59 +525,269 @@ class PDFAnalyzer:
             emploi_du_temps: EmploiDuTemps à analyser
             heure_min: Heure de début de journée
             heure_max: Heure de fin de journée
+            duree_min: Durée minimale d'un créneau libre en minutes
+            cours: Cours à prendre en compte (par défaut ceux enregistrés)
         
         Returns:
             Liste de créneaux libres par jour
         """
+        grille = GrilleDisponibilites.semaine_depuis_cours(
+            emploi_du_temps.cours.all() if cours is None else cours,
+            heure_min,
+            heure_max
+        )
+        
         creneaux_libres = []
         
-        for jour in ['lundi', 'mardi', 'mercredi', 'jeudi', 'vendredi', 'samedi', 'dimanche']:
-            # Récupérer les cours du jour
-            cours_jour = Cours.query.filter_by(
-                emploi_du_temps_id=emploi_du_temps.id,
-                jour=jour
-            ).order_by(Cours.heure_debut).all()
-            
-            if not cours_jour:
-                # Toute la journée est libre
+        for index_jour, plages in enumerate(grille.plages_libres(duree_min)):
+            for debut, fin in plages:
                 creneaux_libres.append({
-                    'jour': jour,
-                    'heure_debut': heure_min,
-                    'heure_fin': heure_max,
-                    'duree_minutes': (heure_max.hour - heure_min.hour) * 60
+                    'jour': JOURS_SEMAINE[index_jour],
+                    'heure_debut': vers_time(debut).strftime('%H:%M'),
+                    'heure_fin': vers_time(fin).strftime('%H:%M'),
+                    'duree_minutes': fin - debut
                 })
+        
+        return creneaux_libres
+
+
+def _minutes_vers_time(minutes: float) -> time:
+    """Convertit des minutes depuis minuit en heure, arrondie à ARRONDI_GRILLE_MINUTES"""
+    minutes = int(round(minutes / ARRONDI_GRILLE_MINUTES) * ARRONDI_GRILLE_MINUTES)
+    minutes = max(0, min(minutes, 23 * 60 + 59))
+    return time(minutes // 60, minutes % 60)
+
+
+def _entetes_grille(mots: List[Dict]) -> Optional[Dict[str, Dict]]:
+    """
+    Cherche la ligne d'en-tête d'une grille
+    
+    Une ligne d'en-tête ne contient que des noms de jours, au moins
+    JOURS_ENTETE_MIN jours distincts, de gauche à droite dans l'ordre de la
+    semaine : une phrase comme « Cours du lundi au vendredi » n'en est pas une.
+    
+    Args:
+        mots: Mots de la page (pdfplumber extract_words)
+    
+    Returns:
+        Mot de chaque jour de l'en-tête le plus long, ou None
+    """
+    lignes = {}
+    for mot in mots:
+        lignes.setdefault(round(mot['top'] / TOLERANCE_LIGNE), []).append(mot)
+    
+    entetes = None
+    for mots_ligne in lignes.values():
+        mots_ligne.sort(key=lambda mot: mot['x0'])
+        jours = [mot['text'].lower().strip('.:,') for mot in mots_ligne]
+        
+        if len(jours) < JOURS_ENTETE_MIN or not all(jour in PDFAnalyzer.JOURS_SEMAINE for jour in jours):
+            continue
+        
+        rangs = [PDFAnalyzer.JOURS_SEMAINE.index(jour) for jour in jours]
+        if any(precedent >= suivant for precedent, suivant in zip(rangs, rangs[1:])):
+            continue
+        
+        if entetes is None or len(jours) > len(entetes):
+            entetes = dict(zip(jours, mots_ligne))
+    
+    return entetes
+
+
+def detecter_cours_grille(mots: List[Dict], rectangles: List[Dict] = ()) -> Optional[List[Dict]]:
+    """
+    Lit les cours d'une page organisée en grille (jours en colonnes, heures en lignes)
+    
+    Les colonnes sont délimitées à mi-distance des en-têtes de jours, les
+    lignes par les heures écrites à gauche de la première colonne. Un cours
+    encadré par un rectangle prend ses horaires aux bords du rectangle ;
+    sinon il occupe la ligne horaire où il est écrit. Des horaires écrits
+    dans la case elle-même restent prioritaires.
+    
+    Args:
+        mots: Mots de la page (pdfplumber extract_words : text, x0, x1, top, bottom)
+        rectangles: Rectangles de la page (pdfplumber rects : x0, x1, top, bottom)
+    
+    Returns:
+        Liste de cours (même format que PDFAnalyzer._detecter_cours), ou None
+        si la page n'a pas de ligne d'en-tête (voir _entetes_grille)
+    """
+    entetes = _entetes_grille(mots)
+    if entetes is None:
+        return None
+    
+    colonnes = sorted(entetes.items(), key=lambda item: item[1]['x0'] + item[1]['x1'])
+    centres = [(mot['x0'] + mot['x1']) / 2 for _, mot in colonnes]
+    limites = [2 * centres[0] - (centres[0] + centres[1]) / 2]
+    limites += [(gauche + droite) / 2 for gauche, droite in zip(centres, centres[1:])]
+    limites.append(2 * centres[-1] - (centres[-2] + centres[-1]) / 2)
+    largeur_colonne = (limites[-1] - limites[0]) / len(colonnes)
+    bas_entete = max(mot['bottom'] for _, mot in colonnes)
+    
+    # Repères horaires : première heure de chaque ligne à gauche de la grille
+    motif_heure = re.compile(PDFAnalyzer.HEURE_PATTERN)
+    reperes = {}
+    for mot in mots:
+        if mot['top'] > bas_entete and mot['x1'] <= limites[0] and motif_heure.fullmatch(mot['text']):
+            ligne = round(mot['top'] / TOLERANCE_LIGNE)
+            if ligne not in reperes or mot['x0'] < reperes[ligne]['x0']:
+                reperes[ligne] = mot
+    
+    if not reperes:
+        return None
+    
+    reperes = sorted(
+        (mot['top'], int(mot['text'][:-3]) * 60 + int(mot['text'][-2:]))
+        for mot in reperes.values()
+    )
+    hauts = [haut for haut, _ in reperes]
+    
+    def minutes_a(y: float) -> float:
+        """Heure (en minutes) à la hauteur y, interpolée entre les repères"""
+        if len(reperes) == 1:
+            return reperes[0][1]
+        index = min(max(bisect.bisect_right(hauts, y) - 1, 0), len(reperes) - 2)
+        (y0, m0), (y1, m1) = reperes[index], reperes[index + 1]
+        return m0 + (y - y0) * (m1 - m0) / (y1 - y0)
+    
+    # Cadres des cours : ni le cadre du tableau, ni les bandes de lignes
+    hauteur_grille = hauts[-1] - hauts[0]
+    cadres = [
+        rect for rect in rectangles
+        if rect['x1'] - rect['x0'] < 1.5 * largeur_colonne
+        and (not hauteur_grille or rect['bottom'] - rect['top'] < hauteur_grille)
+    ]
+    
+    # Regroupement des mots par case
+    cases = {}
+    for mot in mots:
+        x = (mot['x0'] + mot['x1']) / 2
+        y = (mot['top'] + mot['bottom']) / 2
+        
+        if mot['top'] <= bas_entete or not limites[0] <= x < limites[-1] or mot['x1'] <= limites[0]:
+            continue
+        
+        colonne = bisect.bisect_right(limites, x) - 1
+        contenants = [
+            rect for rect in cadres
+            if rect['x0'] <= x <= rect['x1'] and rect['top'] <= y <= rect['bottom']
+        ]
+        
+        if contenants:
+            cadre = min(contenants, key=lambda rect: (rect['x1'] - rect['x0']) * (rect['bottom'] - rect['top']))
+            cle = (colonne, 'cadre', cadre['top'], cadre['x0'])
+            bornes = (minutes_a(cadre['top']), minutes_a(cadre['bottom']))
+        else:
+            ligne_horaire = bisect.bisect_right(hauts, mot['top'] + TOLERANCE_LIGNE) - 1
+            if ligne_horaire < 0:
                 continue
-            
-            # Chercher les trous entre les cours
-            heure_courante = heure_min
-            
-            for cours in cours_jour:
-                if cours.heure_debut > heure_courante:
-                    # Créneau libre trouvé
-                    duree = (cours.heure_debut.hour - heure_courante.hour) * 60
-                    duree += cours.heure_debut.minute - heure_courante.minute
-                    
-                    if duree >= 30:  # Au moins 30 minutes
-                        creneaux_libres.append({
-                            'jour': jour,
-                            'heure_debut': heure_courante,
-                            'heure_fin': cours.heure_debut,
-                            'duree_minutes': duree
-                        })
-                
-                heure_courante = cours.heure_fin
-            
-            # Vérifier s'il reste du temps après le dernier cours
-            if heure_courante < heure_max:
-                duree = (heure_max.hour - heure_courante.hour) * 60
-                duree += heure_max.minute - heure_courante.minute
-                
-                if duree >= 30:
-                    creneaux_libres.append({
-                        'jour': jour,
-                        'heure_debut': heure_courante,
-                        'heure_fin': heure_max,
-                        'duree_minutes': duree
-                    })
-        
-        return creneaux_libres
\ No newline at end of file
+            cle = (colonne, 'ligne', ligne_horaire)
+            debut = reperes[ligne_horaire][1]
+            if ligne_horaire + 1 < len(reperes):
+                fin = reperes[ligne_horaire + 1][1]
+            else:
+                fin = debut + (debut - reperes[ligne_horaire - 1][1] if ligne_horaire else 60)
+            bornes = (debut, fin)
+        
+        cases.setdefault(cle, (bornes, []))[1].append(mot)
+    
+    cours = []
+    for (colonne, *_), ((debut, fin), mots_case) in sorted(cases.items(), key=lambda item: (item[0][0], item[1][0])):
+        mots_case.sort(key=lambda mot: (round(mot['top'] / TOLERANCE_LIGNE), mot['x0']))
+        texte = ' '.join(mot['text'] for mot in mots_case)
+        jetons = PDFAnalyzer.TOKENISEUR.analyser(texte, complet=True)
+        
+        if jetons.plages and jetons.plages[0][1] is not None:
+            heure_debut, heure_fin = jetons.plages[0]
+        else:
+            heure_debut, heure_fin = _minutes_vers_time(debut), _minutes_vers_time(fin)
+        
+        cours.append({
+            'jour': colonnes[colonne][0],
+            'heure_debut': heure_debut,
+            'heure_fin': heure_fin,
+            'matiere': jetons.matiere,
+            'type_cours': jetons.type_cours,
+            'salle': jetons.salle,
+            'texte_brut': texte,
+            'confiance': PDFAnalyzer._calculer_confiance(jetons.matiere, heure_debut, heure_fin, jetons.salle),
+            'recurrent': True
+        })
+    
+    return cours
+
+
+def _extraire_pages(pdf, debut: int, fin: int, mode: str = MODE_TEXTE) -> List[Tuple[int, str, float, Optional[List[Dict]]]]:
+    """
+    Extrait le texte des pages [debut, fin) d'un PDF ouvert
+    
+    Args:
+        pdf: Document pdfplumber
+        debut: Index de la première page
+        fin: Index de fin (exclu, borné au nombre de pages)
+        mode: Mode d'extraction ; hors mode texte, les grilles sont lues
+    
+    Returns:
+        Liste de tuples (index de page, texte, durée en millisecondes,
+        cours de la grille ou None)
+    """
+    pages = []
+    
+    for index in range(debut, min(fin, len(pdf.pages))):
+        depart = chrono.perf_counter()
+        page = pdf.pages[index]
+        texte = page.extract_text() or ''
+        cours = None
+        if mode != MODE_TEXTE:
+            cours = detecter_cours_grille(page.extract_words(), page.rects)
+        # Libère les objets de la page : la mémoire reste bornée sur les longs documents
+        page.flush_cache()
+        pages.append((index, texte, round((chrono.perf_counter() - depart) * 1000, 2), cours))
+    
+    return pages
+
+
+def extraire_pages(pdf_path: str, debut: int, fin: int, mode: str = MODE_TEXTE) -> List[Tuple[int, str, float, Optional[List[Dict]]]]:
+    """
+    Extrait le texte d'une plage de pages (exécutable dans un processus de travail)
+    
+    Args:
+        pdf_path: Chemin du fichier PDF
+        debut: Index de la première page
+        fin: Index de fin (exclu)
+        mode: Mode d'extraction
+    
+    Returns:
+        Liste de tuples (index de page, texte, durée en millisecondes,
+        cours de la grille ou None)
+    """
+    with pdfplumber.open(pdf_path) as pdf:
+        return _extraire_pages(pdf, debut, fin, mode)
+
+
+def compter_pages(pdf_path: str) -> int:
+    """
+    Compte les pages d'un PDF sans en extraire le texte
+    
+    Args:
+        pdf_path: Chemin du fichier PDF
+    
+    Returns:
+        Nombre de pages
+    """
+    with pdfplumber.open(pdf_path) as pdf:
+        return len(pdf.pages)
+
+
+def extraire_cours_pdf(pdf_path: str, mode: str = MODE_AUTO) -> Dict:
+    """
+    Extrait les cours d'un PDF (exécutable dans un processus de travail)
+    
+    Args:
+        pdf_path: Chemin du fichier PDF
+        mode: Mode d'extraction (MODES_EXTRACTION)
+    
+    Returns:
+        Dict avec le texte brut, la liste des cours détectés et l'algorithme retenu
+    """
+    return PDFAnalyzer(None, pdf_path, mode).extraire()
@@ -3,11 +3,102 @@ Service d'Intelligence Artificielle pour la génération de plannings d'études
 Algorithme optimisé tenant compte des priorités, coefficients, et préférences
 """
 
+import heapq
+import os
 import random
+import re
+import unicodedata
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Tuple
 import json
 
+import numpy as np
+
+from app.services.cache_plannings import cache_plannings, empreinte
+
+
+# Catalogue des sujets d'étude par matière et par niveau
+CHEMIN_CATALOGUE_SUJETS = os.path.join(os.path.dirname(__file__), 'data', 'sujets_etude.json')
+
+
+def normaliser_texte(texte: str) -> str:
+    """
+    Met un texte en minuscules sans accents ('Mathématiques' -> 'mathematiques')
+    """
+    decompose = unicodedata.normalize('NFKD', (texte or '').lower().replace('œ', 'oe').replace('æ', 'ae'))
+    return ''.join(caractere for caractere in decompose if not unicodedata.combining(caractere))
+
+
+class CatalogueSujets:
+    """
+    Suggestions de sujets d'étude, reconnues à partir du nom de la matière
+    
+    Tous les alias du catalogue sont réunis dans une seule expression
+    régulière compilée au chargement : un nom de matière est reconnu en un
+    seul parcours, sans tenir compte des accents ni de la casse. Un alias
+    n'est reconnu que comme mot entier ('aromatherapie' ne contient pas 'math').
+    """
+    
+    NIVEAUX = ['facile', 'moyen', 'difficile']
+    
+    def __init__(self, donnees: Dict[str, Any]):
+        self.matieres = {nom: entree['niveaux'] for nom, entree in donnees['matieres'].items()}
+        self.defaut = donnees['default']
+        
+        # Alias normalisé -> matière du catalogue
+        self.alias = {}
+        for nom, entree in donnees['matieres'].items():
+            for alias in [nom] + entree.get('alias', []):
+                self.alias.setdefault(normaliser_texte(alias), nom)
+        
+        # Alias les plus longs d'abord : 'mathematiques' est préféré à 'math'
+        self.motif = re.compile(r'\b(?:' + '|'.join(
+            re.escape(alias) for alias in sorted(self.alias, key=len, reverse=True)
+        ) + r')\b')
+    
+    @classmethod
+    def depuis_fichier(cls, chemin: str = CHEMIN_CATALOGUE_SUJETS) -> 'CatalogueSujets':
+        """
+        Charge le catalogue depuis un fichier JSON
+        
+        Args:
+            chemin: Chemin du fichier ({"matieres": {...}, "default": {...}})
+        
+        Returns:
+            Catalogue prêt à l'emploi
+        """
+        with open(chemin, encoding='utf-8') as fichier:
+            return cls(json.load(fichier))
+    
+    def reconnaitre(self, nom_matiere: str) -> str:
+        """
+        Retourne la matière du catalogue correspondant à un nom libre
+        
+        Returns:
+            Nom de la matière du catalogue, ou None si aucune ne correspond
+        """
+        correspondance = self.motif.search(normaliser_texte(nom_matiere))
+        return self.alias[correspondance.group(0)] if correspondance else None
+    
+    def suggestions(self, nom_matiere: str, niveau: str = 'moyen') -> List[str]:
+        """
+        Retourne les sujets suggérés pour une matière et un niveau
+        
+        Args:
+            nom_matiere: Nom de la matière (ex: 'Maths', 'mathematiques')
+            niveau: 'facile', 'moyen' ou 'difficile' (défaut 'moyen' si inconnu)
+        
+        Returns:
+            Liste de sujets (copie modifiable)
+        """
+        niveaux = self.matieres.get(self.reconnaitre(nom_matiere), self.defaut)
+        return list(niveaux.get(niveau, niveaux['moyen']))
+
+
+# Chargé une seule fois à l'import
+catalogue_sujets = CatalogueSujets.depuis_fichier()
+
+
 class PlanningAI:
     """
     Service d'IA pour générer des plannings d'études optimisés
@@ -25,7 +116,8 @@ class PlanningAI:
         matieres: List[Dict[str, Any]],
         preferences: Dict[str, Any],
         date_debut: datetime,
-        date_fin: datetime
+        date_fin: datetime,
+        vectorise: bool = True
     ) -> List[Dict[str, Any]]:
         """
         Génère un planning d'études optimisé
@@ -35,11 +127,42 @@ class PlanningAI:
             preferences: Préférences utilisateur (heures, durée sessions, etc.)
             date_debut: Date de début du planning
             date_fin: Date de fin du planning
+            vectorise: Construire la grille jours × créneaux avec NumPy
+                (False = parcours jour par jour, même résultat)
             
         Returns:
             Liste des sessions d'étude générées
         """
         
+        # Même matières (avec leur date_modification), préférences et période : résultat mémorisé
+        cle = empreinte({
+            'moteur': 'planning_ai',
+            'matieres': matieres,
+            'preferences': preferences,
+            'periode': [date_debut, date_fin],
+            'durees': [self.default_session_duration, self.break_duration]
+        })
+        memorise = cache_plannings.obtenir(cle)
+        if memorise is not None:
+            return [dict(session) for session in memorise]
+        
+        generer = self._generer_planning_vectorise if vectorise else self._generer_planning
+        sessions = generer(matieres, preferences, date_debut, date_fin)
+        cache_plannings.enregistrer(cle, tuple(dict(session) for session in sessions), len(sessions))
+        
+        return sessions
+    
+    def _generer_planning(
+        self,
+        matieres: List[Dict[str, Any]],
+        preferences: Dict[str, Any],
+        date_debut: datetime,
+        date_fin: datetime
+    ) -> List[Dict[str, Any]]:
+        """
+        Calcule le planning sans passer par le cache
+        """
+        
         # Extraction des préférences
         session_duration = preferences.get('duree_session', self.default_session_duration)
         heure_debut = preferences.get('heure_debut', '09:00')
@@ -49,6 +172,10 @@ class PlanningAI:
         # Calcul du score de priorité pour chaque matière
         matieres_ponderees = self._calculate_priorities(matieres)
         
+        # File d'allocation commune à toute la période : les parts de créneaux
+        # restent proportionnelles aux scores d'un jour à l'autre
+        file_matieres = self._creer_file_allocation(matieres_ponderees)
+        
         # Génération du planning
         sessions = []
         current_date = date_debut
@@ -62,7 +189,8 @@ class PlanningAI:
                     matieres_ponderees,
                     session_duration,
                     heure_debut,
-                    heure_fin
+                    heure_fin,
+                    file_matieres
                 )
                 sessions.extend(daily_sessions)
             
@@ -70,6 +198,77 @@ class PlanningAI:
         
         return sessions
     
+    def _generer_planning_vectorise(
+        self,
+        matieres: List[Dict[str, Any]],
+        preferences: Dict[str, Any],
+        date_debut: datetime,
+        date_fin: datetime
+    ) -> List[Dict[str, Any]]:
+        """
+        Calcule le planning à partir d'une grille NumPy jours × créneaux
+        
+        Les jours travaillés sont filtrés par un masque sur le jour de la
+        semaine et les créneaux (identiques chaque jour) sont calculés une
+        seule fois ; les dates et heures ne sont formatées qu'à la
+        construction des sessions.
+        """
+        session_duration = preferences.get('duree_session', self.default_session_duration)
+        heure_debut = preferences.get('heure_debut', '09:00')
+        heure_fin = preferences.get('heure_fin', '18:00')
+        jours_semaine = preferences.get('jours_semaine', [0, 1, 2, 3, 4])  # Lun-Ven
+        
+        matieres_ponderees = self._calculate_priorities(matieres)
+        if not matieres_ponderees:
+            return []
+        
+        # Jours de la période (même borne que le parcours jour par jour)
+        nombre_jours = max((date_fin - date_debut).days + 1, 0)
+        premier_jour = date_debut.date() if isinstance(date_debut, datetime) else date_debut
+        jours = np.datetime64(premier_jour, 'D') + np.arange(nombre_jours)
+        
+        # Le 1er janvier 1970 était un jeudi (weekday 3)
+        jours = jours[np.isin((jours.astype(np.int64) + 3) % 7, jours_semaine)]
+        
+        # Minutes de début des créneaux d'une journée
+        debut_h, debut_m = map(int, heure_debut.split(':'))
+        fin_h, fin_m = map(int, heure_fin.split(':'))
+        debuts = np.arange(
+            debut_h * 60 + debut_m,
+            fin_h * 60 + fin_m - session_duration + 1,
+            session_duration + self.break_duration
+        )
+        
+        if not len(jours) or not len(debuts):
+            return []
+        
+        # Même ordre d'attribution que le parcours jour par jour (chronologique)
+        file_matieres = self._creer_file_allocation(matieres_ponderees)
+        choisies = [
+            self._prochaine_matiere(file_matieres, matieres_ponderees)
+            for _ in range(len(jours) * len(debuts))
+        ]
+        
+        dates = np.repeat(np.datetime_as_string(jours, unit='D'), len(debuts)).tolist()
+        heures_debut = [f'{minute // 60:02d}:{minute % 60:02d}' for minute in debuts.tolist()] * len(jours)
+        heures_fin = [
+            f'{minute // 60:02d}:{minute % 60:02d}' for minute in (debuts + session_duration).tolist()
+        ] * len(jours)
+        
+        return [
+            {
+                'matiere_id': matiere['id'],
+                'matiere_nom': matiere['nom'],
+                'date': date,
+                'heure_debut': debut,
+                'heure_fin': fin,
+                'duree': session_duration,
+                'type': 'revision',
+                'terminee': False
+            }
+            for matiere, date, debut, fin in zip(choisies, dates, heures_debut, heures_fin)
+        ]
+    
     def _calculate_priorities(self, matieres: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
         Calcule un score de priorité pour chaque matière
@@ -97,16 +296,72 @@ class PlanningAI:
         
         return matieres_ponderees
     
+    def _creer_file_allocation(
+        self,
+        matieres_ponderees: List[Dict[str, Any]],
+        sessions_deja_faites: Dict[Any, int] = None
+    ) -> List[Tuple[float, int, float]]:
+        """
+        Crée la file de priorité de l'allocation proportionnelle (stride scheduling)
+        
+        Chaque matière avance d'un pas 1 / score à chaque créneau reçu ; le
+        créneau suivant revient à la matière de plus petit temps virtuel. Sur
+        la période, chaque matière obtient donc une part proportionnelle à son
+        score, en O(log k) par créneau pour k matières.
+        
+        Args:
+            matieres_ponderees: Matières triées par score décroissant
+            sessions_deja_faites: Sessions déjà comptées par matiere_id
+                (le temps virtuel de départ en tient compte)
+        
+        Returns:
+            Tas de tuples (temps_virtuel, rang, pas), rang = index dans matieres_ponderees
+        """
+        sessions_deja_faites = sessions_deja_faites or {}
+        file_matieres = []
+        
+        for rang, matiere in enumerate(matieres_ponderees):
+            # Un score nul ou négatif garde une petite part
+            pas = 1 / max(matiere['score_priorite'], 0.01)
+            deja_faites = sessions_deja_faites.get(matiere['id'], 0)
+            file_matieres.append((pas * (deja_faites + 1), rang, pas))
+        
+        heapq.heapify(file_matieres)
+        
+        return file_matieres
+    
+    def _prochaine_matiere(
+        self,
+        file_matieres: List[Tuple[float, int, float]],
+        matieres_ponderees: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """
+        Attribue le prochain créneau et avance le temps virtuel de la matière choisie
+        
+        Égalité de temps virtuel : la matière de meilleur score passe en premier.
+        
+        Returns:
+            Matière à planifier
+        """
+        temps_virtuel, rang, pas = file_matieres[0]
+        heapq.heapreplace(file_matieres, (temps_virtuel + pas, rang, pas))
+        
+        return matieres_ponderees[rang]
+    
     def _generate_daily_sessions(
         self,
         date: datetime,
         matieres: List[Dict[str, Any]],
         session_duration: int,
         heure_debut: str,
-        heure_fin: str
+        heure_fin: str,
+        file_matieres: List[Tuple[float, int, float]] = None
     ) -> List[Dict[str, Any]]:
         """
         Génère les sessions pour une journée donnée
+        
+        La matière de chaque créneau est tirée de file_matieres, partagée
+        entre les jours (une file propre à la journée si elle est absente).
         """
         sessions = []
         
@@ -117,15 +372,15 @@ class PlanningAI:
         current_time = datetime(date.year, date.month, date.day, debut_h, debut_m)
         end_time = datetime(date.year, date.month, date.day, fin_h, fin_m)
         
-        # Compteur pour rotation des matières
-        matiere_index = 0
+        if not matieres:
+            return sessions
+        
+        if file_matieres is None:
+            file_matieres = self._creer_file_allocation(matieres)
         
         while current_time + timedelta(minutes=session_duration) <= end_time:
-            # Sélectionner la matière selon l'algorithme
-            if matiere_index >= len(matieres):
-                matiere_index = 0
-            
-            matiere = matieres[matiere_index]
+            # Sélectionner la matière selon l'allocation proportionnelle
+            matiere = self._prochaine_matiere(file_matieres, matieres)
             
             # Créer la session
             session = {
@@ -143,7 +398,6 @@ class PlanningAI:
             
             # Passer à la session suivante (avec pause)
             current_time += timedelta(minutes=session_duration + self.break_duration)
-            matiere_index += 1
         
         return sessions
     
@@ -154,24 +408,32 @@ class PlanningAI:
     ) -> List[Dict[str, Any]]:
         """
         Optimise un planning existant en fonction des nouvelles données
+        
+        Les créneaux des sessions non terminées sont conservés ; leurs
+        matières sont réattribuées dans l'ordre chronologique par l'allocation
+        proportionnelle, en tenant compte des sessions déjà terminées.
         """
         # Recalculer les priorités
         matieres_ponderees = self._calculate_priorities(matieres)
         
-        # Réorganiser les sessions non terminées
         sessions_non_terminees = [s for s in sessions if not s.get('terminee', False)]
         sessions_terminees = [s for s in sessions if s.get('terminee', False)]
         
-        # Créer un mapping matiere_id -> score
-        scores = {m['id']: m['score_priorite'] for m in matieres_ponderees}
+        if not matieres_ponderees:
+            return sessions_terminees + sessions_non_terminees
         
-        # Trier les sessions par score de priorité décroissant
-        sessions_non_terminees.sort(
-            key=lambda s: scores.get(s['matiere_id'], 0),
-            reverse=True
-        )
+        sessions_faites = {}
+        for session in sessions_terminees:
+            sessions_faites[session['matiere_id']] = sessions_faites.get(session['matiere_id'], 0) + 1
+        
+        file_matieres = self._creer_file_allocation(matieres_ponderees, sessions_faites)
+        
+        sessions_reparties = []
+        for session in sorted(sessions_non_terminees, key=lambda s: (s.get('date', ''), s.get('heure_debut', ''))):
+            matiere = self._prochaine_matiere(file_matieres, matieres_ponderees)
+            sessions_reparties.append(dict(session, matiere_id=matiere['id'], matiere_nom=matiere['nom']))
         
-        return sessions_terminees + sessions_non_terminees
+        return sessions_terminees + sessions_reparties
     
     def suggest_study_topics(
         self,
@@ -180,49 +442,39 @@ class PlanningAI:
     ) -> List[str]:
         """
         Suggère des sujets d'étude pour une matière donnée
-        Basé sur le nom de la matière et le niveau
+        Basé sur le nom de la matière (sans tenir compte des accents) et le niveau
         """
-        suggestions_db = {
-            'mathématiques': {
-                'facile': ['Révision des bases', 'Exercices simples', 'Formules essentielles'],
-                'moyen': ['Problèmes types', 'Démonstrations', 'Applications pratiques'],
-                'difficile': ['Problèmes complexes', 'Théorèmes avancés', 'Cas particuliers']
-            },
-            'physique': {
-                'facile': ['Lois fondamentales', 'Unités et conversions', 'Schémas simples'],
-                'moyen': ['Exercices d\'application', 'Expériences types', 'Analyse de phénomènes'],
-                'difficile': ['Problèmes composés', 'Modélisation avancée', 'Cas réels']
-            },
-            'informatique': {
-                'facile': ['Syntaxe de base', 'Structures simples', 'Debugging'],
-                'moyen': ['Algorithmes courants', 'Structures de données', 'POO'],
-                'difficile': ['Optimisation', 'Architectures complexes', 'Design patterns']
-            },
-            'chimie': {
-                'facile': ['Tableau périodique', 'Nomenclature', 'Équations simples'],
-                'moyen': ['Réactions types', 'Stœchiométrie', 'Équilibres'],
-                'difficile': ['Mécanismes réactionnels', 'Synthèses', 'Analyses']
-            },
-            'default': {
-                'facile': ['Concepts de base', 'Vocabulaire', 'Exercices simples'],
-                'moyen': ['Applications pratiques', 'Exercices types', 'Méthodologie'],
-                'difficile': ['Cas complexes', 'Synthèse', 'Analyse critique']
-            }
-        }
+        return catalogue_sujets.suggestions(matiere.get('nom', ''), niveau_difficulte)
+    
+    def suggest_study_topics_batch(
+        self,
+        matieres: List[Dict[str, Any]],
+        niveau_difficulte: str = None
+    ) -> Dict[Any, Dict[str, Any]]:
+        """
+        Suggère des sujets d'étude pour toutes les matières en un appel
         
-        matiere_nom = matiere.get('nom', '').lower()
+        Sans niveau imposé, celui de chaque matière est déduit de son
+        niveau_difficulte (1-10) : 1-3 facile, 4-7 moyen, 8-10 difficile.
         
-        # Chercher la matière dans la base
-        suggestions = None
-        for key in suggestions_db:
-            if key in matiere_nom:
-                suggestions = suggestions_db[key]
-                break
+        Returns:
+            Dictionnaire id de matière -> nom, niveau et suggestions
+        """
+        resultat = {}
         
-        if not suggestions:
-            suggestions = suggestions_db['default']
+        for matiere in matieres:
+            niveau = niveau_difficulte
+            if niveau is None:
+                difficulte = matiere.get('niveau_difficulte') or 5
+                niveau = 'facile' if difficulte <= 3 else 'moyen' if difficulte <= 7 else 'difficile'
+            
+            resultat[matiere['id']] = {
+                'nom': matiere.get('nom', ''),
+                'niveau': niveau,
+                'suggestions': catalogue_sujets.suggestions(matiere.get('nom', ''), niveau)
+            }
         
-        return suggestions.get(niveau_difficulte, suggestions['moyen'])
+        return resultat
     
     def calculate_study_load(
         self,
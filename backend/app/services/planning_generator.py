@@ -4,7 +4,9 @@ Utilise des algorithmes d'optimisation pour créer des plannings intelligents
 """
 
 from datetime import datetime, date, time, timedelta
-from typing import List, Dict, Optional
+from itertools import groupby
+from typing import List, Dict, Optional, NamedTuple, Iterable, Iterator, Callable
+from sqlalchemy import insert, delete
 from app import db
 from app.models.user import User
 from app.models.matiere import Matiere
@@ -13,8 +15,99 @@ from app.models.planning import Planning
 from app.models.session import Session
 from app.models.emploi_du_temps import EmploiDuTemps
 from app.models.cours import Cours
+from app.services.planning_optimizer import OptimiseurPlanning
+from app.services.allocation_lp import AllocateurLP
+from app.services.cache_plannings import cache_plannings, empreinte
+from app.services.creneaux_libres import GrilleDisponibilites, JOURS_SEMAINE, vers_minutes, vers_time
 
+import heapq
 import random
+import time as chrono
+
+
+# Modes de génération des sessions
+MODE_JOUR = 'jour'
+MODE_SEMAINE_TYPE = 'semaine_type'
+MODE_ALLOCATION_LP = 'allocation_lp'
+MODES_GENERATION = [MODE_JOUR, MODE_SEMAINE_TYPE, MODE_ALLOCATION_LP]
+
+# Nombre de sessions insérées par instruction lors d'une génération en flux
+TAILLE_LOT_FLUX = 1000
+
+ALGORITHMES_PAR_MODE = {
+    MODE_JOUR: 'priority_based_scheduling',
+    MODE_SEMAINE_TYPE: 'weekly_template_scheduling',
+    MODE_ALLOCATION_LP: 'lp_allocation'
+}
+
+
+class SessionGeneree(NamedTuple):
+    """
+    Session produite par le générateur, avant persistance
+    
+    Les champs portent les noms des colonnes de la table sessions
+    """
+    matiere_id: int
+    tache_associee_id: Optional[int]
+    date: date
+    heure_debut: datetime
+    heure_fin: datetime
+    duree: int
+    titre: str
+    description: str
+    type_session: str
+
+
+def _appliquer_session_generee(session: Session, generee: SessionGeneree) -> bool:
+    """
+    Recopie les champs d'une session générée sur une session existante
+    
+    Args:
+        session: Session persistée à mettre à jour
+        generee: Nouvelle version calculée par le générateur
+    
+    Returns:
+        True si au moins un champ a changé
+    """
+    modifiee = False
+    
+    for champ, valeur in generee._asdict().items():
+        if getattr(session, champ) != valeur:
+            setattr(session, champ, valeur)
+            modifiee = True
+    
+    return modifiee
+
+
+def inserer_sessions_en_masse(planning_id: int, sessions: Iterable[SessionGeneree]) -> List[int]:
+    """
+    Insère des sessions générées en une seule instruction multi-lignes
+    
+    Contourne la construction des objets ORM (Session.__init__ et unit of work) ;
+    les identifiants sont renvoyés dans l'ordre des sessions fournies.
+    Ne commit pas : la transaction reste à la charge de l'appelant.
+    
+    Args:
+        planning_id: Planning parent
+        sessions: Sessions générées
+    
+    Returns:
+        Liste des identifiants insérés
+    """
+    lignes = [
+        dict(session._asdict(), planning_id=planning_id, completee=False, genere_auto=True)
+        for session in sessions
+    ]
+    
+    if not lignes:
+        return []
+    
+    resultat = db.session.execute(
+        insert(Session).returning(Session.id, sort_by_parameter_order=True),
+        lignes
+    )
+    
+    return list(resultat.scalars())
 
 
 class PlanningGenerator:
@@ -22,27 +115,134 @@ class PlanningGenerator:
     Générateur de planning d'étude intelligent
     """
     
-    def __init__(self, user: User):
+    def __init__(self, user: User, repartir_taches: bool = False,
+                 donnees: Dict = None):
         """
         Initialise le générateur pour un utilisateur
         
         Args:
             user: Utilisateur pour lequel générer le planning
+            repartir_taches: Répartir les sessions entre les tâches d'une même
+                matière au lieu de toujours associer la plus prioritaire
+            donnees: Données déjà chargées (traitement par lots), clés
+                'matieres', 'taches', 'emploi_du_temps' et 'cours' ; les clés
+                absentes sont chargées depuis la base
         """
+        donnees = donnees or {}
+        
         self.user = user
-        self.matieres = list(user.matieres.all())
-        self.taches = list(user.taches.filter(Tache.etat.in_(['a_faire', 'en_cours'])).all())
+        self.matieres = list(donnees['matieres'] if 'matieres' in donnees else user.matieres.all())
+        self.taches = list(
+            donnees['taches'] if 'taches' in donnees
+            else user.taches.filter(Tache.etat.in_(['a_faire', 'en_cours'])).all()
+        )
+        self.repartir_taches = repartir_taches
         self.emploi_du_temps = None
+        self.ids_sessions = []
+        
+        # Files de priorité des tâches ouvertes, une par matière
+        self.files_taches = self._construire_files_taches()
         
         # Récupérer l'emploi du temps s'il existe
-        emplois = EmploiDuTemps.query.filter_by(utilisateur_id=user.id).all()
-        if emplois:
-            self.emploi_du_temps = emplois[0]  # Prendre le premier
+        if 'emploi_du_temps' in donnees:
+            self.emploi_du_temps = donnees['emploi_du_temps']
+        else:
+            emplois = EmploiDuTemps.query.filter_by(user_id=user.id).all()
+            if emplois:
+                self.emploi_du_temps = emplois[0]  # Prendre le premier
+        
+        # Index des cours par jour, chargé une seule fois pour toute la génération
+        self.cours_par_jour = self._indexer_cours(donnees.get('cours'))
+        
+        # Les cours bornés par des dates ne s'appliquent qu'à une partie des semaines
+        self.cours_dates_par_jour = {
+            jour: [cours for cours in cours_du_jour if cours.date_debut or cours.date_fin]
+            for jour, cours_du_jour in self.cours_par_jour.items()
+        }
+        
+        # Disponibilités hebdomadaires : cours permanents et heures productives de l'utilisateur
+        self.grille_semaine = GrilleDisponibilites.semaine_depuis_cours(
+            [
+                cours
+                for cours_du_jour in self.cours_par_jour.values()
+                for cours in cours_du_jour
+                if not (cours.date_debut or cours.date_fin)
+            ],
+            self.user.heure_productive_debut or time(8, 0),
+            self.user.heure_productive_fin or time(22, 0)
+        )
+        
+        # Intervalles déjà occupés par date (sessions conservées lors d'une replanification)
+        self.occupations_par_date = {}
+        self.sessions_fixes_par_date = {}
+        
+        # Informations sur la dernière génération (mode, semaines calculées)
+        self.statistiques = {}
+    
+    def _construire_files_taches(self) -> Dict[int, List[tuple]]:
+        """
+        Construit un tas de tâches ouvertes pour chaque matière
+        
+        Ordre : nombre de sessions déjà associées, priorité décroissante,
+        date limite croissante (sans date limite en dernier)
+        
+        Returns:
+            Dictionnaire matiere_id -> tas de tâches
+        """
+        files_taches = {}
+        
+        for tache in self.taches:
+            if tache.matiere_id is None:
+                continue
+            
+            entree = (
+                0,
+                -(tache.priorite or 0),
+                tache.date_limite or datetime.max,
+                tache.id,
+                tache
+            )
+            files_taches.setdefault(tache.matiere_id, []).append(entree)
+        
+        for file_taches in files_taches.values():
+            heapq.heapify(file_taches)
+        
+        return files_taches
+    
+    def _indexer_cours(self, cours: List[Cours] = None) -> Dict[str, List[Cours]]:
+        """
+        Charge tous les cours de l'emploi du temps en une seule requête
+        et les regroupe par jour de la semaine
+        
+        Args:
+            cours: Cours déjà chargés (None = requête sur l'emploi du temps)
+        
+        Returns:
+            Dictionnaire jour -> cours triés par heure de début
+        """
+        cours_par_jour = {}
+        
+        if cours is None:
+            if not self.emploi_du_temps:
+                return cours_par_jour
+            cours = self.emploi_du_temps.cours.all()
+        
+        for un_cours in cours:
+            jour = (un_cours.jour_semaine or '').strip().lower()
+            cours_par_jour.setdefault(jour, []).append(un_cours)
+        
+        for cours_du_jour in cours_par_jour.values():
+            cours_du_jour.sort(key=lambda c: vers_minutes(c.heure_debut))
+        
+        return cours_par_jour
     
     def generer_planning_automatique(self, date_debut: date, date_fin: date,
                                     heures_etude_par_jour: float = 4.0,
                                     jours_etude_par_semaine: int = 6,
-                                    jours_repos: List[str] = None) -> Planning:
+                                    jours_repos: List[str] = None,
+                                    insertion_en_masse: bool = True,
+                                    mode: str = MODE_JOUR,
+                                    commit: bool = True) -> Planning:
         """
         Génère un planning d'étude automatique optimisé
         
@@ -52,6 +252,13 @@ class PlanningGenerator:
             heures_etude_par_jour: Nombre d'heures d'étude par jour
             jours_etude_par_semaine: Nombre de jours d'étude par semaine
             jours_repos: Liste des jours de repos (ex: ['dimanche'])
+            insertion_en_masse: Insérer les sessions en une instruction au lieu
+                de passer par un objet ORM par session
+            mode: 'jour' (calcul jour par jour), 'semaine_type' (une semaine
+                calculée puis répliquée, seules les semaines différentes sont recalculées)
+                ou 'allocation_lp' (affectation optimale par programmation linéaire)
+            commit: Valider la transaction (False = flush seulement, l'appelant
+                valide, par exemple une fois par lot d'utilisateurs)
         
         Returns:
             Planning généré
@@ -59,46 +266,508 @@ class PlanningGenerator:
         if jours_repos is None:
             jours_repos = ['dimanche']
         
-        # Créer le planning
-        planning = Planning(
-            utilisateur_id=self.user.id,
-            nom=f"Planning {date_debut.strftime('%d/%m/%Y')} - {date_fin.strftime('%d/%m/%Y')}",
-            description="Planning généré automatiquement",
+        if mode not in MODES_GENERATION:
+            raise ValueError(f"Mode de génération inconnu : {mode}")
+        
+        matieres_prioritaires = self._calculer_matieres_prioritaires()
+        sessions = self._calculer_sessions(date_debut, date_fin, heures_etude_par_jour,
+                                           jours_repos, matieres_prioritaires, mode)
+        
+        return self._enregistrer_planning(
             date_debut=date_debut,
             date_fin=date_fin,
-            type_planning='automatique',
             heures_etude_par_jour=heures_etude_par_jour,
             jours_etude_par_semaine=jours_etude_par_semaine,
-            jours_repos=','.join(jours_repos),
-            algorithme_utilise='priority_based_scheduling',
-            statut='actif'
+            jours_repos=jours_repos,
+            mode=self.mode_execute(mode),
+            sessions=sessions,
+            matieres_prioritaires=matieres_prioritaires,
+            insertion_en_masse=insertion_en_masse,
+            commit=commit
         )
+    
+    def mode_execute(self, mode_demande: str) -> str:
+        """
+        Mode qui a réellement produit les dernières sessions
         
-        db.session.add(planning)
-        db.session.flush()  # Pour obtenir l'ID du planning
+        Diffère du mode demandé quand 'allocation_lp' s'est replié sur le
+        calcul jour par jour (problème trop grand pour le solveur).
+        
+        Args:
+            mode_demande: Mode passé à la génération
+        
+        Returns:
+            Mode exécuté
+        """
+        return self.statistiques.get('mode', mode_demande)
+    
+    def generer_planning_en_flux(self, date_debut: date, date_fin: date,
+                                 heures_etude_par_jour: float = 4.0,
+                                 jours_etude_par_semaine: int = 6,
+                                 jours_repos: List[str] = None,
+                                 mode: str = MODE_JOUR,
+                                 taille_lot: int = TAILLE_LOT_FLUX,
+                                 commit: bool = True,
+                                 progression: Callable[[int], None] = None) -> Planning:
+        """
+        Génère un planning long en flux : les sessions sont produites semaine
+        par semaine et insérées par lots bornés
+        
+        La mémoire utilisée ne dépend pas de la durée de la période (hors mode
+        'allocation_lp') : aucune liste de toutes les sessions n'est construite
+        et le score est calculé à partir de compteurs par matière. Le planning
+        reste en 'brouillon' jusqu'à la fin ; avec commit, chaque lot est validé
+        et un échec supprime le planning partiel.
+        
+        Args:
+            date_debut: Date de début du planning
+            date_fin: Date de fin du planning
+            heures_etude_par_jour: Nombre d'heures d'étude par jour
+            jours_etude_par_semaine: Nombre de jours d'étude par semaine
+            jours_repos: Liste des jours de repos (ex: ['dimanche'])
+            mode: Mode de génération ('jour', 'semaine_type' ou 'allocation_lp')
+            taille_lot: Nombre de sessions insérées par instruction
+            commit: Valider chaque lot (False = flush seulement)
+            progression: Fonction appelée avec l'avancement (0-100) après chaque lot
+        
+        Returns:
+            Planning généré
+        """
+        if jours_repos is None:
+            jours_repos = ['dimanche']
+        
+        if mode not in MODES_GENERATION:
+            raise ValueError(f"Mode de génération inconnu : {mode}")
+        
+        matieres_prioritaires = self._calculer_matieres_prioritaires()
+        debut_generation = chrono.perf_counter()
+        
+        planning = self._enregistrer_planning(
+            date_debut=date_debut,
+            date_fin=date_fin,
+            heures_etude_par_jour=heures_etude_par_jour,
+            jours_etude_par_semaine=jours_etude_par_semaine,
+            jours_repos=jours_repos,
+            mode=mode,
+            sessions=[],
+            matieres_prioritaires=matieres_prioritaires,
+            commit=False
+        )
+        planning.statut = 'brouillon'
+        planning_id = planning.id
+        
+        nombre_jours = (date_fin - date_debut).days + 1
+        matieres_count = {}
+        lot = []
+        lots_inseres = 0
+        
+        def inserer_lot():
+            inserer_sessions_en_masse(planning_id, lot)
+            if commit:
+                db.session.commit()
+            if progression:
+                progression(int(((lot[-1].date - date_debut).days + 1) * 100 / nombre_jours))
+        
+        try:
+            for semaine in self._iterer_sessions(
+                date_debut=date_debut,
+                date_fin=date_fin,
+                heures_par_jour=heures_etude_par_jour,
+                jours_repos=jours_repos,
+                matieres_prioritaires=matieres_prioritaires,
+                mode=mode
+            ):
+                for session in semaine:
+                    matieres_count[session.matiere_id] = matieres_count.get(session.matiere_id, 0) + 1
+                
+                lot.extend(semaine)
+                if len(lot) >= taille_lot:
+                    inserer_lot()
+                    lots_inseres += 1
+                    lot = []
+            
+            if lot:
+                inserer_lot()
+                lots_inseres += 1
+            
+            planning = Planning.query.get(planning_id)
+            planning.algorithme_utilise = ALGORITHMES_PAR_MODE[self.mode_execute(mode)]
+            planning.sessions_total = sum(matieres_count.values())
+            planning.score_qualite = self._score_depuis_compteurs(matieres_count, matieres_prioritaires)
+            planning.statut = 'actif'
+            
+            if commit:
+                db.session.commit()
+            else:
+                db.session.flush()
+        
+        except Exception:
+            if commit:
+                # Les lots déjà validés ne doivent pas laisser un planning incomplet
+                db.session.rollback()
+                db.session.execute(delete(Session).where(Session.planning_id == planning_id))
+                db.session.execute(delete(Planning).where(Planning.id == planning_id))
+                db.session.commit()
+            raise
+        
+        self.ids_sessions = []
+        self.statistiques['lots_inseres'] = lots_inseres
+        self.statistiques['duree_generation_secondes'] = round(chrono.perf_counter() - debut_generation, 3)
+        
+        return planning
+    
+    def previsualiser_planning(self, date_debut: date, date_fin: date,
+                               heures_etude_par_jour: float = 4.0,
+                               jours_etude_par_semaine: int = 6,
+                               jours_repos: List[str] = None,
+                               mode: str = MODE_JOUR) -> Dict:
+        """
+        Calcule un planning en mémoire, sans aucune écriture en base
+        
+        Les sessions sont renvoyées en colonnes parallèles (une liste par
+        champ) plutôt qu'en objets : 'jours' est le décalage en jours depuis
+        date_debut, 'debuts_minutes' la minute de début dans la journée.
+        L'aperçu complet peut être renvoyé tel quel à enregistrer_apercu.
+        
+        Args:
+            date_debut: Date de début du planning
+            date_fin: Date de fin du planning
+            heures_etude_par_jour: Nombre d'heures d'étude par jour
+            jours_etude_par_semaine: Nombre de jours d'étude par semaine
+            jours_repos: Liste des jours de repos (ex: ['dimanche'])
+            mode: Mode de génération ('jour', 'semaine_type' ou 'allocation_lp')
+        
+        Returns:
+            Aperçu : paramètres, colonnes des sessions, noms des matières, score
+        """
+        if jours_repos is None:
+            jours_repos = ['dimanche']
+        
+        if mode not in MODES_GENERATION:
+            raise ValueError(f"Mode de génération inconnu : {mode}")
         
-        # Calculer le score de qualité
         matieres_prioritaires = self._calculer_matieres_prioritaires()
+        sessions = self._calculer_sessions(date_debut, date_fin, heures_etude_par_jour,
+                                           jours_repos, matieres_prioritaires, mode)
+        
+        return {
+            'parametres': {
+                'date_debut': date_debut.isoformat(),
+                'date_fin': date_fin.isoformat(),
+                'heures_etude_par_jour': heures_etude_par_jour,
+                'jours_etude_par_semaine': jours_etude_par_semaine,
+                'jours_repos': jours_repos,
+                'mode': self.mode_execute(mode)
+            },
+            'sessions': {
+                'jours': [(session.date - date_debut).days for session in sessions],
+                'debuts_minutes': [vers_minutes(session.heure_debut) for session in sessions],
+                'durees': [session.duree for session in sessions],
+                'matiere_ids': [session.matiere_id for session in sessions],
+                'tache_ids': [session.tache_associee_id for session in sessions]
+            },
+            'matieres': {mp['matiere'].id: mp['matiere'].nom for mp in matieres_prioritaires},
+            'sessions_total': len(sessions),
+            'score_qualite': self._calculer_score_qualite(sessions, matieres_prioritaires),
+            'generation': self.statistiques
+        }
+    
+    def enregistrer_apercu(self, apercu: Dict, commit: bool = True) -> Planning:
+        """
+        Enregistre un aperçu produit par previsualiser_planning
+        
+        Les colonnes sont vérifiées (longueurs, bornes, matières et tâches
+        appartenant à l'utilisateur) puis insérées en masse ; le score est
+        recalculé côté serveur.
+        
+        Args:
+            apercu: Aperçu (au minimum 'parametres' et 'sessions')
+            commit: Valider la transaction
+        
+        Returns:
+            Planning créé
+        """
+        parametres = apercu.get('parametres') or {}
+        colonnes = apercu.get('sessions') or {}
+        
+        try:
+            date_debut = date.fromisoformat(parametres['date_debut'])
+            date_fin = date.fromisoformat(parametres['date_fin'])
+        except (KeyError, TypeError, ValueError):
+            raise ValueError("Paramètres de l'aperçu invalides : date_debut et date_fin (YYYY-MM-DD) sont requis")
+        
+        mode = parametres.get('mode', MODE_JOUR)
+        if mode not in MODES_GENERATION:
+            raise ValueError(f"Mode de génération inconnu : {mode}")
+        
+        noms_colonnes = ['jours', 'debuts_minutes', 'durees', 'matiere_ids', 'tache_ids']
+        if any(not isinstance(colonnes.get(nom), list) for nom in noms_colonnes):
+            raise ValueError(f"Colonnes de sessions manquantes : {', '.join(noms_colonnes)} sont requises")
+        
+        if len({len(colonnes[nom]) for nom in noms_colonnes}) != 1:
+            raise ValueError("Les colonnes de sessions n'ont pas toutes la même longueur")
+        
+        matieres = {matiere.id: matiere for matiere in self.matieres}
+        taches = {tache.id: tache for tache in self.taches}
+        nombre_jours = (date_fin - date_debut).days
+        
+        sessions = []
+        for jour, minute_debut, duree, matiere_id, tache_id in zip(*(colonnes[nom] for nom in noms_colonnes)):
+            if not all(isinstance(valeur, int) for valeur in (jour, minute_debut, duree)):
+                raise ValueError("Les colonnes jours, debuts_minutes et durees doivent contenir des entiers")
+            
+            if not 0 <= jour <= nombre_jours or not 0 <= minute_debut < 1440 or not 0 < duree <= 1440:
+                raise ValueError(f"Session hors limites (jour {jour}, minute {minute_debut}, durée {duree})")
+            
+            if matiere_id not in matieres or (tache_id is not None and tache_id not in taches):
+                raise ValueError("Matière ou tâche inconnue pour cet utilisateur")
+            
+            jour_session = date_debut + timedelta(days=jour)
+            heure_debut = datetime.combine(jour_session, vers_time(minute_debut))
+            
+            sessions.append(SessionGeneree(
+                matiere_id=matiere_id,
+                tache_associee_id=tache_id,
+                date=jour_session,
+                heure_debut=heure_debut,
+                heure_fin=heure_debut + timedelta(minutes=duree),
+                duree=duree,
+                titre=f"Étude {matieres[matiere_id].nom}",
+                description=f"Session d'étude pour {matieres[matiere_id].nom}",
+                type_session='etude'
+            ))
+        
+        return self._enregistrer_planning(
+            date_debut=date_debut,
+            date_fin=date_fin,
+            heures_etude_par_jour=parametres.get('heures_etude_par_jour', 4.0),
+            jours_etude_par_semaine=parametres.get('jours_etude_par_semaine', 6),
+            jours_repos=parametres.get('jours_repos') or ['dimanche'],
+            mode=mode,
+            sessions=sessions,
+            matieres_prioritaires=self._calculer_matieres_prioritaires(),
+            commit=commit
+        )
+    
+    def calculer_sessions(self, date_debut: date, date_fin: date,
+                          heures_etude_par_jour: float = 4.0,
+                          jours_repos: List[str] = None,
+                          mode: str = MODE_JOUR) -> List[SessionGeneree]:
+        """
+        Calcule les sessions en mémoire, sans créer de planning
+        
+        Args:
+            date_debut: Date de début
+            date_fin: Date de fin
+            heures_etude_par_jour: Nombre d'heures d'étude par jour
+            jours_repos: Liste des jours de repos (ex: ['dimanche'])
+            mode: Mode de génération ('jour', 'semaine_type' ou 'allocation_lp')
+        
+        Returns:
+            Liste de sessions générées
+        """
+        if jours_repos is None:
+            jours_repos = ['dimanche']
+        
+        if mode not in MODES_GENERATION:
+            raise ValueError(f"Mode de génération inconnu : {mode}")
+        
+        return self._calculer_sessions(date_debut, date_fin, heures_etude_par_jour, jours_repos,
+                                       self._calculer_matieres_prioritaires(), mode)
+    
+    def calculer_score(self, sessions: List[SessionGeneree]) -> int:
+        """
+        Note des sessions, quel que soit le moteur qui les a produites
+        
+        Returns:
+            Score de qualité (0-100)
+        """
+        return self._calculer_score_qualite(sessions, self._calculer_matieres_prioritaires())
+    
+    def enregistrer_sessions(self, date_debut: date, date_fin: date,
+                             sessions: List[SessionGeneree], algorithme: str,
+                             heures_etude_par_jour: float = 4.0,
+                             jours_etude_par_semaine: int = 6,
+                             jours_repos: List[str] = None,
+                             commit: bool = True) -> Planning:
+        """
+        Enregistre des sessions calculées par un moteur de planification
+        
+        Args:
+            date_debut: Date de début du planning
+            date_fin: Date de fin du planning
+            sessions: Sessions calculées
+            algorithme: Nom du moteur (algorithme_utilise)
+            heures_etude_par_jour: Nombre d'heures d'étude par jour
+            jours_etude_par_semaine: Nombre de jours d'étude par semaine
+            jours_repos: Liste des jours de repos
+            commit: Valider la transaction
+        
+        Returns:
+            Planning créé
+        """
+        return self._enregistrer_planning(
+            date_debut=date_debut,
+            date_fin=date_fin,
+            heures_etude_par_jour=heures_etude_par_jour,
+            jours_etude_par_semaine=jours_etude_par_semaine,
+            jours_repos=jours_repos or ['dimanche'],
+            mode=MODE_JOUR,
+            sessions=sessions,
+            matieres_prioritaires=self._calculer_matieres_prioritaires(),
+            commit=commit,
+            algorithme=algorithme
+        )
+    
+    def _calculer_sessions(self, date_debut: date, date_fin: date,
+                           heures_etude_par_jour: float, jours_repos: List[str],
+                           matieres_prioritaires: List[Dict], mode: str) -> List[SessionGeneree]:
+        """
+        Génère les sessions en mémoire et mesure la durée de génération
+        
+        Le résultat est mémorisé sous l'empreinte des entrées : une demande
+        identique (rejouée ou réessayée) est servie sans recalcul. Le cache
+        n'est pas utilisé quand des sessions conservées occupent déjà la période.
+        
+        Returns:
+            Liste de sessions générées
+        """
+        debut_generation = chrono.perf_counter()
+        
+        cle = None
+        if cache_plannings.actif and not (self.occupations_par_date or self.sessions_fixes_par_date):
+            cle = self._cle_cache(date_debut, date_fin, heures_etude_par_jour, jours_repos, mode)
+            memorise = cache_plannings.obtenir(cle)
+            
+            if memorise is not None:
+                sessions, statistiques = memorise
+                self.statistiques = dict(statistiques, cache='succes')
+                self.statistiques['duree_generation_secondes'] = round(chrono.perf_counter() - debut_generation, 3)
+                return list(sessions)
         
-        # Générer les sessions
         sessions = self._generer_sessions(
-            planning=planning,
             date_debut=date_debut,
             date_fin=date_fin,
             heures_par_jour=heures_etude_par_jour,
             jours_repos=jours_repos,
-            matieres_prioritaires=matieres_prioritaires
+            matieres_prioritaires=matieres_prioritaires,
+            mode=mode
         )
+        self.statistiques['duree_generation_secondes'] = round(chrono.perf_counter() - debut_generation, 3)
+        
+        if cle is not None:
+            cache_plannings.enregistrer(cle, (tuple(sessions), dict(self.statistiques)), len(sessions))
+            self.statistiques['cache'] = 'echec'
+        
+        return sessions
+    
+    def _cle_cache(self, date_debut: date, date_fin: date, heures_etude_par_jour: float,
+                   jours_repos: List[str], mode: str) -> str:
+        """
+        Calcule l'empreinte des entrées de la génération
+        
+        Inclut les dates de modification des lignes (une matière ou une tâche
+        modifiée change la clé) et la date du jour, dont dépend l'urgence des examens.
+        
+        Returns:
+            Clé du cache des plannings
+        """
+        return empreinte({
+            'utilisateur': [
+                self.user.id,
+                self.user.heure_productive_debut,
+                self.user.heure_productive_fin,
+                self.user.duree_session_preferee,
+                self.user.duree_pause
+            ],
+            'matieres': sorted(
+                [
+                    matiere.id, matiere.nom, matiere.priorite, matiere.niveau_difficulte,
+                    matiere.pourcentage_complete, matiere.coefficient, matiere.date_examen,
+                    getattr(matiere, 'date_modification', None)
+                ]
+                for matiere in self.matieres
+            ),
+            'taches': sorted(
+                [
+                    tache.id, tache.matiere_id, tache.priorite, tache.date_limite,
+                    getattr(tache, 'date_modification', None)
+                ]
+                for tache in self.taches
+            ),
+            'emploi_du_temps': self.emploi_du_temps.id if self.emploi_du_temps else None,
+            'cours': sorted(
+                [
+                    cours.id, cours.jour_semaine, cours.heure_debut, cours.heure_fin,
+                    cours.date_debut, cours.date_fin, getattr(cours, 'updated_at', None)
+                ]
+                for cours_du_jour in self.cours_par_jour.values()
+                for cours in cours_du_jour
+            ),
+            'repartir_taches': self.repartir_taches,
+            'periode': [date_debut, date_fin],
+            'heures_etude_par_jour': heures_etude_par_jour,
+            'jours_repos': sorted(jours_repos),
+            'mode': mode,
+            'aujourd_hui': datetime.utcnow().date()
+        })
+    
+    def _enregistrer_planning(self, date_debut: date, date_fin: date,
+                              heures_etude_par_jour: float,
+                              jours_etude_par_semaine: int,
+                              jours_repos: List[str], mode: str,
+                              sessions: List[SessionGeneree],
+                              matieres_prioritaires: List[Dict],
+                              insertion_en_masse: bool = True,
+                              commit: bool = True,
+                              algorithme: str = None) -> Planning:
+        """
+        Crée le planning et insère ses sessions
+        
+        Args:
+            algorithme: Nom enregistré dans algorithme_utilise (défaut : celui du mode)
+        
+        Returns:
+            Planning créé
+        """
+        # Créer le planning
+        planning = Planning(
+            user_id=self.user.id,
+            nom=f"Planning {date_debut.strftime('%d/%m/%Y')} - {date_fin.strftime('%d/%m/%Y')}",
+            description="Planning généré automatiquement",
+            date_debut=date_debut,
+            date_fin=date_fin,
+            type_planning='automatique',
+            heures_etude_par_jour=heures_etude_par_jour,
+            jours_etude_par_semaine=jours_etude_par_semaine,
+            jours_repos=','.join(jours_repos),
+            algorithme_utilise=algorithme or ALGORITHMES_PAR_MODE[mode],
+            statut='actif'
+        )
+        
+        db.session.add(planning)
+        db.session.flush()  # Pour obtenir l'ID du planning
         
         # Sauvegarder toutes les sessions
-        for session in sessions:
-            db.session.add(session)
+        if insertion_en_masse:
+            self.ids_sessions = inserer_sessions_en_masse(planning.id, sessions)
+        else:
+            objets_sessions = [
+                Session(planning_id=planning.id, **session._asdict())
+                for session in sessions
+            ]
+            db.session.add_all(objets_sessions)
+            db.session.flush()
+            self.ids_sessions = [session.id for session in objets_sessions]
         
         # Calculer les statistiques du planning
         planning.sessions_total = len(sessions)
         planning.score_qualite = self._calculer_score_qualite(sessions, matieres_prioritaires)
         
-        db.session.commit()
+        if commit:
+            db.session.commit()
+        else:
+            db.session.flush()
         
         return planning
     
@@ -117,16 +786,16 @@ class PlanningGenerator:
             # Critère 1 : Priorité de la matière (1-10)
             score += matiere.priorite * 10
             
-            # Critère 2 : Urgence de l'examen
+            # Critère 2 : Urgence de l'examen (calcul local : accepte aussi
+            # les instantanés de matières utilisés hors contexte applicatif)
             if matiere.date_examen:
-                jours_avant = matiere.jours_avant_examen()
-                if jours_avant is not None:
-                    if jours_avant <= 7:
-                        score += 50  # Très urgent
-                    elif jours_avant <= 14:
-                        score += 30  # Urgent
-                    elif jours_avant <= 30:
-                        score += 15  # Moyennement urgent
+                jours_avant = (matiere.date_examen - datetime.utcnow()).days
+                if jours_avant <= 7:
+                    score += 50  # Très urgent
+                elif jours_avant <= 14:
+                    score += 30  # Urgent
+                elif jours_avant <= 30:
+                    score += 15  # Moyennement urgent
             
             # Critère 3 : Niveau de difficulté
             score += matiere.niveau_difficulte * 5
@@ -149,202 +818,470 @@ class PlanningGenerator:
         
         return matieres_prioritaires
     
-    def _generer_sessions(self, planning: Planning, date_debut: date,
+    def _generer_sessions(self, date_debut: date,
                          date_fin: date, heures_par_jour: float,
                          jours_repos: List[str], 
-                         matieres_prioritaires: List[Dict]) -> List[Session]:
+                         matieres_prioritaires: List[Dict],
+                         mode: str = MODE_JOUR,
+                         matiere_index_depart: int = 0) -> List[SessionGeneree]:
         """
         Génère les sessions d'étude pour le planning
         
+        Une matière n'est plus planifiée après la date de son examen.
+        
         Args:
-            planning: Planning parent
             date_debut: Date de début
             date_fin: Date de fin
             heures_par_jour: Heures d'étude par jour
             jours_repos: Jours de repos
             matieres_prioritaires: Matières triées par priorité
+            mode: Mode de génération ('jour', 'semaine_type' ou 'allocation_lp')
+            matiere_index_depart: Position de départ dans l'alternance des
+                matières (mode 'jour'), pour prolonger un planning existant
         
         Returns:
             Liste de sessions générées
         """
-        sessions = []
+        return [
+            session
+            for semaine in self._iterer_sessions(
+                date_debut=date_debut,
+                date_fin=date_fin,
+                heures_par_jour=heures_par_jour,
+                jours_repos=jours_repos,
+                matieres_prioritaires=matieres_prioritaires,
+                mode=mode,
+                matiere_index_depart=matiere_index_depart
+            )
+            for session in semaine
+        ]
+    
+    def _iterer_sessions(self, date_debut: date,
+                         date_fin: date, heures_par_jour: float,
+                         jours_repos: List[str],
+                         matieres_prioritaires: List[Dict],
+                         mode: str = MODE_JOUR,
+                         matiere_index_depart: int = 0) -> Iterator[List[SessionGeneree]]:
+        """
+        Produit les sessions semaine par semaine (du lundi au dimanche)
+        
+        Seule la semaine en cours est gardée en mémoire, sauf en mode
+        'allocation_lp' où le solveur affecte toute la période en une fois
+        (les sessions sont alors seulement découpées par semaine).
+        Mêmes arguments que _generer_sessions.
+        
+        Yields:
+            Sessions d'une semaine, dans l'ordre chronologique
+        """
         date_courante = date_debut
         
+        if not matieres_prioritaires:
+            return
+        
         # Durée de session préférée de l'utilisateur (en minutes)
         duree_session = self.user.duree_session_preferee or 60
         
         # Calculer le nombre de sessions par jour
         sessions_par_jour = int((heures_par_jour * 60) / (duree_session + self.user.duree_pause))
         
+        # Créneaux libres de chaque jour de la semaine, calculés une seule fois
+        creneaux_semaine = self.grille_semaine.creneaux(duree_session, self.user.duree_pause or 0)
+        
+        if mode == MODE_SEMAINE_TYPE:
+            yield from self._iterer_sessions_semaine_type(
+                date_debut=date_debut,
+                date_fin=date_fin,
+                duree_session=duree_session,
+                sessions_par_jour=sessions_par_jour,
+                jours_repos=jours_repos,
+                creneaux_semaine=creneaux_semaine,
+                matieres_prioritaires=matieres_prioritaires,
+                matiere_index_depart=matiere_index_depart
+            )
+            return
+        
+        repli = None
+        if mode == MODE_ALLOCATION_LP:
+            sessions = self._generer_sessions_lp(
+                date_debut=date_debut,
+                date_fin=date_fin,
+                duree_session=duree_session,
+                sessions_par_jour=sessions_par_jour,
+                jours_repos=jours_repos,
+                creneaux_semaine=creneaux_semaine,
+                matieres_prioritaires=matieres_prioritaires
+            )
+            if sessions is not None:
+                for _, semaine in groupby(sessions, key=lambda session: session.date - timedelta(days=session.date.weekday())):
+                    yield list(semaine)
+                return
+            
+            # Problème trop grand pour le solveur : calcul jour par jour
+            repli = self.statistiques
+        
+        self.statistiques = {
+            'mode': MODE_JOUR,
+            'jours_calcules': 0
+        }
+        if repli:
+            self.statistiques['repli_allocation_lp'] = repli
+        
         # Index pour alterner entre les matières
-        matiere_index = 0
+        matiere_index = matiere_index_depart
+        semaine = []
         
         while date_courante <= date_fin:
+            # Un lundi commence une nouvelle semaine
+            if date_courante.weekday() == 0 and semaine:
+                yield semaine
+                semaine = []
+            
             # Vérifier si c'est un jour de repos
             jour_nom = self._get_jour_nom(date_courante)
             
-            if jour_nom in jours_repos:
+            matieres_du_jour = self._matieres_actives(matieres_prioritaires, date_courante)
+            quota_jour = sessions_par_jour - self.sessions_fixes_par_date.get(date_courante, 0)
+            
+            if jour_nom in jours_repos or not matieres_du_jour or quota_jour <= 0:
                 date_courante += timedelta(days=1)
                 continue
             
-            # Vérifier s'il y a des cours ce jour-là
-            cours_du_jour = []
-            if self.emploi_du_temps:
-                cours_du_jour = Cours.query.filter_by(
-                    emploi_du_temps_id=self.emploi_du_temps.id,
-                    jour=jour_nom
-                ).order_by(Cours.heure_debut).all()
-            
             # Générer les sessions pour ce jour
             sessions_jour = self._generer_sessions_jour(
-                planning=planning,
                 date=date_courante,
                 duree_session=duree_session,
-                sessions_par_jour=sessions_par_jour,
-                cours_du_jour=cours_du_jour,
-                matieres_prioritaires=matieres_prioritaires,
+                sessions_par_jour=quota_jour,
+                creneaux_du_jour=self._creneaux_du_jour(date_courante, creneaux_semaine, duree_session),
+                matieres_prioritaires=matieres_du_jour,
                 matiere_index_start=matiere_index
             )
             
-            sessions.extend(sessions_jour)
-            matiere_index = (matiere_index + len(sessions_jour)) % len(matieres_prioritaires)
+            semaine.extend(sessions_jour)
+            matiere_index = (matiere_index + len(sessions_jour)) % len(matieres_du_jour)
+            self.statistiques['jours_calcules'] += 1
             
             date_courante += timedelta(days=1)
         
-        return sessions
+        if semaine:
+            yield semaine
     
-    def _generer_sessions_jour(self, planning: Planning, date: date,
-                              duree_session: int, sessions_par_jour: int,
-                              cours_du_jour: List[Cours],
-                              matieres_prioritaires: List[Dict],
-                              matiere_index_start: int) -> List[Session]:
+    def _iterer_sessions_semaine_type(self, date_debut: date, date_fin: date,
+                                      duree_session: int, sessions_par_jour: int,
+                                      jours_repos: List[str],
+                                      creneaux_semaine: List[List[int]],
+                                      matieres_prioritaires: List[Dict],
+                                      matiere_index_depart: int = 0) -> Iterator[List[SessionGeneree]]:
         """
-        Génère les sessions pour un jour donné
+        Génère les sessions en répliquant une disposition hebdomadaire
+        
+        Chaque semaine est résumée par une signature (jours inclus, matières
+        dont l'examen n'est pas passé, cours bornés par des dates) : la
+        disposition n'est calculée qu'une fois par signature distincte puis
+        recopiée sur toutes les semaines identiques. L'alternance des matières
+        se poursuit d'une semaine à l'autre, comme en mode jour : elle est
+        appliquée à la recopie.
         
         Args:
-            planning: Planning parent
-            date: Date du jour
+            date_debut: Date de début
+            date_fin: Date de fin
             duree_session: Durée d'une session en minutes
-            sessions_par_jour: Nombre de sessions à créer
-            cours_du_jour: Cours de la journée
+            sessions_par_jour: Nombre maximal de sessions par jour
+            jours_repos: Jours de repos
+            creneaux_semaine: Créneaux libres de chaque jour de la semaine type
+            matieres_prioritaires: Matières triées par priorité
+            matiere_index_depart: Position de départ dans l'alternance des matières
+        
+        Yields:
+            Sessions de chaque semaine
+        """
+        dispositions = {}
+        matiere_index = matiere_index_depart
+        self.statistiques = {
+            'mode': MODE_SEMAINE_TYPE,
+            'semaines_total': 0,
+            'semaines_calculees': 0
+        }
+        
+        lundi = date_debut - timedelta(days=date_debut.weekday())
+        
+        while lundi <= date_fin:
+            jours = []
+            
+            for decalage in range(len(JOURS_SEMAINE)):
+                jour = lundi + timedelta(days=decalage)
+                
+                if jour < date_debut or jour > date_fin or JOURS_SEMAINE[decalage] in jours_repos:
+                    jours.append(None)
+                    continue
+                
+                jours.append((
+                    tuple(mp['matiere'].id for mp in self._matieres_actives(matieres_prioritaires, jour)),
+                    tuple(cours.id for cours in self._cours_dates_du_jour(jour))
+                ))
+            
+            signature = tuple(jours)
+            disposition = dispositions.get(signature)
+            
+            if disposition is None:
+                disposition = self._disposer_semaine(
+                    lundi, signature, duree_session, sessions_par_jour,
+                    creneaux_semaine, matieres_prioritaires
+                )
+                dispositions[signature] = disposition
+                self.statistiques['semaines_calculees'] += 1
+            
+            # Recopier la disposition sur la semaine courante en poursuivant l'alternance
+            yield [
+                self._creer_session(
+                    lundi + timedelta(days=decalage), minute_debut, duree_session,
+                    matieres_du_jour[(matiere_index + rang) % len(matieres_du_jour)]
+                )
+                for rang, (decalage, minute_debut, matieres_du_jour) in enumerate(disposition)
+            ]
+            
+            matiere_index += len(disposition)
+            self.statistiques['semaines_total'] += 1
+            lundi += timedelta(days=7)
+    
+    def _generer_sessions_lp(self, date_debut: date, date_fin: date,
+                             duree_session: int, sessions_par_jour: int,
+                             jours_repos: List[str],
+                             creneaux_semaine: List[List[int]],
+                             matieres_prioritaires: List[Dict]) -> List[SessionGeneree]:
+        """
+        Génère les sessions par allocation optimale (programmation linéaire)
+        
+        Tous les créneaux libres de la période sont candidats ; le solveur
+        choisit la matière de chaque créneau en respectant le plafond
+        quotidien et des cibles par matière proportionnelles à leur score.
+        
+        Args:
+            date_debut: Date de début
+            date_fin: Date de fin
+            duree_session: Durée d'une session en minutes
+            sessions_par_jour: Nombre maximal de sessions par jour
+            jours_repos: Jours de repos
+            creneaux_semaine: Créneaux libres de chaque jour de la semaine type
             matieres_prioritaires: Matières triées par priorité
-            matiere_index_start: Index de départ pour l'alternance
         
         Returns:
-            Liste de sessions pour ce jour
+            Liste de sessions générées, dans l'ordre chronologique, ou None si
+            le problème dépasse la taille acceptée par le solveur
+            (AllocateurLP.PAIRES_MAX)
         """
-        sessions = []
+        creneaux = []
+        date_courante = date_debut
         
-        # Heures productives de l'utilisateur
-        heure_debut_productive = self.user.heure_productive_debut or time(8, 0)
-        heure_fin_productive = self.user.heure_productive_fin or time(22, 0)
+        while date_courante <= date_fin:
+            if self._get_jour_nom(date_courante) not in jours_repos:
+                for minute_debut in self._creneaux_du_jour(date_courante, creneaux_semaine, duree_session):
+                    creneaux.append({
+                        'debut': datetime.combine(date_courante, vers_time(minute_debut)),
+                        'duree': duree_session
+                    })
+            date_courante += timedelta(days=1)
         
-        # Créneaux occupés par les cours
-        creneaux_occupes = []
-        for cours in cours_du_jour:
-            creneaux_occupes.append({
-                'debut': cours.heure_debut,
-                'fin': cours.heure_fin
-            })
+        # Poids normalisés dans [0.5, 1] : toute session reste préférable à un créneau vide
+        score_max = max(mp['score'] for mp in matieres_prioritaires) or 1
+        matieres = {mp['matiere'].id: mp['matiere'] for mp in matieres_prioritaires}
         
-        # Générer les créneaux disponibles
-        creneaux_disponibles = self._trouver_creneaux_disponibles(
-            heure_debut_productive,
-            heure_fin_productive,
-            creneaux_occupes,
-            duree_session
+        allocateur = AllocateurLP(
+            creneaux=creneaux,
+            poids_matieres={
+                mp['matiere'].id: 0.5 + 0.5 * mp['score'] / score_max
+                for mp in matieres_prioritaires
+            },
+            dates_examen={
+                matiere_id: matiere.date_examen.date() if matiere.date_examen else None
+                for matiere_id, matiere in matieres.items()
+            },
+            max_sessions_par_jour=sessions_par_jour
         )
+        resultat = allocateur.resoudre()
         
-        # Créer les sessions dans les créneaux disponibles
-        matiere_index = matiere_index_start
+        self.statistiques = {
+            'mode': MODE_ALLOCATION_LP,
+            'creneaux_candidats': len(creneaux),
+            'statut_solveur': resultat['statut'],
+            'objectif': resultat['objectif'],
+            'duree_resolution_secondes': resultat['duree_secondes']
+        }
         
-        for i, creneau in enumerate(creneaux_disponibles):
-            if i >= sessions_par_jour:
-                break
-            
-            # Choisir la matière (alternance intelligente)
-            matiere_info = matieres_prioritaires[matiere_index % len(matieres_prioritaires)]
-            matiere = matiere_info['matiere']
-            
-            # Chercher une tâche associée à cette matière
-            tache = self._trouver_tache_pour_matiere(matiere)
-            
-            session = Session(
-                planning_id=planning.id,
-                matiere_id=matiere.id,
-                tache_id=tache.id if tache else None,
-                date=date,
-                heure_debut=creneau['debut'],
-                heure_fin=creneau['fin'],
-                duree=duree_session,
-                titre=f"Étude {matiere.nom}",
-                description=f"Session d'étude pour {matiere.nom}",
-                type_session='etude',
-                completee=False
+        if resultat['statut'] == 'trop_grand':
+            return None
+        
+        return [
+            self._creer_session(
+                creneaux[index_creneau]['debut'].date(),
+                vers_minutes(creneaux[index_creneau]['debut']),
+                duree_session,
+                matieres[matiere_id]
             )
+            for index_creneau, matiere_id in resultat['affectations']
+        ]
+    
+    def _disposer_semaine(self, lundi: date, signature: tuple, duree_session: int,
+                          sessions_par_jour: int, creneaux_semaine: List[List[int]],
+                          matieres_prioritaires: List[Dict]) -> List[tuple]:
+        """
+        Calcule la disposition d'une semaine : créneaux et matières candidates
+        
+        La matière d'une session est choisie à la recopie, en alternant sur
+        les matières de son jour à partir de la position atteinte par les
+        semaines précédentes.
+        
+        Args:
+            lundi: Lundi de la semaine représentative
+            signature: Signature de la semaine (None pour un jour exclu)
+            duree_session: Durée d'une session en minutes
+            sessions_par_jour: Nombre maximal de sessions par jour
+            creneaux_semaine: Créneaux libres de chaque jour de la semaine type
+            matieres_prioritaires: Matières triées par priorité
+        
+        Returns:
+            Liste de triplets (decalage_jour, minute_debut, matieres_du_jour)
+        """
+        disposition = []
+        
+        for decalage, jour_signature in enumerate(signature):
+            if jour_signature is None:
+                continue
             
-            sessions.append(session)
-            matiere_index += 1
+            jour = lundi + timedelta(days=decalage)
+            matieres_du_jour = self._matieres_actives(matieres_prioritaires, jour)
+            
+            if not matieres_du_jour:
+                continue
+            
+            creneaux_du_jour = self._creneaux_du_jour(jour, creneaux_semaine, duree_session)
+            matieres = [mp['matiere'] for mp in matieres_du_jour]
+            
+            for minute_debut in creneaux_du_jour[:sessions_par_jour]:
+                disposition.append((decalage, minute_debut, matieres))
         
-        return sessions
+        return disposition
     
-    def _trouver_creneaux_disponibles(self, heure_debut: time, heure_fin: time,
-                                     creneaux_occupes: List[Dict],
-                                     duree_session: int) -> List[Dict]:
+    def _matieres_actives(self, matieres_prioritaires: List[Dict], jour: date) -> List[Dict]:
         """
-        Trouve les créneaux disponibles dans une journée
+        Filtre les matières dont l'examen n'est pas encore passé à une date
         
         Args:
-            heure_debut: Heure de début de journée
-            heure_fin: Heure de fin de journée
-            creneaux_occupes: Créneaux déjà occupés
+            matieres_prioritaires: Matières triées par priorité
+            jour: Date considérée
+        
+        Returns:
+            Matières encore à réviser ce jour-là, dans le même ordre
+        """
+        return [
+            mp for mp in matieres_prioritaires
+            if not mp['matiere'].date_examen or mp['matiere'].date_examen.date() >= jour
+        ]
+    
+    def _cours_dates_du_jour(self, jour: date) -> List[Cours]:
+        """
+        Retourne les cours bornés par des dates qui ont lieu un jour donné
+        
+        Args:
+            jour: Date considérée
+        
+        Returns:
+            Liste des cours concernés
+        """
+        return [
+            cours for cours in self.cours_dates_par_jour.get(JOURS_SEMAINE[jour.weekday()], [])
+            if (not cours.date_debut or cours.date_debut <= jour)
+            and (not cours.date_fin or jour <= cours.date_fin)
+        ]
+    
+    def _creneaux_du_jour(self, jour: date, creneaux_semaine: List[List[int]],
+                          duree_session: int) -> List[int]:
+        """
+        Retourne les créneaux libres d'une date en tenant compte des cours bornés
+        et des intervalles déjà occupés
+        
+        Args:
+            jour: Date considérée
+            creneaux_semaine: Créneaux libres de chaque jour de la semaine type
             duree_session: Durée d'une session en minutes
         
         Returns:
-            Liste de créneaux disponibles
+            Minutes de début des créneaux libres
         """
-        creneaux_disponibles = []
+        cours_dates = self._cours_dates_du_jour(jour)
+        occupations = self.occupations_par_date.get(jour, [])
         
-        # Trier les créneaux occupés par heure de début
-        creneaux_occupes_tries = sorted(creneaux_occupes, key=lambda x: x['debut'])
+        if not cours_dates and not occupations:
+            return creneaux_semaine[jour.weekday()]
         
-        heure_courante = heure_debut
+        grille = GrilleDisponibilites.depuis_tableau(self.grille_semaine.occupe[[jour.weekday()]])
+        grille.occuper_intervalles((0, cours.heure_debut, cours.heure_fin) for cours in cours_dates)
+        grille.occuper_intervalles((0, debut, fin) for debut, fin in occupations)
         
-        for creneau_occupe in creneaux_occupes_tries:
-            # S'il y a de l'espace avant ce créneau occupé
-            if self._temps_entre(heure_courante, creneau_occupe['debut']) >= duree_session:
-                creneaux_disponibles.append({
-                    'debut': heure_courante,
-                    'fin': creneau_occupe['debut']
-                })
-            
-            # Avancer l'heure courante
-            heure_courante = max(heure_courante, creneau_occupe['fin'])
+        return grille.creneaux(duree_session, self.user.duree_pause or 0)[0]
+    
+    def _creer_session(self, jour: date, minute_debut: int, duree_session: int,
+                       matiere: Matiere) -> SessionGeneree:
+        """
+        Construit une session d'étude pour une matière dans un créneau
         
-        # Vérifier s'il reste du temps après le dernier créneau occupé
-        if self._temps_entre(heure_courante, heure_fin) >= duree_session:
-            creneaux_disponibles.append({
-                'debut': heure_courante,
-                'fin': heure_fin
-            })
+        Args:
+            jour: Date de la session
+            minute_debut: Minute de début dans la journée
+            duree_session: Durée en minutes
+            matiere: Matière étudiée
         
-        return creneaux_disponibles
+        Returns:
+            Session générée
+        """
+        # Chercher une tâche associée à cette matière
+        tache = self._trouver_tache_pour_matiere(matiere)
+        
+        heure_debut = datetime.combine(jour, vers_time(minute_debut))
+        
+        return SessionGeneree(
+            matiere_id=matiere.id,
+            tache_associee_id=tache.id if tache else None,
+            date=jour,
+            heure_debut=heure_debut,
+            heure_fin=heure_debut + timedelta(minutes=duree_session),
+            duree=duree_session,
+            titre=f"Étude {matiere.nom}",
+            description=f"Session d'étude pour {matiere.nom}",
+            type_session='etude'
+        )
     
-    def _temps_entre(self, debut: time, fin: time) -> int:
+    def _generer_sessions_jour(self, date: date,
+                              duree_session: int, sessions_par_jour: int,
+                              creneaux_du_jour: List[int],
+                              matieres_prioritaires: List[Dict],
+                              matiere_index_start: int) -> List[SessionGeneree]:
         """
-        Calcule le nombre de minutes entre deux heures
+        Génère les sessions pour un jour donné
         
         Args:
-            debut: Heure de début
-            fin: Heure de fin
+            date: Date du jour
+            duree_session: Durée d'une session en minutes
+            sessions_par_jour: Nombre de sessions à créer
+            creneaux_du_jour: Minutes de début des créneaux libres du jour
+            matieres_prioritaires: Matières triées par priorité
+            matiere_index_start: Index de départ pour l'alternance
         
         Returns:
-            Nombre de minutes
+            Liste de sessions pour ce jour
         """
-        debut_minutes = debut.hour * 60 + debut.minute
-        fin_minutes = fin.hour * 60 + fin.minute
+        sessions = []
+        
+        # Créer les sessions dans les créneaux disponibles
+        matiere_index = matiere_index_start
+        
+        for minute_debut in creneaux_du_jour[:sessions_par_jour]:
+            # Choisir la matière (alternance intelligente)
+            matiere_info = matieres_prioritaires[matiere_index % len(matieres_prioritaires)]
+            
+            sessions.append(self._creer_session(date, minute_debut, duree_session, matiere_info['matiere']))
+            matiere_index += 1
         
-        return max(0, fin_minutes - debut_minutes)
+        return sessions
     
     def _trouver_tache_pour_matiere(self, matiere: Matiere) -> Optional[Tache]:
         """
@@ -356,19 +1293,21 @@ class PlanningGenerator:
         Returns:
             Tâche trouvée ou None
         """
-        tache = Tache.query.filter_by(
-            matiere_id=matiere.id,
-            utilisateur_id=self.user.id
-        ).filter(
-            Tache.etat.in_(['a_faire', 'en_cours'])
-        ).order_by(
-            Tache.priorite.desc(),
-            Tache.date_limite.asc()
-        ).first()
+        file_taches = self.files_taches.get(matiere.id)
+        
+        if not file_taches:
+            return None
+        
+        if not self.repartir_taches:
+            return file_taches[0][-1]
+        
+        # La tâche la moins servie repasse derrière les autres de la matière
+        nombre_sessions, priorite, date_limite, tache_id, tache = file_taches[0]
+        heapq.heapreplace(file_taches, (nombre_sessions + 1, priorite, date_limite, tache_id, tache))
         
         return tache
     
-    def _calculer_score_qualite(self, sessions: List[Session],
+    def _calculer_score_qualite(self, sessions: List[SessionGeneree],
                                matieres_prioritaires: List[Dict]) -> int:
         """
         Calcule un score de qualité pour le planning
@@ -380,32 +1319,47 @@ class PlanningGenerator:
         Returns:
             Score de qualité (0-100)
         """
-        if not sessions:
-            return 0
-        
-        score = 50  # Score de base
-        
-        # Critère 1 : Répartition équilibrée des matières
         matieres_count = {}
         for session in sessions:
             matiere_id = session.matiere_id
             matieres_count[matiere_id] = matieres_count.get(matiere_id, 0) + 1
         
+        return self._score_depuis_compteurs(matieres_count, matieres_prioritaires)
+    
+    def _score_depuis_compteurs(self, matieres_count: Dict[int, int],
+                                matieres_prioritaires: List[Dict]) -> int:
+        """
+        Calcule le score de qualité à partir du nombre de sessions par matière
+        
+        Permet de noter un planning produit par flux sans garder ses sessions.
+        
+        Args:
+            matieres_count: Dictionnaire matiere_id -> nombre de sessions
+            matieres_prioritaires: Matières avec priorités
+        
+        Returns:
+            Score de qualité (0-100)
+        """
+        total_sessions = sum(matieres_count.values())
+        
+        if not total_sessions:
+            return 0
+        
+        score = 50  # Score de base
+        
+        # Critère 1 : Répartition équilibrée des matières
         # Plus la répartition est équilibrée, mieux c'est
-        if matieres_count:
-            ecart_type = self._calculer_ecart_type(list(matieres_count.values()))
-            score += max(0, 20 - ecart_type)
+        ecart_type = self._calculer_ecart_type(list(matieres_count.values()))
+        score += max(0, 20 - ecart_type)
         
         # Critère 2 : Respect des priorités
         # Les matières prioritaires doivent avoir plus de sessions
-        sessions_prioritaires = 0
-        for session in sessions:
-            for mp in matieres_prioritaires[:3]:  # Top 3
-                if session.matiere_id == mp['matiere'].id:
-                    sessions_prioritaires += 1
-                    break
+        sessions_prioritaires = sum(
+            matieres_count.get(mp['matiere'].id, 0)
+            for mp in matieres_prioritaires[:3]  # Top 3
+        )
         
-        ratio_prioritaires = sessions_prioritaires / len(sessions)
+        ratio_prioritaires = sessions_prioritaires / total_sessions
         score += ratio_prioritaires * 20
         
         # Critère 3 : Utilisation des créneaux libres
@@ -445,23 +1399,341 @@ class PlanningGenerator:
         jours = ['lundi', 'mardi', 'mercredi', 'jeudi', 'vendredi', 'samedi', 'dimanche']
         return jours[date.weekday()]
     
+    def _creneaux_libres_periode(self, date_debut: date, date_fin: date,
+                                 jours_repos: List[str], duree_session: int,
+                                 occupes_par_date: Dict[date, List[Dict]] = None,
+                                 apres: datetime = None) -> List[Dict]:
+        """
+        Découpe les plages libres d'une période en créneaux de la durée d'une session
+        
+        Args:
+            date_debut: Premier jour de la période
+            date_fin: Dernier jour de la période
+            jours_repos: Jours de repos
+            duree_session: Durée d'un créneau en minutes
+            occupes_par_date: Créneaux déjà occupés (sessions existantes) par date
+            apres: Ne garder que les créneaux commençant après cet instant
+        
+        Returns:
+            Liste de créneaux {'debut': datetime, 'duree': minutes}
+        """
+        nombre_jours = (date_fin - date_debut).days + 1
+        if nombre_jours <= 0:
+            return []
+        
+        # Une ligne par date, initialisée avec la grille du jour de la semaine
+        dates = [date_debut + timedelta(days=i) for i in range(nombre_jours)]
+        grille = GrilleDisponibilites.depuis_tableau(
+            self.grille_semaine.occupe[[d.weekday() for d in dates]]
+        )
+        grille.bloquer_jours(
+            i for i, d in enumerate(dates) if JOURS_SEMAINE[d.weekday()] in jours_repos
+        )
+        grille.occuper_intervalles(
+            ((d - date_debut).days, creneau['debut'], creneau['fin'])
+            for d, creneaux_occupes in (occupes_par_date or {}).items()
+            if date_debut <= d <= date_fin
+            for creneau in creneaux_occupes
+        )
+        grille.occuper_intervalles(
+            (i, cours.heure_debut, cours.heure_fin)
+            for i, d in enumerate(dates)
+            for cours in self._cours_dates_du_jour(d)
+        )
+        
+        creneaux = []
+        for d, minutes_debut in zip(dates, grille.creneaux(duree_session, self.user.duree_pause or 0)):
+            for minute_debut in minutes_debut:
+                debut = datetime.combine(d, vers_time(minute_debut))
+                if apres is None or debut > apres:
+                    creneaux.append({'debut': debut, 'duree': duree_session})
+        
+        return creneaux
+    
     @staticmethod
-    def optimiser_planning_existant(planning: Planning) -> Dict:
+    def optimiser_planning_existant(planning: Planning, budget_secondes: float = 2.0,
+                                    graine: int = None, iterations_max: int = None) -> Dict:
         """
         Optimise un planning existant en réorganisant les sessions
         
+        Seules les sessions futures, non commencées et non modifiées
+        manuellement sont déplacées ; elles peuvent changer de créneau
+        libre ou échanger leur créneau avec une autre session. Les autres
+        sessions de la période comptent dans la limite journalière.
+        
         Args:
             planning: Planning à optimiser
+            budget_secondes: Temps maximal alloué à la recherche locale
+                (sans graine)
+            graine: Graine aléatoire pour un résultat reproductible
+            iterations_max: Nombre maximal d'itérations de la recherche locale
+                (None = OptimiseurPlanning.ITERATIONS_PAR_DEFAUT avec une graine)
         
         Returns:
             Résultat de l'optimisation
         """
-        # TODO: Implémenter l'optimisation de planning existant
-        # Pourrait utiliser des algorithmes génétiques ou du simulated annealing
+        generator = PlanningGenerator(planning.etudiant)
+        maintenant = datetime.utcnow()
+        ancien_score = planning.score_qualite
+        
+        sessions_futures = planning.sessions.filter(
+            Session.heure_debut > maintenant,
+            Session.annulee == False
+        ).order_by(Session.heure_debut.asc()).all()
+        
+        sessions_deplacables = [
+            session for session in sessions_futures
+            if not (session.completee or session.en_cours or session.modifie_manuellement)
+        ]
+        ids_deplacables = {session.id for session in sessions_deplacables}
+        
+        if not sessions_deplacables:
+            return {
+                'success': True,
+                'message': 'Aucune session future à optimiser',
+                'ancien_score': ancien_score,
+                'nouveau_score': ancien_score
+            }
+        
+        # Créneaux actuels des sessions déplaçables
+        creneaux = [
+            {'debut': session.heure_debut, 'duree': session.duree}
+            for session in sessions_deplacables
+        ]
+        sessions = [
+            {'id': session.id, 'matiere_id': session.matiere_id, 'creneau': index}
+            for index, session in enumerate(sessions_deplacables)
+        ]
+        
+        # Créneaux libres de la durée la plus fréquente, hors sessions existantes
+        durees = [session.duree for session in sessions_deplacables]
+        duree_session = max(set(durees), key=durees.count)
+        
+        occupes_par_date = {}
+        for session in sessions_futures:
+            occupes_par_date.setdefault(session.heure_debut.date(), []).append({
+                'debut': session.heure_debut.time(),
+                'fin': session.heure_fin.time()
+            })
+        
+        debut_periode = max(maintenant.date(), planning.date_debut.date())
+        creneaux.extend(generator._creneaux_libres_periode(
+            date_debut=debut_periode,
+            date_fin=planning.date_fin.date(),
+            jours_repos=planning.get_jours_repos_list(),
+            duree_session=duree_session,
+            occupes_par_date=occupes_par_date,
+            apres=maintenant
+        ))
+        
+        # Poids normalisés des matières et dates d'examen
+        matieres_prioritaires = generator._calculer_matieres_prioritaires()
+        score_max = max((mp['score'] for mp in matieres_prioritaires), default=0) or 1
+        poids_matieres = {mp['matiere'].id: mp['score'] / score_max for mp in matieres_prioritaires}
+        dates_examen = {
+            matiere.id: matiere.date_examen.date() if matiere.date_examen else None
+            for matiere in generator.matieres
+        }
+        
+        # Limite journalière dérivée des paramètres du planning
+        duree_pause = planning.etudiant.duree_pause or 0
+        max_sessions_par_jour = int(((planning.heures_etude_par_jour or 4.0) * 60) / (duree_session + duree_pause))
+        
+        # Sessions fixes (commencées, complétées, modifiées ou déjà passées aujourd'hui) par date
+        sessions_fixes_par_jour = {}
+        for session in planning.sessions.filter(
+            Session.heure_debut >= datetime.combine(debut_periode, time.min),
+            Session.annulee == False
+        ):
+            if session.id not in ids_deplacables:
+                jour = session.heure_debut.date()
+                sessions_fixes_par_jour[jour] = sessions_fixes_par_jour.get(jour, 0) + 1
+        
+        optimiseur = OptimiseurPlanning(
+            creneaux=creneaux,
+            sessions=sessions,
+            poids_matieres=poids_matieres,
+            dates_examen=dates_examen,
+            max_sessions_par_jour=max(max_sessions_par_jour, 1),
+            sessions_fixes_par_jour=sessions_fixes_par_jour,
+            budget_secondes=budget_secondes,
+            graine=graine,
+            iterations_max=iterations_max
+        )
+        resultat = optimiseur.optimiser()
+        
+        # Appliquer les déplacements
+        sessions_deplacees = 0
+        for session in sessions_deplacables:
+            creneau = creneaux[resultat['affectation'][session.id]]
+            
+            if creneau['debut'] != session.heure_debut:
+                session.heure_debut = creneau['debut']
+                session.heure_fin = creneau['debut'] + timedelta(minutes=session.duree)
+                session.date = creneau['debut'].date()
+                sessions_deplacees += 1
+        
+        planning.derniere_optimisation = maintenant
+        if sessions_deplacees:
+            planning.nombre_modifications = (planning.nombre_modifications or 0) + 1
+        planning.score_qualite = generator._calculer_score_qualite(
+            planning.sessions.filter(Session.annulee == False).all(),
+            matieres_prioritaires
+        )
+        
+        db.session.commit()
+        
+        return {
+            'success': True,
+            'message': f'{sessions_deplacees} session(s) déplacée(s)',
+            'ancien_score': ancien_score,
+            'nouveau_score': planning.score_qualite,
+            'objectif_initial': resultat['objectif_initial'],
+            'objectif_final': resultat['objectif_final'],
+            'sessions_deplacees': sessions_deplacees,
+            'iterations': resultat['iterations'],
+            'duree_secondes': resultat['duree_secondes']
+        }
+    
+    @staticmethod
+    def replanifier_planning(planning: Planning, date_debut: date = None,
+                             date_fin: date = None) -> Dict:
+        """
+        Replanifie incrémentalement la partie future d'un planning
+        
+        Les sessions passées, commencées, complétées, annulées, créées à la
+        main ou modifiées manuellement sont conservées telles quelles. Seules
+        les sessions générées de la fenêtre sont recalculées avec l'état
+        actuel des matières et des tâches ; le résultat est appliqué sous
+        forme de différence pour garder les identifiants stables :
+        une session dont le créneau ne change pas est mise à jour sur place,
+        les sessions en trop sont réutilisées pour les nouveaux créneaux
+        avant toute insertion ou suppression.
+        
+        Args:
+            planning: Planning à replanifier
+            date_debut: Début de la fenêtre (défaut : aujourd'hui)
+            date_fin: Fin de la fenêtre (défaut : fin du planning)
+        
+        Returns:
+            Différence appliquée (ids insérés, modifiés, supprimés)
+        """
+        generator = PlanningGenerator(planning.etudiant)
+        maintenant = datetime.utcnow()
+        
+        debut_fenetre = max(date_debut or maintenant.date(), maintenant.date(), planning.date_debut.date())
+        fin_fenetre = min(date_fin or planning.date_fin.date(), planning.date_fin.date())
+        
+        if fin_fenetre < debut_fenetre:
+            return {
+                'success': True,
+                'message': 'Aucune période future à replanifier',
+                'inseres': [],
+                'modifies': [],
+                'supprimes': [],
+                'inchanges': 0
+            }
+        
+        sessions_fenetre = planning.sessions.filter(
+            Session.heure_debut >= datetime.combine(debut_fenetre, time.min),
+            Session.heure_debut < datetime.combine(fin_fenetre + timedelta(days=1), time.min),
+            Session.annulee == False
+        ).order_by(Session.heure_debut.asc()).all()
+        
+        sessions_remplacables = []
+        for session in sessions_fenetre:
+            if (session.heure_debut > maintenant and session.genere_auto
+                    and not (session.completee or session.en_cours or session.modifie_manuellement)):
+                sessions_remplacables.append(session)
+                continue
+            
+            # Session conservée : son créneau est réservé et compte dans le quota du jour
+            generator.occupations_par_date.setdefault(session.date, []).append(
+                (session.heure_debut, session.heure_fin)
+            )
+            generator.sessions_fixes_par_date[session.date] = generator.sessions_fixes_par_date.get(session.date, 0) + 1
+        
+        # Aujourd'hui, seuls les créneaux qui n'ont pas encore commencé sont utilisables
+        if debut_fenetre == maintenant.date():
+            generator.occupations_par_date.setdefault(debut_fenetre, []).append(
+                (0, vers_minutes(maintenant) + 1)
+            )
+        
+        matieres_prioritaires = generator._calculer_matieres_prioritaires()
+        
+        # Reprendre l'alternance après la dernière session générée conservée
+        matiere_index_depart = 0
+        derniere_conservee = planning.sessions.filter(
+            Session.heure_debut <= max(maintenant, datetime.combine(debut_fenetre, time.min)),
+            Session.genere_auto == True,
+            Session.annulee == False
+        ).order_by(Session.heure_debut.desc()).first()
+        
+        if derniere_conservee:
+            ordre = [mp['matiere'].id for mp in generator._matieres_actives(matieres_prioritaires, debut_fenetre)]
+            if derniere_conservee.matiere_id in ordre:
+                matiere_index_depart = ordre.index(derniere_conservee.matiere_id) + 1
+        
+        generees = generator._generer_sessions(
+            date_debut=debut_fenetre,
+            date_fin=fin_fenetre,
+            heures_par_jour=planning.heures_etude_par_jour or 4.0,
+            jours_repos=planning.get_jours_repos_list(),
+            matieres_prioritaires=matieres_prioritaires,
+            matiere_index_depart=matiere_index_depart
+        )
+        
+        # Différence : même créneau -> mise à jour sur place
+        par_creneau = {session.heure_debut: session for session in sessions_remplacables}
+        sans_session = []
+        modifies = []
+        inchanges = 0
+        
+        for generee in generees:
+            session = par_creneau.pop(generee.heure_debut, None)
+            
+            if session is None:
+                sans_session.append(generee)
+            elif _appliquer_session_generee(session, generee):
+                modifies.append(session.id)
+            else:
+                inchanges += 1
+        
+        # Les sessions restantes sont déplacées vers les nouveaux créneaux
+        restantes = sorted(par_creneau.values(), key=lambda session: session.heure_debut)
+        for session, generee in zip(restantes, sans_session):
+            _appliquer_session_generee(session, generee)
+            modifies.append(session.id)
+        
+        a_inserer = sans_session[len(restantes):]
+        supprimes = [session.id for session in restantes[len(sans_session):]]
+        
+        if supprimes:
+            Session.query.filter(Session.id.in_(supprimes)).delete(synchronize_session=False)
+        
+        inseres = inserer_sessions_en_masse(planning.id, a_inserer)
+        
+        if inseres or modifies or supprimes:
+            planning.nombre_modifications = (planning.nombre_modifications or 0) + 1
+        
+        planning.sessions_total = planning.sessions.count()
+        planning.score_qualite = generator._calculer_score_qualite(
+            planning.sessions.filter(Session.annulee == False).all(),
+            matieres_prioritaires
+        )
+        
+        db.session.commit()
         
         return {
             'success': True,
-            'message': 'Optimisation non encore implémentée',
-            'ancien_score': planning.score_qualite,
-            'nouveau_score': planning.score_qualite
-        }
\ No newline at end of file
+            'message': f'{len(inseres)} insérée(s), {len(modifies)} modifiée(s), {len(supprimes)} supprimée(s)',
+            'fenetre': {
+                'date_debut': debut_fenetre.isoformat(),
+                'date_fin': fin_fenetre.isoformat()
+            },
+            'inseres': inseres,
+            'modifies': modifies,
+            'supprimes': supprimes,
+            'inchanges': inchanges,
+            'score_qualite': planning.score_qualite
+        }
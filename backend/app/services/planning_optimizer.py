@@ -0,0 +1,439 @@
+"""
+Optimisation par recherche locale des plannings existants
+Recuit simulé avec liste tabou : déplacements et échanges de sessions futures
+entre créneaux libres, avec un calcul incrémental du score de chaque mouvement
+"""
+
+import math
+import random
+import time as chrono
+from collections import deque
+from datetime import date
+from typing import List, Dict, Optional
+
+
+class OptimiseurPlanning:
+    """
+    Moteur de recherche locale pour réorganiser les sessions d'un planning
+    
+    L'objectif est une somme de termes par session (priorité de la matière,
+    proximité de l'examen) moins une pénalité pour les répétitions d'une
+    même matière dans la journée. Chaque terme ne dépend que de la session
+    et des compteurs (jour, matière), ce qui permet d'évaluer un mouvement
+    en O(1) sans recalculer le planning complet.
+    """
+    
+    # Nombre de jours avant l'examen pendant lesquels une session rapporte un bonus
+    FENETRE_EXAMEN_JOURS = 14
+    
+    # Nombre d'itérations d'une recherche avec graine quand aucun n'est donné
+    ITERATIONS_PAR_DEFAUT = 200000
+    
+    def __init__(self, creneaux: List[Dict], sessions: List[Dict],
+                 poids_matieres: Dict[int, float],
+                 dates_examen: Dict[int, Optional[date]] = None,
+                 max_sessions_par_jour: int = None,
+                 sessions_fixes_par_jour: Dict[date, int] = None,
+                 budget_secondes: float = 2.0,
+                 graine: int = None,
+                 iterations_max: int = None,
+                 penalite_repetition: float = 0.5,
+                 taille_tabou: int = 7):
+        """
+        Initialise l'optimiseur
+        
+        Args:
+            creneaux: Créneaux candidats ({'debut': datetime, 'duree': minutes}),
+                y compris ceux occupés actuellement par les sessions
+            sessions: Sessions déplaçables ({'id', 'matiere_id', 'creneau'}),
+                'creneau' étant l'index du créneau occupé
+            poids_matieres: Poids de priorité par matière
+            dates_examen: Date d'examen par matière (None si aucune)
+            max_sessions_par_jour: Nombre maximal de sessions par jour
+            sessions_fixes_par_jour: Sessions non déplaçables par date, comptées
+                dans la limite journalière
+            budget_secondes: Durée maximale de la recherche (ignorée avec une
+                graine : l'arrêt ne dépend alors que du nombre d'itérations ;
+                sans graine, un budget nul ou négatif n'autorise aucune itération)
+            graine: Graine du générateur aléatoire ; le résultat est le même
+                d'une exécution et d'une machine à l'autre
+            iterations_max: Nombre maximal d'itérations (None = budget seul,
+                ou ITERATIONS_PAR_DEFAUT avec une graine)
+            penalite_repetition: Pénalité par paire de sessions d'une même matière le même jour
+            taille_tabou: Nombre de sessions récemment déplacées interdites de mouvement
+        """
+        self.creneaux = creneaux
+        self.sessions = sessions
+        self.poids_matieres = poids_matieres
+        self.dates_examen = dates_examen or {}
+        self.budget_secondes = budget_secondes
+        self.deterministe = graine is not None
+        if self.deterministe and not iterations_max:
+            iterations_max = self.ITERATIONS_PAR_DEFAUT
+        self.iterations_max = iterations_max
+        self.penalite_repetition = penalite_repetition
+        self.taille_tabou = taille_tabou
+        self.aleatoire = random.Random(graine)
+        
+        # Jour (ordinal) et durée de chaque créneau
+        self.jour_creneau = [c['debut'].date().toordinal() for c in creneaux]
+        self.duree_creneau = [c['duree'] for c in creneaux]
+        
+        self.sessions_fixes_par_jour = {
+            jour.toordinal(): nombre
+            for jour, nombre in (sessions_fixes_par_jour or {}).items()
+        }
+        self._appliquer([s['creneau'] for s in sessions])
+        
+        if max_sessions_par_jour is None:
+            max_sessions_par_jour = max(self.sessions_par_jour.values(), default=0)
+        self.max_sessions_par_jour = max_sessions_par_jour
+        
+        # Créneaux regroupés par durée : on ne déplace une session que vers un créneau de même durée
+        self.creneaux_par_duree = {}
+        for index_creneau, duree in enumerate(self.duree_creneau):
+            self.creneaux_par_duree.setdefault(duree, []).append(index_creneau)
+    
+    def _appliquer(self, affectation: List[int]):
+        """
+        Remplace l'affectation courante et recalcule les compteurs
+        
+        Args:
+            affectation: Index du créneau de chaque session
+        """
+        # Affectation courante : session -> créneau et créneau -> session
+        self.creneau_session = list(affectation)
+        self.session_creneau = [None] * len(self.creneaux)
+        for index_session, index_creneau in enumerate(self.creneau_session):
+            self.session_creneau[index_creneau] = index_session
+        
+        # Compteurs (jour, matière) et sessions par jour pour le calcul incrémental
+        self.compteurs = {}
+        self.sessions_par_jour = dict(self.sessions_fixes_par_jour)
+        for index_session, session in enumerate(self.sessions):
+            jour = self.jour_creneau[self.creneau_session[index_session]]
+            cle = (jour, session['matiere_id'])
+            self.compteurs[cle] = self.compteurs.get(cle, 0) + 1
+            self.sessions_par_jour[jour] = self.sessions_par_jour.get(jour, 0) + 1
+    
+    def _restaurer_creneaux_initiaux(self, affectation_initiale: List[int]) -> float:
+        """
+        Ramène à leur créneau d'origine les sessions dont le déplacement
+        n'améliore pas l'objectif (créneau d'origine libre, limite journalière respectée)
+        
+        Args:
+            affectation_initiale: Créneau d'origine de chaque session
+        
+        Returns:
+            Variation de l'objectif (positive ou nulle)
+        """
+        gain = 0.0
+        restauration = True
+        
+        while restauration:
+            restauration = False
+            
+            for index_session, creneau_initial in enumerate(affectation_initiale):
+                creneau_actuel = self.creneau_session[index_session]
+                if creneau_actuel == creneau_initial or self.session_creneau[creneau_initial] is not None:
+                    continue
+                
+                jour_actuel = self.jour_creneau[creneau_actuel]
+                jour_initial = self.jour_creneau[creneau_initial]
+                if jour_initial != jour_actuel and \
+                        self.sessions_par_jour.get(jour_initial, 0) >= self.max_sessions_par_jour:
+                    continue
+                
+                delta = self._delta_deplacement(self.sessions[index_session]['matiere_id'], jour_actuel, jour_initial)
+                if delta < -1e-9:
+                    continue
+                
+                self._deplacer(index_session, creneau_initial)
+                gain += delta
+                restauration = True
+        
+        return gain
+    
+    def _utilite(self, matiere_id: int, jour: int) -> float:
+        """
+        Valeur d'une session d'une matière placée un jour donné
+        
+        Args:
+            matiere_id: Matière de la session
+            jour: Jour (ordinal) du créneau
+        
+        Returns:
+            Utilité de la session
+        """
+        poids = self.poids_matieres.get(matiere_id, 1.0)
+        date_examen = self.dates_examen.get(matiere_id)
+        
+        if not date_examen:
+            return poids
+        
+        jours_avant = date_examen.toordinal() - jour
+        
+        if jours_avant < 0:
+            return -poids  # Session après l'examen : inutile
+        
+        if jours_avant <= self.FENETRE_EXAMEN_JOURS:
+            return poids * (2 - jours_avant / self.FENETRE_EXAMEN_JOURS)
+        
+        return poids
+    
+    def _objectif(self) -> float:
+        """
+        Calcule l'objectif complet de l'affectation courante
+        
+        Returns:
+            Valeur de l'objectif (plus grand = meilleur)
+        """
+        total = 0.0
+        
+        for index_session, session in enumerate(self.sessions):
+            jour = self.jour_creneau[self.creneau_session[index_session]]
+            total += self._utilite(session['matiere_id'], jour)
+        
+        for nombre in self.compteurs.values():
+            total -= self.penalite_repetition * nombre * (nombre - 1) / 2
+        
+        return total
+    
+    def _delta_deplacement(self, matiere_id: int, jour_depart: int, jour_arrivee: int) -> float:
+        """
+        Variation de l'objectif si une session change de jour (O(1))
+        
+        Args:
+            matiere_id: Matière de la session
+            jour_depart: Jour actuel
+            jour_arrivee: Nouveau jour
+        
+        Returns:
+            Variation de l'objectif
+        """
+        if jour_depart == jour_arrivee:
+            return 0.0
+        
+        delta = self._utilite(matiere_id, jour_arrivee) - self._utilite(matiere_id, jour_depart)
+        
+        # Paires perdues au départ, paires gagnées à l'arrivée
+        paires_perdues = self.compteurs.get((jour_depart, matiere_id), 0) - 1
+        paires_gagnees = self.compteurs.get((jour_arrivee, matiere_id), 0)
+        delta -= self.penalite_repetition * (paires_gagnees - paires_perdues)
+        
+        return delta
+    
+    def _changer_jour(self, matiere_id: int, jour_depart: int, jour_arrivee: int):
+        """
+        Met à jour les compteurs quand une session change de jour
+        
+        Args:
+            matiere_id: Matière de la session
+            jour_depart: Jour actuel
+            jour_arrivee: Nouveau jour
+        """
+        self.compteurs[(jour_depart, matiere_id)] -= 1
+        self.compteurs[(jour_arrivee, matiere_id)] = self.compteurs.get((jour_arrivee, matiere_id), 0) + 1
+        self.sessions_par_jour[jour_depart] -= 1
+        self.sessions_par_jour[jour_arrivee] = self.sessions_par_jour.get(jour_arrivee, 0) + 1
+    
+    def _deplacer(self, index_session: int, index_creneau: int):
+        """
+        Applique le déplacement d'une session vers un créneau libre
+        
+        Args:
+            index_session: Session à déplacer
+            index_creneau: Créneau d'arrivée (libre)
+        """
+        ancien_creneau = self.creneau_session[index_session]
+        
+        self._changer_jour(
+            self.sessions[index_session]['matiere_id'],
+            self.jour_creneau[ancien_creneau],
+            self.jour_creneau[index_creneau]
+        )
+        
+        self.session_creneau[ancien_creneau] = None
+        self.session_creneau[index_creneau] = index_session
+        self.creneau_session[index_session] = index_creneau
+    
+    def _echanger(self, session_a: int, session_b: int):
+        """
+        Échange les créneaux de deux sessions
+        
+        Args:
+            session_a: Première session
+            session_b: Seconde session
+        """
+        creneau_a = self.creneau_session[session_a]
+        creneau_b = self.creneau_session[session_b]
+        jour_a = self.jour_creneau[creneau_a]
+        jour_b = self.jour_creneau[creneau_b]
+        
+        self._changer_jour(self.sessions[session_a]['matiere_id'], jour_a, jour_b)
+        self._changer_jour(self.sessions[session_b]['matiere_id'], jour_b, jour_a)
+        
+        self.creneau_session[session_a] = creneau_b
+        self.creneau_session[session_b] = creneau_a
+        self.session_creneau[creneau_a] = session_b
+        self.session_creneau[creneau_b] = session_a
+    
+    def _proposer_mouvement(self, tabou: deque) -> Optional[tuple]:
+        """
+        Tire un mouvement aléatoire valide
+        
+        Args:
+            tabou: Sessions récemment déplacées
+        
+        Returns:
+            ('deplacement', session, creneau, delta) ou ('echange', session_a, session_b, delta),
+            None si le tirage ne donne pas de mouvement valide
+        """
+        index_session = self.aleatoire.randrange(len(self.sessions))
+        if index_session in tabou:
+            return None
+        
+        creneau_actuel = self.creneau_session[index_session]
+        candidats = self.creneaux_par_duree[self.duree_creneau[creneau_actuel]]
+        index_creneau = candidats[self.aleatoire.randrange(len(candidats))]
+        
+        if index_creneau == creneau_actuel:
+            return None
+        
+        matiere_id = self.sessions[index_session]['matiere_id']
+        jour_depart = self.jour_creneau[creneau_actuel]
+        jour_arrivee = self.jour_creneau[index_creneau]
+        autre_session = self.session_creneau[index_creneau]
+        
+        if autre_session is None:
+            # Déplacement vers un créneau libre, dans la limite journalière
+            if jour_arrivee != jour_depart and \
+                    self.sessions_par_jour.get(jour_arrivee, 0) >= self.max_sessions_par_jour:
+                return None
+            
+            delta = self._delta_deplacement(matiere_id, jour_depart, jour_arrivee)
+            return ('deplacement', index_session, index_creneau, delta)
+        
+        if autre_session in tabou:
+            return None
+        
+        autre_matiere_id = self.sessions[autre_session]['matiere_id']
+        if autre_matiere_id == matiere_id or jour_arrivee == jour_depart:
+            return None  # Échange sans effet sur l'objectif
+        
+        # Matières différentes : les deux variations sont indépendantes
+        delta = self._delta_deplacement(matiere_id, jour_depart, jour_arrivee) + \
+            self._delta_deplacement(autre_matiere_id, jour_arrivee, jour_depart)
+        
+        return ('echange', index_session, autre_session, delta)
+    
+    def optimiser(self) -> Dict:
+        """
+        Lance le recuit simulé dans la limite du budget
+        
+        Avec une graine, la température et l'arrêt dépendent du nombre
+        d'itérations et non du temps écoulé. Les mouvements sans effet sur
+        l'objectif sont refusés, et les sessions dont le déplacement final
+        n'apporte rien retrouvent leur créneau d'origine.
+        
+        Returns:
+            Dict avec la meilleure affectation trouvée et les statistiques
+        """
+        debut = chrono.perf_counter()
+        objectif_initial = self._objectif()
+        
+        budget_epuise = not self.deterministe and self.budget_secondes <= 0
+        
+        if not self.sessions or len(self.creneaux) < 2 or budget_epuise:
+            return self._resultat(objectif_initial, objectif_initial, list(self.creneau_session), 0, 0, debut)
+        
+        affectation_initiale = list(self.creneau_session)
+        objectif_courant = objectif_initial
+        meilleur_objectif = objectif_initial
+        meilleure_affectation = list(self.creneau_session)
+        
+        # Sessions déplacées depuis la meilleure affectation : seules celles-ci
+        # sont recopiées à chaque amélioration
+        modifiees = set()
+        
+        temperature_initiale = 1.0
+        temperature_finale = 0.001
+        tabou = deque(maxlen=self.taille_tabou)
+        
+        iterations = 0
+        mouvements_acceptes = 0
+        progression = 0.0
+        budget_consomme = 0.0
+        
+        while progression < 1.0:
+            iterations += 1
+            
+            # Contrôle du budget toutes les 256 itérations (sans graine seulement)
+            if not self.deterministe and iterations % 256 == 0:
+                budget_consomme = (chrono.perf_counter() - debut) / self.budget_secondes
+            
+            progression = budget_consomme
+            if self.iterations_max:
+                progression = max(progression, iterations / self.iterations_max)
+            
+            mouvement = self._proposer_mouvement(tabou)
+            if mouvement is None:
+                continue
+            
+            type_mouvement, premier, second, delta = mouvement
+            
+            # Un mouvement neutre déplacerait la session sans rien gagner
+            if abs(delta) < 1e-9:
+                continue
+            
+            temperature = temperature_initiale * (temperature_finale / temperature_initiale) ** min(progression, 1.0)
+            
+            if delta < 0 and self.aleatoire.random() >= math.exp(delta / temperature):
+                continue
+            
+            if type_mouvement == 'deplacement':
+                self._deplacer(premier, second)
+                tabou.append(premier)
+                modifiees.add(premier)
+            else:
+                self._echanger(premier, second)
+                tabou.append(premier)
+                tabou.append(second)
+                modifiees.add(premier)
+                modifiees.add(second)
+            
+            objectif_courant += delta
+            mouvements_acceptes += 1
+            
+            if objectif_courant > meilleur_objectif + 1e-9:
+                meilleur_objectif = objectif_courant
+                for index_session in modifiees:
+                    meilleure_affectation[index_session] = self.creneau_session[index_session]
+                modifiees.clear()
+        
+        self._appliquer(meilleure_affectation)
+        meilleur_objectif += self._restaurer_creneaux_initiaux(affectation_initiale)
+        
+        return self._resultat(objectif_initial, meilleur_objectif, self.creneau_session,
+                              iterations, mouvements_acceptes, debut)
+    
+    def _resultat(self, objectif_initial: float, objectif_final: float,
+                  affectation: List[int], iterations: int,
+                  mouvements_acceptes: int, debut: float) -> Dict:
+        """
+        Met en forme le résultat de l'optimisation
+        
+        Returns:
+            Dict avec affectation par session et statistiques
+        """
+        return {
+            'affectation': {
+                session['id']: affectation[index_session]
+                for index_session, session in enumerate(self.sessions)
+            },
+            'objectif_initial': round(objectif_initial, 3),
+            'objectif_final': round(objectif_final, 3),
+            'iterations': iterations,
+            'mouvements_acceptes': mouvements_acceptes,
+            'duree_secondes': round(chrono.perf_counter() - debut, 3)
+        }
@@ -0,0 +1,306 @@
+"""
+Évaluation parallèle de scénarios de planning (« et si ? »)
+Les données de l'étudiant sont chargées une seule fois puis figées dans un
+instantané sans lien avec la base ; chaque variante de paramètres est générée
+en mémoire dans un pool de processus et seuls les plannings non dominés
+(score, heures d'étude, couverture des examens) sont renvoyés
+"""
+
+import itertools
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date, timedelta
+from types import SimpleNamespace
+from typing import List, Dict
+
+from app.models.user import User
+from app.services.planning_generator import PlanningGenerator
+from app.services.planning_optimizer import OptimiseurPlanning
+
+
+# Paramètres qu'une variante peut faire varier
+PARAMETRES_VARIABLES = [
+    'heures_etude_par_jour',
+    'jours_etude_par_semaine',
+    'jours_repos',
+    'duree_session',
+    'mode'
+]
+
+# Pool de processus partagé entre les requêtes, créé à la première utilisation
+_executeur = None
+_taille_executeur = None
+_verrou_executeur = threading.Lock()
+
+
+def _obtenir_executeur(processus: int = None) -> ProcessPoolExecutor:
+    """
+    Retourne le pool de processus des scénarios
+    
+    Les processus sont démarrés avec 'spawn' : un fork du serveur (threads
+    de requêtes et de jobs) pourrait hériter de verrous dans un état incohérent.
+    Le pool est recréé quand la taille demandée change ; l'ancien termine
+    les évaluations déjà soumises.
+    
+    Args:
+        processus: Nombre de processus (None = nombre de cœurs)
+    
+    Returns:
+        Pool de processus
+    """
+    global _executeur, _taille_executeur
+    
+    taille = processus or os.cpu_count()
+    
+    with _verrou_executeur:
+        if _executeur is not None and _taille_executeur != taille:
+            _executeur.shutdown(wait=False)
+            _executeur = None
+        
+        if _executeur is None:
+            _executeur = ProcessPoolExecutor(
+                max_workers=taille,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+            _taille_executeur = taille
+        
+        return _executeur
+
+
+def _reinitialiser_executeur():
+    """Abandonne le pool courant (inutilisable après la mort d'un processus)"""
+    global _executeur
+    
+    with _verrou_executeur:
+        if _executeur is not None:
+            _executeur.shutdown(wait=False, cancel_futures=True)
+            _executeur = None
+
+
+def creer_instantane(user: User) -> Dict:
+    """
+    Charge une fois les données de génération et les copie en objets simples
+    
+    Args:
+        user: Utilisateur concerné
+    
+    Returns:
+        Instantané sérialisable (utilisateur, matières, tâches, emploi du temps, cours)
+    """
+    generator = PlanningGenerator(user)
+    
+    return {
+        'user': SimpleNamespace(
+            id=user.id,
+            heure_productive_debut=user.heure_productive_debut,
+            heure_productive_fin=user.heure_productive_fin,
+            duree_session_preferee=user.duree_session_preferee,
+            duree_pause=user.duree_pause
+        ),
+        'matieres': [
+            SimpleNamespace(
+                id=matiere.id,
+                nom=matiere.nom,
+                priorite=matiere.priorite,
+                niveau_difficulte=matiere.niveau_difficulte,
+                pourcentage_complete=matiere.pourcentage_complete,
+                coefficient=matiere.coefficient,
+                date_examen=matiere.date_examen
+            )
+            for matiere in generator.matieres
+        ],
+        'taches': [
+            SimpleNamespace(
+                id=tache.id,
+                matiere_id=tache.matiere_id,
+                priorite=tache.priorite,
+                date_limite=tache.date_limite
+            )
+            for tache in generator.taches
+        ],
+        'emploi_du_temps': SimpleNamespace(id=generator.emploi_du_temps.id) if generator.emploi_du_temps else None,
+        'cours': [
+            SimpleNamespace(
+                id=cours.id,
+                jour_semaine=cours.jour_semaine,
+                heure_debut=cours.heure_debut,
+                heure_fin=cours.heure_fin,
+                date_debut=cours.date_debut,
+                date_fin=cours.date_fin
+            )
+            for cours_du_jour in generator.cours_par_jour.values()
+            for cours in cours_du_jour
+        ]
+    }
+
+
+def generer_variantes(base: Dict, grille: Dict[str, List], max_variantes: int) -> List[Dict]:
+    """
+    Produit le produit cartésien des valeurs de la grille appliqué aux paramètres de base
+    
+    Args:
+        base: Paramètres communs (date_debut, date_fin, ...)
+        grille: Valeurs possibles par paramètre variable
+        max_variantes: Nombre maximal de variantes autorisé
+    
+    Returns:
+        Liste des paramètres complets de chaque variante
+    """
+    inconnus = set(grille) - set(PARAMETRES_VARIABLES)
+    if inconnus:
+        raise ValueError(f"Paramètres non variables : {', '.join(sorted(inconnus))}")
+    
+    noms = [nom for nom in PARAMETRES_VARIABLES if grille.get(nom)]
+    combinaisons = list(itertools.product(*(grille[nom] for nom in noms)))
+    
+    if len(combinaisons) > max_variantes:
+        raise ValueError(f"{len(combinaisons)} variantes demandées, maximum {max_variantes}")
+    
+    return [dict(base, **dict(zip(noms, valeurs))) for valeurs in combinaisons]
+
+
+def evaluer_variante(instantane: Dict, parametres: Dict) -> Dict:
+    """
+    Génère en mémoire le planning d'une variante et calcule ses indicateurs
+    
+    Exécuté dans un processus du pool : aucune requête en base.
+    
+    Args:
+        instantane: Données figées de l'étudiant
+        parametres: Paramètres de la variante
+    
+    Returns:
+        Paramètres, indicateurs et aperçu en colonnes du planning
+    """
+    user = instantane['user']
+    if parametres.get('duree_session'):
+        user = SimpleNamespace(**dict(vars(user), duree_session_preferee=parametres['duree_session']))
+    
+    generator = PlanningGenerator(user, donnees={
+        'matieres': instantane['matieres'],
+        'taches': instantane['taches'],
+        'emploi_du_temps': instantane['emploi_du_temps'],
+        'cours': instantane['cours']
+    })
+    
+    date_debut = date.fromisoformat(parametres['date_debut'])
+    date_fin = date.fromisoformat(parametres['date_fin'])
+    
+    apercu = generator.previsualiser_planning(
+        date_debut=date_debut,
+        date_fin=date_fin,
+        heures_etude_par_jour=parametres.get('heures_etude_par_jour', 4.0),
+        jours_etude_par_semaine=parametres.get('jours_etude_par_semaine', 6),
+        jours_repos=parametres.get('jours_repos'),
+        mode=parametres.get('mode', 'jour')
+    )
+    
+    colonnes = apercu['sessions']
+    
+    return {
+        'parametres': parametres,
+        'indicateurs': {
+            'score_qualite': apercu['score_qualite'],
+            'heures_totales': round(sum(colonnes['durees']) / 60, 2),
+            'couverture_examens': _couverture_examens(instantane['matieres'], colonnes, date_debut, date_fin),
+            'sessions_total': apercu['sessions_total']
+        },
+        'apercu': apercu
+    }
+
+
+def _couverture_examens(matieres: List, colonnes: Dict, date_debut: date, date_fin: date) -> float:
+    """
+    Part des examens de la période précédés d'au moins une session de la matière
+    
+    Une session compte si elle a lieu dans la fenêtre de révision précédant
+    l'examen (même fenêtre que l'optimiseur).
+    
+    Returns:
+        Couverture entre 0 et 1 (1 si aucun examen dans la période)
+    """
+    fenetre = OptimiseurPlanning.FENETRE_EXAMEN_JOURS
+    examens = {
+        matiere.id: matiere.date_examen.date()
+        for matiere in matieres
+        if matiere.date_examen and date_debut <= matiere.date_examen.date() <= date_fin
+    }
+    
+    if not examens:
+        return 1.0
+    
+    couvertes = set()
+    for jour, matiere_id in zip(colonnes['jours'], colonnes['matiere_ids']):
+        date_examen = examens.get(matiere_id)
+        if date_examen and 0 <= (date_examen - (date_debut + timedelta(days=jour))).days <= fenetre:
+            couvertes.add(matiere_id)
+    
+    return round(len(couvertes) / len(examens), 3)
+
+
+def front_pareto(resultats: List[Dict]) -> List[bool]:
+    """
+    Indique pour chaque résultat s'il est non dominé
+    
+    Critères : score de qualité et couverture des examens à maximiser,
+    heures d'étude totales à minimiser (charge de travail).
+    
+    Args:
+        resultats: Résultats de evaluer_variante
+    
+    Returns:
+        Liste de booléens (True = sur le front de Pareto)
+    """
+    points = [
+        (r['indicateurs']['score_qualite'], r['indicateurs']['couverture_examens'], -r['indicateurs']['heures_totales'])
+        for r in resultats
+    ]
+    
+    def domine(a, b):
+        return all(x >= y for x, y in zip(a, b)) and any(x > y for x, y in zip(a, b))
+    
+    return [not any(domine(autre, point) for autre in points) for point in points]
+
+
+def evaluer_scenarios(user: User, base: Dict, grille: Dict[str, List],
+                      max_variantes: int = 32, processus: int = None) -> Dict:
+    """
+    Évalue toutes les variantes et sépare plannings non dominés et dominés
+    
+    Args:
+        user: Utilisateur concerné
+        base: Paramètres communs (date_debut, date_fin au format ISO, ...)
+        grille: Valeurs possibles par paramètre variable
+        max_variantes: Nombre maximal de variantes
+        processus: Taille du pool (0 = évaluation dans le processus courant)
+    
+    Returns:
+        Plannings du front de Pareto (avec aperçu) et indicateurs des autres
+    """
+    variantes = generer_variantes(base, grille, max_variantes)
+    instantane = creer_instantane(user)
+    
+    if processus == 0 or len(variantes) == 1:
+        resultats = [evaluer_variante(instantane, variante) for variante in variantes]
+    else:
+        executeur = _obtenir_executeur(processus)
+        try:
+            resultats = list(executeur.map(evaluer_variante, itertools.repeat(instantane), variantes))
+        except BrokenProcessPool:
+            # Un processus a été tué : le pool sera recréé à la prochaine requête
+            _reinitialiser_executeur()
+            raise
+    
+    non_domines = front_pareto(resultats)
+    
+    return {
+        'variantes_evaluees': len(resultats),
+        'pareto': [r for r, garde in zip(resultats, non_domines) if garde],
+        'dominees': [
+            {'parametres': r['parametres'], 'indicateurs': r['indicateurs']}
+            for r, garde in zip(resultats, non_domines) if not garde
+        ]
+    }
@@ -87,6 +87,26 @@ def save_uploaded_file(file, upload_folder, allowed_extensions=None):
     return filepath
 
 
+def calculer_empreinte_fichier(filepath, taille_bloc=1024 * 1024):
+    """
+    Calcule l'empreinte SHA-256 d'un fichier, lu par blocs
+    
+    Args:
+        filepath (str): Chemin du fichier
+        taille_bloc (int): Taille des blocs lus en octets
+        
+    Returns:
+        str: Empreinte hexadécimale
+    """
+    empreinte = hashlib.sha256()
+    
+    with open(filepath, 'rb') as fichier:
+        for bloc in iter(lambda: fichier.read(taille_bloc), b''):
+            empreinte.update(bloc)
+    
+    return empreinte.hexdigest()
+
+
 def delete_file(filepath):
     """
     Supprime un fichier de manière sécurisée
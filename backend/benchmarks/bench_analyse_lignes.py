@@ -0,0 +1,171 @@
+"""
+Benchmark : analyse des lignes d'emploi du temps, regex successives contre tokeniseur compilé
+
+Utilisation (depuis le dossier backend):
+    python -m benchmarks.bench_analyse_lignes
+    python -m benchmarks.bench_analyse_lignes --lignes 50000 --repetitions 5
+
+Un texte synthétique (jours, lignes de cours, lignes parasites) est analysé
+par l'ancienne détection, conservée ici comme référence, puis par
+PDFAnalyzer._detecter_cours. Affiche le débit en lignes par seconde et le
+nombre de cours retrouvés exactement (jour, horaires, matière).
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+from datetime import time as heure
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.pdf_analyzer import PDFAnalyzer
+
+JOURS = ['Lundi', 'Mardi', 'Mercredi', 'Jeudi', 'Vendredi', 'Samedi']
+MATIERES = ['Analyse', 'Algèbre linéaire', 'Physique quantique', 'Chimie organique', 'Programmation', 'Anglais']
+TYPES = ['CM', 'TD', 'TP', 'Cours magistral', 'Travaux dirigés']
+SALLES = ['Salle B12', 'Amphi A', 'Labo L3', 'Salle 204', '']
+PARASITES = ['Université de Test - Licence 2', 'Semestre 1', 'Page {}', 'Mise à jour le 02/09']
+
+
+def texte_synthetique(nombre_lignes, graine=0):
+    """
+    Génère un emploi du temps sous forme de texte
+
+    Returns:
+        Tuple (texte, ensemble des cours attendus (jour, début, fin, matière))
+    """
+    generateur = random.Random(graine)
+    lignes = []
+    attendus = set()
+    jour = None
+
+    while len(lignes) < nombre_lignes:
+        tirage = generateur.random()
+
+        if jour is None or tirage < 0.1:
+            jour = generateur.choice(JOURS)
+            lignes.append(jour)
+        elif tirage < 0.2:
+            lignes.append(generateur.choice(PARASITES).format(len(lignes)))
+        else:
+            debut = generateur.randint(8, 17)
+            fin = debut + generateur.choice([1, 2])
+            minutes = generateur.choice(['00', '15', '30'])
+            separateur = generateur.choice([':', 'h'])
+            matiere = generateur.choice(MATIERES)
+            elements = [
+                f'{debut:02d}{separateur}{minutes} - {fin:02d}{separateur}{minutes}',
+                matiere,
+                generateur.choice(TYPES),
+                generateur.choice(SALLES)
+            ]
+            lignes.append(' '.join(element for element in elements if element))
+            attendus.add((jour.lower(), heure(debut, int(minutes)), heure(fin, int(minutes)), matiere))
+
+    return '\n'.join(lignes), attendus
+
+
+class AnalyseurReference(PDFAnalyzer):
+    """Détection d'origine : une recherche ou une substitution par motif et par mot-clé"""
+
+    def _detecter_cours(self):
+        cours = []
+        jour_courant = None
+
+        for ligne in self.texte_brut.split('\n'):
+            ligne_lower = ligne.lower().strip()
+            if not ligne_lower:
+                continue
+
+            jour_match = re.search(self.JOUR_PATTERN, ligne_lower)
+            if jour_match:
+                jour_courant = jour_match.group(1)
+
+            heures_matches = list(re.finditer(self.HEURE_PATTERN, ligne_lower))
+            if not heures_matches or not jour_courant:
+                continue
+
+            for match in heures_matches:
+                heure_debut = heure(int(match.group(1)), int(match.group(2)))
+                heure_fin_match = re.search(self.HEURE_PATTERN, ligne_lower[match.end():])
+                if heure_fin_match:
+                    heure_fin = heure(int(heure_fin_match.group(1)), int(heure_fin_match.group(2)))
+                else:
+                    heure_fin = self._ajouter_heures(heure_debut, 2)
+
+                matiere = self._extraire_matiere(ligne)
+                salle = re.search(self.SALLE_PATTERN, ligne, re.IGNORECASE)
+                salle = salle.group(0) if salle else None
+
+                cours.append({
+                    'jour': jour_courant,
+                    'heure_debut': heure_debut,
+                    'heure_fin': heure_fin,
+                    'matiere': matiere,
+                    'type_cours': self._detecter_type_cours(ligne),
+                    'salle': salle,
+                    'confiance': self._calculer_confiance(matiere, heure_debut, heure_fin, salle)
+                })
+
+        return cours
+
+    def _extraire_matiere(self, ligne):
+        ligne_clean = re.sub(self.HEURE_PATTERN, '', ligne)
+        ligne_clean = re.sub(self.SALLE_PATTERN, '', ligne_clean, flags=re.IGNORECASE)
+        for type_keywords in self.TYPE_COURS_KEYWORDS.values():
+            for keyword in type_keywords:
+                ligne_clean = re.sub(r'\b' + keyword + r'\b', '', ligne_clean, flags=re.IGNORECASE)
+        matiere = re.sub(r'\s+', ' ', ligne_clean.strip())
+        return matiere[:100] if matiere else 'Matière non identifiée'
+
+    def _detecter_type_cours(self, ligne):
+        ligne_lower = ligne.lower()
+        for type_cours, keywords in self.TYPE_COURS_KEYWORDS.items():
+            for keyword in keywords:
+                if keyword.lower() in ligne_lower:
+                    return type_cours
+        return 'cours'
+
+
+def mesurer(analyzer, texte, repetitions):
+    """
+    Détecte les cours plusieurs fois
+
+    Returns:
+        Tuple (cours détectés, durée moyenne en secondes)
+    """
+    analyzer.texte_brut = texte
+    debut = time.perf_counter()
+
+    for _ in range(repetitions):
+        cours = analyzer._detecter_cours()
+
+    return cours, (time.perf_counter() - debut) / repetitions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark analyse des lignes d\'emploi du temps')
+    parser.add_argument('--lignes', type=int, default=10000)
+    parser.add_argument('--repetitions', type=int, default=3)
+    args = parser.parse_args()
+
+    texte, attendus = texte_synthetique(args.lignes)
+
+    print(f"{args.lignes} lignes, {len(attendus)} cours distincts attendus")
+    print(f"{'méthode':>12} {'lignes/s':>10} {'cours':>7} {'exacts':>7}")
+
+    resultats = {}
+    for nom, classe in (('référence', AnalyseurReference), ('tokeniseur', PDFAnalyzer)):
+        cours, duree = mesurer(classe(None, 'synthetique.pdf'), texte, args.repetitions)
+        trouves = {(c['jour'], c['heure_debut'], c['heure_fin'], c['matiere']) for c in cours}
+        resultats[nom] = duree
+        print(f"{nom:>12} {args.lignes / duree:>10.0f} {len(cours):>7} {len(trouves & attendus):>7}")
+
+    print(f"{'accélération':>12} {resultats['référence'] / resultats['tokeniseur']:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+"""
+Benchmark : extraction du texte PDF séquentielle contre extraction par lots de pages
+
+Utilisation (depuis le dossier backend):
+    python -m benchmarks.bench_extraction_pdf
+    python -m benchmarks.bench_extraction_pdf --pages 8 32 96 --processus 4
+
+Un emploi du temps synthétique (une semaine de cours par page) est écrit
+pour chaque taille de document. Les deux méthodes doivent produire le même
+texte ; le temps total et les pages les plus lentes sont affichés. Le pool de
+processus est démarré avant les mesures.
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.pdf_analyzer import PDFAnalyzer, MODE_TEXTE, PAGES_PAR_LOT, compter_pages
+
+JOURS = ['Lundi', 'Mardi', 'Mercredi', 'Jeudi', 'Vendredi']
+CRENEAUX = [('08:00', '10:00'), ('10:15', '12:15'), ('13:30', '15:30'), ('15:45', '17:45')]
+MATIERES = ['Analyse', 'Algèbre linéaire', 'Physique', 'Chimie organique', 'Programmation', 'Anglais']
+TYPES = ['CM', 'TD', 'TP']
+
+
+def _echapper(texte):
+    """Encode une chaîne littérale PDF"""
+    return texte.encode('cp1252').replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)')
+
+
+def ecrire_pdf(chemin, pages, rectangles=None):
+    """
+    Écrit un PDF minimal (police Helvetica, sans dépendance externe)
+
+    Args:
+        chemin: Fichier de sortie
+        pages: Liste de pages, chacune une liste de tuples (x, y, texte) en points
+        rectangles: Par page, liste de tuples (x, y, largeur, hauteur) tracés
+            en contour (facultatif)
+    """
+    objets = {
+        1: b'<< /Type /Catalog /Pages 2 0 R >>',
+        3: b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>'
+    }
+    pages_ids = []
+
+    for numero, textes in enumerate(pages):
+        page_id, contenu_id = 4 + 2 * numero, 5 + 2 * numero
+        pages_ids.append(page_id)
+        flux = b'\n'.join(
+            [b'%.1f %.1f %.1f %.1f re S' % rectangle for rectangle in (rectangles[numero] if rectangles else [])]
+            + [b'BT /F1 9 Tf %.1f %.1f Td (%s) Tj ET' % (x, y, _echapper(texte)) for x, y, texte in textes]
+        )
+        objets[page_id] = (
+            b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 842 595] '
+            b'/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>' % contenu_id
+        )
+        objets[contenu_id] = b'<< /Length %d >>\nstream\n%s\nendstream' % (len(flux), flux)
+
+    objets[2] = b'<< /Type /Pages /Kids [%s] /Count %d >>' % (
+        b' '.join(b'%d 0 R' % page_id for page_id in pages_ids), len(pages_ids)
+    )
+
+    sortie = bytearray(b'%PDF-1.4\n')
+    positions = []
+    for numero in sorted(objets):
+        positions.append(len(sortie))
+        sortie += b'%d 0 obj\n%s\nendobj\n' % (numero, objets[numero])
+
+    debut_xref = len(sortie)
+    sortie += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objets) + 1)
+    sortie += b''.join(b'%010d 00000 n \n' % position for position in positions)
+    sortie += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objets) + 1, debut_xref)
+
+    with open(chemin, 'wb') as fichier:
+        fichier.write(sortie)
+
+
+def page_emploi_du_temps(numero):
+    """Une semaine de cours sous forme de lignes de texte (groupe numéro)"""
+    textes = [(40, 560, f'Emploi du temps - Groupe {numero + 1}')]
+    y = 540
+
+    for index_jour, jour in enumerate(JOURS):
+        textes.append((40, y, jour))
+        y -= 11
+        for index_creneau, (debut, fin) in enumerate(CRENEAUX):
+            matiere = MATIERES[(numero + index_jour + index_creneau) % len(MATIERES)]
+            type_cours = TYPES[(index_jour + index_creneau) % len(TYPES)]
+            textes.append((60, y, f'{debut} - {fin} {matiere} {type_cours} Salle B{100 + index_creneau + numero % 7}'))
+            y -= 11
+        y -= 4
+
+    return textes
+
+
+def chronometrer(pdf_path, executeur):
+    """
+    Extrait le texte d'un PDF
+
+    Returns:
+        Tuple (texte, durées par page, durée totale en secondes)
+    """
+    analyzer = PDFAnalyzer(None, pdf_path, MODE_TEXTE)
+    debut = time.perf_counter()
+    texte = analyzer._extraire_texte_pdf(executeur)
+    return texte, analyzer.durees_pages, time.perf_counter() - debut
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark extraction PDF séquentielle vs par lots')
+    parser.add_argument('--pages', type=int, nargs='+', default=[8, 32, 96])
+    parser.add_argument('--processus', type=int, default=os.cpu_count() or 2)
+    parser.add_argument('--lentes', type=int, default=3, help='Nombre de pages lentes affichées')
+    args = parser.parse_args()
+
+    executeur = ProcessPoolExecutor(max_workers=args.processus, mp_context=multiprocessing.get_context('spawn'))
+
+    with tempfile.TemporaryDirectory() as dossier:
+        # Démarrage des processus hors mesure
+        chemin_amorce = os.path.join(dossier, 'amorce.pdf')
+        ecrire_pdf(chemin_amorce, [page_emploi_du_temps(0)])
+        list(executeur.map(compter_pages, [chemin_amorce] * args.processus))
+
+        print(f"Lots de {PAGES_PAR_LOT} pages, {args.processus} processus")
+        print(f"{'pages':>6} {'séquentielle (s)':>17} {'par lots (s)':>13} {'accélération':>13}   pages lentes")
+
+        for nombre_pages in args.pages:
+            chemin = os.path.join(dossier, f'edt_{nombre_pages}.pdf')
+            ecrire_pdf(chemin, [page_emploi_du_temps(numero) for numero in range(nombre_pages)])
+
+            texte_sequentiel, _, duree_sequentielle = chronometrer(chemin, None)
+            texte_lots, durees_pages, duree_lots = chronometrer(chemin, executeur)
+
+            if texte_sequentiel != texte_lots:
+                raise SystemExit('Les deux méthodes ne produisent pas le même texte')
+
+            lentes = sorted(durees_pages, key=lambda page: page['duree_ms'], reverse=True)[:args.lentes]
+            print(
+                f"{nombre_pages:>6} {duree_sequentielle:>17.3f} {duree_lots:>13.3f} "
+                f"{duree_sequentielle / duree_lots:>12.1f}x   "
+                + ', '.join(f"p{page['page']} {page['duree_ms']:.0f} ms" for page in lentes)
+            )
+
+    executeur.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark : mémoire de la génération complète contre la génération en flux
+
+Utilisation (depuis le dossier backend):
+    python -m benchmarks.bench_generation_flux
+    python -m benchmarks.bench_generation_flux --jours 365 730 1460 --matieres 8
+
+Pour chaque durée de planning, affiche le pic de mémoire Python (tracemalloc)
+et le temps de génération des deux méthodes. Le cache des plannings est
+désactivé pour que chaque génération soit réellement calculée.
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from app.services.cache_plannings import cache_plannings
+from app.services.planning_generator import PlanningGenerator, MODE_JOUR, MODES_GENERATION
+from benchmarks.bench_moteurs_planning import creer_tables, preparer_utilisateur
+
+
+def mesurer(user, nombre_jours, mode, flux):
+    """
+    Génère un planning en mesurant le pic de mémoire
+
+    Returns:
+        Tuple (planning, pic en Mio, durée en secondes)
+    """
+    generator = PlanningGenerator(user)
+    parametres = {
+        'date_debut': date.today(),
+        'date_fin': date.today() + timedelta(days=nombre_jours - 1),
+        'heures_etude_par_jour': 4.0,
+        'mode': mode
+    }
+
+    tracemalloc.start()
+    debut = time.perf_counter()
+
+    if flux:
+        planning = generator.generer_planning_en_flux(**parametres)
+    else:
+        planning = generator.generer_planning_automatique(**parametres)
+
+    duree = time.perf_counter() - debut
+    _, pic = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return planning, pic / (1024 * 1024), duree
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark mémoire génération complète vs flux')
+    parser.add_argument('--jours', type=int, nargs='+', default=[365, 730, 1460])
+    parser.add_argument('--matieres', type=int, default=6)
+    parser.add_argument('--mode', choices=MODES_GENERATION, default=MODE_JOUR)
+    args = parser.parse_args()
+
+    config_name = 'development' if os.environ.get('DATABASE_URL') else 'testing'
+    app = create_app(config_name)
+    cache_plannings.max_entrees = 0
+
+    with app.app_context():
+        creer_tables()
+
+        print(f"{'jours':>6} {'méthode':>10} {'sessions':>9} {'pic (Mio)':>10} {'durée (s)':>10}")
+
+        for nombre_jours in args.jours:
+            # Examens au-delà de la période : toutes les matières restent planifiées
+            user = preparer_utilisateur(args.matieres, nombre_jours * 2)
+
+            for flux in (False, True):
+                planning, pic, duree = mesurer(user, nombre_jours, args.mode, flux)
+                print(
+                    f"{nombre_jours:>6} {'flux' if flux else 'complète':>10} "
+                    f"{planning.sessions_total:>9} {pic:>10.2f} {duree:>10.3f}"
+                )
+
+
+if __name__ == '__main__':
+    main()
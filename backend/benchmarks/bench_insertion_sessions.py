@@ -0,0 +1,145 @@
+"""
+Benchmark : insertion des sessions générées, ORM (add + flush) contre insertion en masse
+
+Utilisation (depuis le dossier backend):
+    python -m benchmarks.bench_insertion_sessions
+    python -m benchmarks.bench_insertion_sessions --tailles 1000 10000 --repetitions 3
+
+Par défaut la base SQLite en mémoire de la configuration de test est utilisée ;
+DATABASE_URL permet de viser une vraie base PostgreSQL (config 'development').
+"""
+
+import argparse
+import os
+import sys
+import time as chrono
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db
+from app.models import User, Matiere, Tache, Planning, Session
+from app.services.planning_generator import SessionGeneree, inserer_sessions_en_masse
+
+
+def creer_tables():
+    """Crée uniquement les tables nécessaires au benchmark"""
+    tables = [User.__table__, Matiere.__table__, Planning.__table__, Tache.__table__, Session.__table__]
+    db.metadata.create_all(bind=db.engine, tables=tables)
+
+
+def preparer_donnees():
+    """
+    Crée un utilisateur, une matière et un planning de test
+
+    Returns:
+        Tuple (matiere_id, planning_id)
+    """
+    user = User(nom='Benchmark', email=f'bench-{datetime.utcnow().timestamp()}@test.com', mot_de_passe='Bench1234')
+    db.session.add(user)
+    db.session.flush()
+
+    matiere = Matiere(nom='Mathématiques', user_id=user.id)
+    planning = Planning(
+        nom='Planning benchmark',
+        user_id=user.id,
+        date_debut=datetime(2025, 1, 1),
+        date_fin=datetime(2025, 12, 31)
+    )
+    db.session.add_all([matiere, planning])
+    db.session.commit()
+
+    return matiere.id, planning.id
+
+
+def generer_sessions(nombre, matiere_id):
+    """Construit `nombre` sessions générées consécutives d'une heure"""
+    debut = datetime(2025, 1, 1, 8, 0)
+    sessions = []
+
+    for i in range(nombre):
+        heure_debut = debut + timedelta(hours=i)
+        sessions.append(SessionGeneree(
+            matiere_id=matiere_id,
+            tache_associee_id=None,
+            date=heure_debut.date(),
+            heure_debut=heure_debut,
+            heure_fin=heure_debut + timedelta(minutes=60),
+            duree=60,
+            titre='Étude Mathématiques',
+            description="Session d'étude pour Mathématiques",
+            type_session='etude'
+        ))
+
+    return sessions
+
+
+def inserer_orm(planning_id, sessions):
+    """Chemin historique : un objet Session par ligne"""
+    objets = [Session(planning_id=planning_id, **session._asdict()) for session in sessions]
+    db.session.add_all(objets)
+    db.session.flush()
+    ids = [objet.id for objet in objets]
+    db.session.commit()
+    return ids
+
+
+def inserer_masse(planning_id, sessions):
+    """Chemin en masse : une instruction INSERT multi-lignes"""
+    ids = inserer_sessions_en_masse(planning_id, sessions)
+    db.session.commit()
+    return ids
+
+
+def mesurer(fonction, planning_id, sessions, repetitions):
+    """
+    Mesure le meilleur temps d'insertion sur plusieurs répétitions
+
+    Returns:
+        Durée minimale en secondes
+    """
+    meilleur = None
+
+    for _ in range(repetitions):
+        Session.query.filter_by(planning_id=planning_id).delete()
+        db.session.commit()
+        db.session.expunge_all()
+
+        debut = chrono.perf_counter()
+        ids = fonction(planning_id, sessions)
+        duree = chrono.perf_counter() - debut
+
+        assert len(ids) == len(sessions)
+        meilleur = duree if meilleur is None else min(meilleur, duree)
+
+    return meilleur
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark insertion ORM vs insertion en masse')
+    parser.add_argument('--tailles', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--repetitions', type=int, default=3)
+    args = parser.parse_args()
+
+    config_name = 'development' if os.environ.get('DATABASE_URL') else 'testing'
+    app = create_app(config_name)
+
+    with app.app_context():
+        creer_tables()
+        matiere_id, planning_id = preparer_donnees()
+
+        print(f"Base : {db.engine.url.render_as_string(hide_password=True)}")
+        print(f"{'sessions':>10} {'ORM (s)':>10} {'masse (s)':>10} {'gain':>8}")
+
+        for taille in args.tailles:
+            sessions = generer_sessions(taille, matiere_id)
+            duree_orm = mesurer(inserer_orm, planning_id, sessions, args.repetitions)
+            duree_masse = mesurer(inserer_masse, planning_id, sessions, args.repetitions)
+            print(f"{taille:>10} {duree_orm:>10.3f} {duree_masse:>10.3f} {duree_orm / duree_masse:>7.1f}x")
+
+        Session.query.filter_by(planning_id=planning_id).delete()
+        db.session.commit()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,188 @@
+"""
+Benchmark : extraction des cours d'emplois du temps en grille, mode texte contre mode grille
+
+Utilisation (depuis le dossier backend):
+    python -m benchmarks.bench_modes_extraction
+    python -m benchmarks.bench_modes_extraction --pages 50 --graine 3
+
+Chaque page est une semaine en grille : jours en colonnes, heures en lignes.
+La moitié des cours sont encadrés (horaires lus aux bords du cadre), les
+autres écrivent leurs horaires dans la case. Pour chaque mode : durée,
+cours détectés, cours retrouvés exactement (jour, horaires, matière) et
+confiance moyenne telle qu'enregistrée dans confiance_extraction.
+
+Des cas de régression du mode automatique sont vérifiés d'abord : un
+document mêlant une page en grille et une page de texte, et une page de
+texte dont une phrase nomme deux jours.
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import time as heure
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.pdf_analyzer import PDFAnalyzer, MODE_TEXTE, MODE_GRILLE, MODE_AUTO
+from benchmarks.bench_extraction_pdf import ecrire_pdf
+
+JOURS = ['Lundi', 'Mardi', 'Mercredi', 'Jeudi', 'Vendredi']
+MATIERES = ['Analyse', 'Algèbre linéaire', 'Physique', 'Chimie organique', 'Programmation', 'Anglais']
+TYPES = ['CM', 'TD', 'TP']
+
+# Géométrie de la grille (points, origine en bas à gauche)
+HAUT_GRILLE = 545
+HAUTEUR_HEURE = 40
+PREMIERE_HEURE = 8
+DERNIERE_HEURE = 18
+GAUCHE_GRILLE = 70
+LARGEUR_COLONNE = 150
+
+
+def page_grille(generateur):
+    """
+    Dessine une semaine en grille
+
+    Returns:
+        Tuple (textes, rectangles, cours attendus (jour, début, fin, matière))
+    """
+    textes = []
+    rectangles = []
+    attendus = []
+
+    for index, jour in enumerate(JOURS):
+        textes.append((GAUCHE_GRILLE + index * LARGEUR_COLONNE + 55, HAUT_GRILLE + 15, jour))
+
+    for numero_heure in range(PREMIERE_HEURE, DERNIERE_HEURE + 1):
+        y = HAUT_GRILLE - (numero_heure - PREMIERE_HEURE) * HAUTEUR_HEURE
+        textes.append((20, y - 10, f'{numero_heure:02d}:00'))
+
+    for index, jour in enumerate(JOURS):
+        x = GAUCHE_GRILLE + index * LARGEUR_COLONNE
+        debut = PREMIERE_HEURE
+
+        while debut < DERNIERE_HEURE:
+            duree = generateur.choice([1, 2])
+            if debut + duree > DERNIERE_HEURE or generateur.random() < 0.4:
+                debut += 1
+                continue
+
+            y = HAUT_GRILLE - (debut - PREMIERE_HEURE) * HAUTEUR_HEURE
+            matiere = generateur.choice(MATIERES)
+            lignes = [matiere, f'{generateur.choice(TYPES)} Salle B{generateur.randint(100, 130)}']
+
+            if generateur.random() < 0.5:
+                rectangles.append((x + 4, y - duree * HAUTEUR_HEURE + 2, LARGEUR_COLONNE - 8, duree * HAUTEUR_HEURE - 4))
+            else:
+                lignes.append(f'{debut:02d}:00 - {debut + duree:02d}:00')
+
+            for numero, ligne in enumerate(lignes):
+                textes.append((x + 10, y - 12 - 11 * numero, ligne))
+
+            attendus.append((jour.lower(), heure(debut, 0), heure(debut + duree, 0), matiere))
+            debut += duree
+
+    return textes, rectangles, attendus
+
+
+def mesurer(chemin, mode):
+    """
+    Extrait les cours d'un PDF dans un mode
+
+    Returns:
+        Tuple (cours détectés, durée en secondes)
+    """
+    debut = time.perf_counter()
+    extraction = PDFAnalyzer(None, chemin, mode).extraire()
+    return extraction['cours'], time.perf_counter() - debut
+
+
+def cles(cours):
+    """Ensemble (jour, début, fin, matière) des cours détectés"""
+    return {(c['jour'], c['heure_debut'], c['heure_fin'], c['matiere']) for c in cours}
+
+
+def verifier_regressions(dossier):
+    """
+    Vérifie le mode automatique sur des documents où il s'est déjà trompé
+
+    Raises:
+        SystemExit: Si un cours attendu manque ou si un cours inattendu est détecté
+    """
+    textes_grille, rectangles_grille, attendus_grille = page_grille(random.Random(0))
+    page_texte = [
+        (40, 540, 'Lundi'),
+        (60, 529, '08:00 - 10:00 Analyse CM Salle B12'),
+        (40, 514, 'Mardi'),
+        (60, 503, '10:00 - 12:00 Physique TD Salle B13')
+    ]
+    attendus_texte = {
+        ('lundi', heure(8, 0), heure(10, 0), 'Analyse'),
+        ('mardi', heure(10, 0), heure(12, 0), 'Physique')
+    }
+
+    cas = [
+        (
+            'grille puis texte',
+            [textes_grille, page_texte],
+            [rectangles_grille, []],
+            set(attendus_grille) | attendus_texte
+        ),
+        (
+            'phrase « du lundi au vendredi »',
+            [[(40, 560, 'Cours du lundi au vendredi')] + page_texte],
+            [[]],
+            attendus_texte
+        )
+    ]
+
+    for nom, pages, rectangles, attendus in cas:
+        chemin = os.path.join(dossier, 'regression.pdf')
+        ecrire_pdf(chemin, pages, rectangles)
+        trouves = cles(mesurer(chemin, MODE_AUTO)[0])
+
+        if trouves != attendus:
+            raise SystemExit(
+                f"Régression du mode auto ({nom}) : manquants {sorted(attendus - trouves)}, "
+                f"inattendus {sorted(trouves - attendus)}"
+            )
+        print(f"régression « {nom} » : {len(trouves)} cours, ok")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark extraction mode texte vs mode grille')
+    parser.add_argument('--pages', type=int, default=20)
+    parser.add_argument('--graine', type=int, default=0)
+    args = parser.parse_args()
+
+    generateur = random.Random(args.graine)
+    pages = [page_grille(generateur) for _ in range(args.pages)]
+    attendus = Counter(cours for _, _, attendus_page in pages for cours in attendus_page)
+
+    with tempfile.TemporaryDirectory() as dossier:
+        verifier_regressions(dossier)
+
+        chemin = os.path.join(dossier, 'grilles.pdf')
+        ecrire_pdf(chemin, [textes for textes, _, _ in pages], [rectangles for _, rectangles, _ in pages])
+
+        print(f"{args.pages} pages, {sum(attendus.values())} cours attendus")
+        print(f"{'mode':>8} {'durée (s)':>10} {'pages/s':>8} {'cours':>7} {'exacts':>7} {'précision':>10} {'confiance':>10}")
+
+        for mode in (MODE_TEXTE, MODE_GRILLE):
+            cours, duree = mesurer(chemin, mode)
+            trouves = Counter((c['jour'], c['heure_debut'], c['heure_fin'], c['matiere']) for c in cours)
+            exacts = sum((trouves & attendus).values())
+            confiance = sum(c['confiance'] for c in cours) / len(cours) if cours else 0
+
+            print(
+                f"{mode:>8} {duree:>10.3f} {args.pages / duree:>8.1f} {len(cours):>7} {exacts:>7} "
+                f"{exacts / sum(attendus.values()):>10.1%} {confiance:>10.0f}"
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""
+Benchmark : heuristique par priorité contre allocation par programmation linéaire
+
+Utilisation (depuis le dossier backend):
+    python -m benchmarks.bench_moteurs_planning
+    python -m benchmarks.bench_moteurs_planning --jours 30 90 365 --matieres 8
+
+Pour chaque durée de planning, affiche le temps de génération, le nombre
+de sessions et le score de qualité obtenus par chaque moteur.
+"""
+
+import argparse
+import os
+import sys
+from datetime import datetime, date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db
+from app.models import User, Matiere, Tache, Planning, Session, EmploiDuTemps, Cours
+from app.services.planning_generator import PlanningGenerator, MODE_JOUR, MODE_ALLOCATION_LP
+
+
+def creer_tables():
+    """Crée uniquement les tables nécessaires au benchmark"""
+    tables = [
+        User.__table__, Matiere.__table__, Planning.__table__, Tache.__table__,
+        Session.__table__, EmploiDuTemps.__table__, Cours.__table__
+    ]
+    db.metadata.create_all(bind=db.engine, tables=tables)
+
+
+def preparer_utilisateur(nombre_matieres, nombre_jours):
+    """
+    Crée un utilisateur avec des matières, des tâches et un emploi du temps
+
+    Les examens sont répartis sur toute la durée du planning.
+
+    Returns:
+        Utilisateur créé
+    """
+    user = User(nom='Benchmark', email=f'bench-{datetime.utcnow().timestamp()}@test.com', mot_de_passe='Bench1234')
+    db.session.add(user)
+    db.session.flush()
+
+    for i in range(nombre_matieres):
+        matiere = Matiere(
+            nom=f'Matière {i + 1}',
+            user_id=user.id,
+            priorite=1 + i % 5,
+            coefficient=1 + i % 3,
+            niveau_difficulte=1 + (i * 2) % 5,
+            date_examen=datetime.utcnow() + timedelta(days=(i + 1) * nombre_jours // nombre_matieres)
+        )
+        db.session.add(matiere)
+        db.session.flush()
+        db.session.add(Tache(titre=f'Révisions {matiere.nom}', user_id=user.id, matiere_id=matiere.id, priorite=3))
+
+    emploi = EmploiDuTemps(user_id=user.id, nom_fichier='benchmark.pdf')
+    db.session.add(emploi)
+    db.session.flush()
+
+    for jour in ['lundi', 'mardi', 'mercredi', 'jeudi', 'vendredi']:
+        db.session.add(Cours(emploi_du_temps_id=emploi.id, nom='Cours', jour_semaine=jour,
+                             heure_debut='08:30', heure_fin='12:00'))
+        db.session.add(Cours(emploi_du_temps_id=emploi.id, nom='TD', jour_semaine=jour,
+                             heure_debut='14:00', heure_fin='16:00'))
+
+    db.session.commit()
+    return user
+
+
+def generer(user, mode, nombre_jours):
+    """
+    Génère un planning avec un moteur donné
+
+    Returns:
+        Tuple (planning, statistiques du générateur)
+    """
+    generator = PlanningGenerator(user)
+    planning = generator.generer_planning_automatique(
+        date_debut=date.today(),
+        date_fin=date.today() + timedelta(days=nombre_jours - 1),
+        heures_etude_par_jour=4.0,
+        mode=mode
+    )
+    return planning, generator.statistiques
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark heuristique vs allocation LP')
+    parser.add_argument('--jours', type=int, nargs='+', default=[30, 90, 365])
+    parser.add_argument('--matieres', type=int, default=6)
+    args = parser.parse_args()
+
+    config_name = 'development' if os.environ.get('DATABASE_URL') else 'testing'
+    app = create_app(config_name)
+
+    with app.app_context():
+        creer_tables()
+
+        print(f"{'jours':>6} {'moteur':>26} {'génération (s)':>15} {'solveur (s)':>12} {'sessions':>9} {'score':>6}")
+
+        for nombre_jours in args.jours:
+            user = preparer_utilisateur(args.matieres, nombre_jours)
+
+            for mode in (MODE_JOUR, MODE_ALLOCATION_LP):
+                planning, statistiques = generer(user, mode, nombre_jours)
+                duree_solveur = statistiques.get('duree_resolution_secondes')
+                print(
+                    f"{nombre_jours:>6} {planning.algorithme_utilise:>26} "
+                    f"{statistiques['duree_generation_secondes']:>15.3f} "
+                    f"{duree_solveur if duree_solveur is not None else '-':>12} "
+                    f"{planning.sessions_total:>9} {planning.score_qualite:>6.0f}"
+                )
+
+
+if __name__ == '__main__':
+    main()
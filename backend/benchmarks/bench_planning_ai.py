@@ -0,0 +1,116 @@
+"""
+Benchmark : génération PlanningAI jour par jour contre grille NumPy
+
+Utilisation (depuis le dossier backend):
+    python -m benchmarks.bench_planning_ai
+    python -m benchmarks.bench_planning_ai --matieres 5 --jours 365 --repetitions 20
+
+Vérifie que les deux chemins produisent les mêmes sessions puis affiche le
+temps moyen de chacun. Le cache des plannings est désactivé pour mesurer la
+génération elle-même. La reconnaissance des matières du catalogue de sujets
+est vérifiée d'abord sur des noms où elle s'est déjà trompée.
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.cache_plannings import cache_plannings
+from app.services.planning_ai import PlanningAI, catalogue_sujets
+
+# Nom libre -> matière du catalogue attendue (None = sujets par défaut)
+RECONNAISSANCES = {
+    'Maths': 'mathématiques',
+    'Mathématiques appliquées': 'mathématiques',
+    'Physique-Chimie': 'physique',
+    'Chimie organique': 'chimie',
+    'Aromathérapie': None,
+    'Mathématicien·ne·s célèbres': None,
+    'Javascript': None
+}
+
+
+def creer_matieres(nombre_matieres):
+    """Matières de test aux coefficients, priorités et progressions variés"""
+    return [
+        {
+            'id': i + 1,
+            'nom': f'Matière {i + 1}',
+            'coefficient': 1.0 + i % 3,
+            'priorite': 1 + i % 3,
+            'progression': (i * 17) % 100
+        }
+        for i in range(nombre_matieres)
+    ]
+
+
+def verifier_reconnaissances():
+    """
+    Vérifie la matière reconnue pour chaque nom de RECONNAISSANCES
+
+    Raises:
+        SystemExit: Si une matière reconnue diffère de celle attendue
+    """
+    for nom, attendue in RECONNAISSANCES.items():
+        reconnue = catalogue_sujets.reconnaitre(nom)
+        if reconnue != attendue:
+            raise SystemExit(f"Catalogue de sujets : « {nom} » reconnu {reconnue!r}, attendu {attendue!r}")
+
+    print(f"reconnaissance du catalogue : {len(RECONNAISSANCES)} noms, ok")
+
+
+def chronometrer(ai, vectorise, matieres, preferences, date_debut, date_fin, repetitions):
+    """
+    Génère le planning plusieurs fois
+
+    Returns:
+        Tuple (sessions de la dernière génération, durée moyenne en secondes)
+    """
+    debut = time.perf_counter()
+
+    for _ in range(repetitions):
+        sessions = ai.generate_planning(matieres, preferences, date_debut, date_fin, vectorise=vectorise)
+
+    return sessions, (time.perf_counter() - debut) / repetitions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark PlanningAI jour par jour vs NumPy')
+    parser.add_argument('--matieres', type=int, default=5)
+    parser.add_argument('--jours', type=int, default=365)
+    parser.add_argument('--repetitions', type=int, default=20)
+    args = parser.parse_args()
+
+    verifier_reconnaissances()
+
+    cache_plannings.max_entrees = 0
+
+    ai = PlanningAI()
+    matieres = creer_matieres(args.matieres)
+    preferences = {
+        'duree_session': 60,
+        'heure_debut': '08:00',
+        'heure_fin': '20:00',
+        'jours_semaine': [0, 1, 2, 3, 4, 5]
+    }
+    date_debut = datetime(2025, 1, 6)
+    date_fin = date_debut + timedelta(days=args.jours - 1)
+
+    sessions_jour, duree_jour = chronometrer(ai, False, matieres, preferences, date_debut, date_fin, args.repetitions)
+    sessions_grille, duree_grille = chronometrer(ai, True, matieres, preferences, date_debut, date_fin, args.repetitions)
+
+    if sessions_jour != sessions_grille:
+        raise SystemExit('Les deux chemins ne produisent pas les mêmes sessions')
+
+    print(f"{args.matieres} matières × {args.jours} jours : {len(sessions_grille)} sessions")
+    print(f"{'jour par jour':>15} {duree_jour * 1000:>9.2f} ms")
+    print(f"{'grille NumPy':>15} {duree_grille * 1000:>9.2f} ms")
+    print(f"{'accélération':>15} {duree_jour / duree_grille:>9.1f} x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,164 @@
+"""
+Banc d'essai commun à tous les moteurs du registre, y compris ceux réservés à la comparaison
+
+Utilisation (depuis le dossier backend):
+    python -m benchmarks.bench_registre_moteurs
+    python -m benchmarks.bench_registre_moteurs --matieres 5 20 --jours 7 90 --densites dense
+    python -m benchmarks.bench_registre_moteurs --moteurs planning_ai lp_allocation --csv resultats.csv
+
+Chaque moteur résout les mêmes problèmes synthétiques (nombre de matières,
+durée de la période, emploi du temps dense ou creux). Pour chaque exécution :
+temps de calcul, pic de mémoire Python (tracemalloc), score de qualité commun,
+sessions en conflit avec un cours et sessions après l'examen. Aucune base de
+données n'est nécessaire : les problèmes sont décrits en données simples.
+"""
+
+import argparse
+import csv
+import os
+import random
+import sys
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.cache_plannings import cache_plannings
+from app.services.creneaux_libres import JOURS_SEMAINE
+from app.services.moteurs_planning import (
+    MOTEURS_COMPARAISON, ProblemePlanification, PreferencesEtude, MatiereProbleme,
+    TacheProbleme, CoursProbleme, evaluer_solution
+)
+
+# Cours par jour ouvré : (début, fin)
+EMPLOIS_DU_TEMPS = {
+    'dense': [('08:00', '10:00'), ('10:15', '12:15'), ('13:30', '15:30'), ('15:45', '17:45')],
+    'creux': [('09:00', '11:00')]
+}
+
+
+def probleme_synthetique(nombre_matieres, nombre_jours, densite, graine=0):
+    """
+    Construit un problème reproductible
+
+    Les examens sont répartis sur la période ; un tiers des matières n'a pas
+    d'examen.
+
+    Returns:
+        Problème de planification
+    """
+    generateur = random.Random(graine)
+    date_debut = date(2025, 1, 6)
+    date_fin = date_debut + timedelta(days=nombre_jours - 1)
+
+    matieres = []
+    taches = []
+    for i in range(nombre_matieres):
+        date_examen = None
+        if i % 3:
+            date_examen = datetime.combine(date_debut, datetime.min.time()) + timedelta(
+                days=generateur.randint(max(nombre_jours // 3, 1), nombre_jours)
+            )
+
+        matieres.append(MatiereProbleme(
+            id=i + 1,
+            nom=f'Matière {i + 1}',
+            priorite=generateur.randint(1, 10),
+            niveau_difficulte=generateur.randint(1, 5),
+            pourcentage_complete=generateur.randint(0, 80),
+            coefficient=generateur.choice([1.0, 2.0, 3.0]),
+            date_examen=date_examen
+        ))
+        taches.append(TacheProbleme(id=i + 1, matiere_id=i + 1, priorite=generateur.randint(1, 5), date_limite=None))
+
+    cours = [
+        CoursProbleme(id=index * 10 + numero, jour_semaine=jour, heure_debut=debut, heure_fin=fin)
+        for index, jour in enumerate(JOURS_SEMAINE[:5])
+        for numero, (debut, fin) in enumerate(EMPLOIS_DU_TEMPS[densite])
+    ]
+
+    return ProblemePlanification(
+        preferences=PreferencesEtude(
+            id=None,
+            heure_productive_debut=datetime.strptime('08:00', '%H:%M').time(),
+            heure_productive_fin=datetime.strptime('22:00', '%H:%M').time(),
+            duree_session_preferee=60,
+            duree_pause=15
+        ),
+        matieres=matieres,
+        taches=taches,
+        cours=cours,
+        emploi_du_temps_id=1,
+        date_debut=date_debut,
+        date_fin=date_fin,
+        heures_etude_par_jour=4.0
+    )
+
+
+def executer(moteur, probleme):
+    """
+    Résout un problème avec un moteur en mesurant temps et mémoire
+
+    Returns:
+        Dictionnaire des mesures et indicateurs de qualité
+    """
+    tracemalloc.start()
+    debut = time.perf_counter()
+
+    sessions = moteur.resoudre(probleme)
+
+    duree = time.perf_counter() - debut
+    _, pic = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return dict(
+        evaluer_solution(probleme, sessions),
+        duree_secondes=round(duree, 4),
+        pic_memoire_mio=round(pic / (1024 * 1024), 2)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Banc d\'essai des moteurs de planification')
+    parser.add_argument('--matieres', type=int, nargs='+', default=[5, 10, 20, 40])
+    parser.add_argument('--jours', type=int, nargs='+', default=[7, 30, 90, 365])
+    parser.add_argument('--densites', nargs='+', choices=sorted(EMPLOIS_DU_TEMPS), default=['dense', 'creux'])
+    parser.add_argument('--moteurs', nargs='+', choices=sorted(MOTEURS_COMPARAISON), default=sorted(MOTEURS_COMPARAISON))
+    parser.add_argument('--csv', help='Fichier CSV de sortie (facultatif)')
+    args = parser.parse_args()
+
+    # Chaque exécution doit réellement calculer le planning
+    cache_plannings.max_entrees = 0
+
+    resultats = []
+    print(
+        f"{'matières':>8} {'jours':>5} {'edt':>6} {'moteur':>27} {'durée (s)':>10} {'pic (Mio)':>10} "
+        f"{'sessions':>9} {'score':>6} {'conflits':>9} {'après exam':>11}"
+    )
+
+    for nombre_matieres in args.matieres:
+        for nombre_jours in args.jours:
+            for densite in args.densites:
+                probleme = probleme_synthetique(nombre_matieres, nombre_jours, densite)
+
+                for nom in args.moteurs:
+                    mesure = executer(MOTEURS_COMPARAISON[nom], probleme)
+                    resultats.append(dict(matieres=nombre_matieres, jours=nombre_jours, emploi_du_temps=densite,
+                                          moteur=nom, **mesure))
+                    print(
+                        f"{nombre_matieres:>8} {nombre_jours:>5} {densite:>6} {nom:>27} "
+                        f"{mesure['duree_secondes']:>10.4f} {mesure['pic_memoire_mio']:>10.2f} "
+                        f"{mesure['sessions']:>9} {mesure['score_qualite']:>6} "
+                        f"{mesure['conflits_cours']:>9} {mesure['sessions_apres_examen']:>11}"
+                    )
+
+    if args.csv:
+        with open(args.csv, 'w', newline='', encoding='utf-8') as fichier:
+            writer = csv.DictWriter(fichier, fieldnames=list(resultats[0]))
+            writer.writeheader()
+            writer.writerows(resultats)
+
+
+if __name__ == '__main__':
+    main()
@@ -34,6 +34,30 @@ class Config:
     MAX_CONTENT_LENGTH = int(os.environ.get('MAX_CONTENT_LENGTH', 16 * 1024 * 1024))  # 16MB
     ALLOWED_EXTENSIONS = {'pdf'}
     
+    # Traitements en arrière-plan
+    JOBS_MAX_WORKERS = int(os.environ.get('JOBS_MAX_WORKERS', 2))
+    JOBS_SYNCHRONES = False
+    
+    # Au démarrage, marquer en échec les jobs et analyses PDF laissés en attente ou en
+    # cours par un processus arrêté (à désactiver si plusieurs processus d'API partagent la base)
+    MARQUER_ORPHELINS_AU_DEMARRAGE = os.environ.get('MARQUER_ORPHELINS_AU_DEMARRAGE', 'true').lower() == 'true'
+    
+    # Scénarios de planning (0 processus = évaluation dans le processus de la requête)
+    SCENARIOS_PROCESSUS = int(os.environ.get('SCENARIOS_PROCESSUS', os.cpu_count() or 1))
+    SCENARIOS_MAX_VARIANTES = int(os.environ.get('SCENARIOS_MAX_VARIANTES', 32))
+    
+    # Analyse des PDF (0 processus = analyse dans le processus de la requête)
+    PDF_ANALYSE_PROCESSUS = int(os.environ.get('PDF_ANALYSE_PROCESSUS', 2))
+    PDF_ANALYSE_FILE_MAX = int(os.environ.get('PDF_ANALYSE_FILE_MAX', 20))
+    
+    # Cache des extractions PDF, partagé entre imports d'un même fichier (0 octet = désactivé)
+    CACHE_EXTRACTION_MAX_OCTETS = int(os.environ.get('CACHE_EXTRACTION_MAX_OCTETS', 50 * 1024 * 1024))
+    CACHE_EXTRACTION_AGE_MAX_JOURS = int(os.environ.get('CACHE_EXTRACTION_AGE_MAX_JOURS', 30))
+    
+    # Cache des plannings générés (0 = désactivé)
+    CACHE_PLANNINGS_MAX_ENTREES = int(os.environ.get('CACHE_PLANNINGS_MAX_ENTREES', 128))
+    CACHE_PLANNINGS_MAX_SESSIONS = int(os.environ.get('CACHE_PLANNINGS_MAX_SESSIONS', 100000))
+    
     @staticmethod
     def init_app(app):
         """Initialisation de l'application"""
@@ -53,6 +77,9 @@ class TestingConfig(Config):
     DEBUG = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
     WTF_CSRF_ENABLED = False
+    JOBS_SYNCHRONES = True
+    SCENARIOS_PROCESSUS = 0
+    PDF_ANALYSE_PROCESSUS = 0
 
 
 class ProductionConfig(Config):
@@ -4,8 +4,10 @@ Assistant Intelligent d'Organisation des Études
 """
 
 import os
+import click
 from app import create_app, db
-from app.models import User, Matiere, Tache, Planning, Session, Notification, EmploiDuTemps, Cours
+from app.models import User, Matiere, Tache, Planning, Session, Notification, EmploiDuTemps, Cours, Job, StatistiqueEtude, CacheExtraction
+from app.services.planning_generator import MODE_JOUR, MODES_GENERATION
 
 # Créer l'application avec l'environnement approprié
 config_name = os.getenv('FLASK_ENV', 'development')
@@ -27,7 +29,10 @@ def make_shell_context():
         'Session': Session,
         'Notification': Notification,
         'EmploiDuTemps': EmploiDuTemps,
-        'Cours': Cours
+        'Cours': Cours,
+        'Job': Job,
+        'StatistiqueEtude': StatistiqueEtude,
+        'CacheExtraction': CacheExtraction
     }
 
 
@@ -137,6 +142,77 @@ def reset_db():
         print('❌ Opération annulée')
 
 
+@app.cli.command()
+@click.option('--date-debut', required=True, help='Date de début des plannings (YYYY-MM-DD)')
+@click.option('--date-fin', required=True, help='Date de fin des plannings (YYYY-MM-DD)')
+@click.option('--heures-par-jour', default=4.0, show_default=True, help="Heures d'étude par jour")
+@click.option('--mode', default=MODE_JOUR, show_default=True, type=click.Choice(MODES_GENERATION), help='Mode de génération')
+@click.option('--taille-lot', default=200, show_default=True, help="Nombre d'utilisateurs par lot")
+@click.option('--processus', default=None, type=int, help='Nombre de processus (défaut : nombre de cœurs)')
+@click.option('--depuis-id', default=0, show_default=True, help="Ne traiter que les utilisateurs d'ID supérieur")
+@click.option('--progression', default=None, help='Fichier de progression pour reprendre un traitement interrompu')
+def generer_plannings(date_debut, date_fin, heures_par_jour, mode, taille_lot, processus, depuis_id, progression):
+    """
+    Génère les plannings de tous les étudiants actifs (début de semestre)
+    Utilisation: flask generer-plannings --date-debut 2025-09-01 --date-fin 2026-01-31 --progression progression.json
+    """
+    from app.services.generation_lot import generer_plannings_tous, lire_progression
+    from app.utils.validators import validate_date
+    
+    date_debut = validate_date(date_debut, 'Date début')
+    date_fin = validate_date(date_fin, 'Date fin')
+    
+    # Reprendre après le dernier utilisateur traité lors d'une exécution précédente
+    depuis_id = max(depuis_id, lire_progression(progression))
+    if depuis_id:
+        print(f'↻ Reprise après l\'utilisateur {depuis_id}')
+    
+    def afficher(bilan):
+        print(
+            f"  {bilan['utilisateurs_traites']}/{bilan['utilisateurs_total']} utilisateurs"
+            f" - {bilan['generes']} plannings, {bilan['sessions']} sessions"
+            f" - {bilan['utilisateurs_par_minute']} utilisateurs/min"
+        )
+    
+    print('🗓️  Génération des plannings...')
+    bilan = generer_plannings_tous(
+        config_name,
+        date_debut,
+        date_fin,
+        taille_lot=taille_lot,
+        processus=processus,
+        depuis_id=depuis_id,
+        fichier_progression=progression,
+        rapport=afficher,
+        heures_etude_par_jour=heures_par_jour,
+        mode=mode
+    )
+    
+    print(f"✓ {bilan['generes']} plannings générés en {bilan['duree_secondes']}s"
+          f" ({bilan['ignores']} déjà existants)")
+    if bilan['echecs']:
+        print(f"❌ {len(bilan['echecs'])} échec(s) :")
+        for user_id, erreur in bilan['echecs'].items():
+            print(f'   - utilisateur {user_id}: {erreur}')
+    if bilan['lots_echoues']:
+        print(f"❌ {len(bilan['lots_echoues'])} lot(s) en erreur, à relancer avec --progression :")
+        for lot in bilan['lots_echoues']:
+            print(f"   - utilisateurs {lot['premier_id']} à {lot['dernier_id']}: {lot['erreur']}")
+
+
+@app.cli.command()
+@click.option('--user-id', default=None, type=int, help='Ne recalculer que cet utilisateur (défaut : tous)')
+def reconstruire_statistiques(user_id):
+    """
+    Recalcule les habitudes d'étude (statistiques_etude) à partir de l'historique des sessions
+    Utilisation: flask reconstruire-statistiques
+    """
+    print('📊 Reconstruction des statistiques d\'étude...')
+    lignes = StatistiqueEtude.reconstruire(user_id)
+    db.session.commit()
+    print(f'✓ {lignes} agrégat(s) jour/heure recalculé(s)')
+
+
 if __name__ == '__main__':
     # Démarrer l'application
     port = int(os.environ.get('PORT', 5000))